@@ -0,0 +1 @@
+"""Admin web UI for the pipeline: config editor, job runner, dashboard."""
@@ -1,27 +1,52 @@
-import json
+import os
+import sys
+from pathlib import Path
 
-from flask import Flask, redirect, render_template, request
+from flask import (
+    Flask,
+    Response,
+    abort,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    stream_with_context,
+)
+
+if __package__ in (None, ""):
+    # Started as a script (python app.py): make the admin_gui package importable
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from admin_gui.config_service import ConfigError, ConfigService  # noqa: E402
+from admin_gui.dashboard import Dashboard  # noqa: E402
+from admin_gui.jobs import JobManager  # noqa: E402
 
 app = Flask(__name__)
-CONFIG_PATH = "config.json"
+CONFIG = ConfigService()
+JOBS = JobManager(workers=int(os.getenv("ADMIN_JOB_WORKERS", "2")))
+_dashboard = None
+
+
+def get_dashboard():
+    # Built on first use: importing the app should not create .cache/dashboard.sqlite
+    global _dashboard
+    if _dashboard is None:
+        _dashboard = Dashboard()
+    return _dashboard
 
 
 def load_config():
     try:
-        with open(CONFIG_PATH, "r") as f:
-            return json.load(f)
-    except Exception as e:
+        return CONFIG.get()
+    except (OSError, ValueError) as e:
         print(f"❌ Failed to load config: {e}")
         return {}
 
 
-def save_config(config):
-    try:
-        with open(CONFIG_PATH, "w") as f:
-            json.dump(config, f, indent=2)
-        print("✅ Config updated.")
-    except Exception as e:
-        print(f"❌ Failed to save config: {e}")
+def save_config(changes):
+    config = CONFIG.update(changes)
+    print("✅ Config updated.")
+    return config
 
 
 @app.route("/", methods=["GET", "POST"])
@@ -31,24 +56,102 @@ def index():
         return "❌ Config file missing or invalid."
 
     if request.method == "POST":
-        config["min_duration_seconds"] = float(request.form["min_duration_seconds"])
-        config["default_source"] = request.form["default_source"]
-        config["default_platform"] = request.form["default_platform"]
-        config["default_account"] = request.form["default_account"]
-        config["product_filter_keywords"] = request.form[
-            "product_filter_keywords"
-        ].split(",")
-        config["product_filter_min_price"] = int(
-            request.form["product_filter_min_price"]
-        )
-        config["product_filter_max_price"] = int(
-            request.form["product_filter_max_price"]
-        )
-        save_config(config)
+        try:
+            changes = {
+                "min_duration_seconds": float(request.form["min_duration_seconds"]),
+                "default_source": request.form["default_source"],
+                "default_platform": request.form["default_platform"],
+                "default_account": request.form["default_account"],
+                "product_filter_keywords": [
+                    k.strip()
+                    for k in request.form["product_filter_keywords"].split(",")
+                    if k.strip()
+                ],
+                "product_filter_min_price": int(
+                    request.form["product_filter_min_price"]
+                ),
+                "product_filter_max_price": int(
+                    request.form["product_filter_max_price"]
+                ),
+            }
+            save_config(changes)
+        except (KeyError, ValueError) as e:  # ConfigError is a ValueError
+            msg = (
+                e.args[0] if isinstance(e, ConfigError) else f"Invalid form value: {e}"
+            )
+            return f"❌ {msg}", 400
         return redirect("/")
     return render_template("index.html", config=config)
 
 
 @app.route("/run_batch", methods=["POST"])
 def run_batch():
-    print
+    try:
+        job = JOBS.submit(
+            request.form.get("kind", "batch_run"),
+            pack=request.form.get("pack", "").strip(),
+            dry_run=bool(request.form.get("dry_run")),
+            profile=request.form.get("profile", "").strip(),
+        )
+    except ValueError as e:
+        return f"❌ {e}", 400
+    return redirect(f"/jobs/{job.id}")
+
+
+@app.route("/jobs")
+def jobs():
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify(JOBS.list())
+    return render_template("jobs.html", jobs=JOBS.list())
+
+
+@app.route("/jobs/<job_id>")
+def job_detail(job_id):
+    job = JOBS.get(job_id)
+    if job is None:
+        abort(404)
+    return render_template("job.html", job=job.to_dict(), cmd=" ".join(job.cmd[1:]))
+
+
+@app.route("/jobs/<job_id>/events")
+def job_events(job_id):
+    if JOBS.get(job_id) is None:
+        abort(404)
+    last = request.headers.get("Last-Event-ID", "0")
+    stream = JOBS.events(job_id, int(last) if last.isdigit() else 0)
+    return Response(
+        stream_with_context(stream),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/jobs/<job_id>/cancel", methods=["POST"])
+def job_cancel(job_id):
+    JOBS.cancel(job_id)
+    return redirect(f"/jobs/{job_id}")
+
+
+@app.route("/dashboard")
+def dashboard():
+    days = request.args.get("days", "30")
+    days = int(days) if days.isdigit() and int(days) > 0 else 30
+    board = get_dashboard()
+    board.ingest()
+    stats = board.summary(days)
+    if (
+        request.args.get("format") == "json"
+        or request.accept_mimetypes.best == "application/json"
+    ):
+        return jsonify(stats)
+    return render_template("dashboard.html", stats=stats)
+
+
+if __name__ == "__main__":
+    local = Path("config.json").resolve()
+    if local.is_file() and local != CONFIG.path.resolve():
+        print(
+            f"⚠️ Using {CONFIG.path}; ./config.json is not read any more "
+            "(set ADMIN_CONFIG=config.json to keep using it)"
+        )
+    app.run(threaded=True)
@@ -0,0 +1,129 @@
+"""Cached, validated access to admin_gui/config.json.
+
+Reads are served from memory and only re-parsed when the file's
+(mtime_ns, size) changes, so callers can ask on every request. Writes
+re-read the file, merge, validate and replace it atomically under a lock
+(thread lock + flock), so two concurrent saves cannot interleave.
+
+The file is admin_gui/config.json wherever the app is started from; set
+ADMIN_CONFIG to use another one. (The app used to open ./config.json, which
+meant the repo-root config.json when started from the root.)
+
+Pipeline processes can read it the same way:
+    from admin_gui.config_service import get_config
+"""
+
+import copy
+import json
+import os
+import threading
+from pathlib import Path
+
+from fsutil import atomic_write_text
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are serialised within one process only
+    fcntl = None
+
+CONFIG_PATH = Path(
+    os.getenv("ADMIN_CONFIG", str(Path(__file__).resolve().parent / "config.json"))
+)
+PLATFORMS = ("youtube", "tiktok", "instagram")
+
+
+class ConfigError(ValueError):
+    pass
+
+
+def validate(config: dict) -> list[str]:
+    errors = []
+
+    def number(key, kind, minimum=0):
+        v = config.get(key)
+        if (
+            isinstance(v, bool)
+            or not isinstance(v, (int, float))
+            or (kind is int and v != int(v))
+        ):
+            errors.append(
+                f"{key} must be {'an integer' if kind is int else 'a number'}"
+            )
+        elif v < minimum:
+            errors.append(f"{key} must be >= {minimum}")
+
+    number("min_duration_seconds", float)
+    number("product_filter_min_price", int)
+    number("product_filter_max_price", int)
+    for key in ("default_source", "default_account"):
+        if not isinstance(config.get(key), str) or not config[key].strip():
+            errors.append(f"{key} must be a non-empty string")
+    if config.get("default_platform") not in PLATFORMS:
+        errors.append(f"default_platform must be one of {', '.join(PLATFORMS)}")
+    kw = config.get("product_filter_keywords")
+    if not isinstance(kw, list) or not all(isinstance(k, str) for k in kw):
+        errors.append("product_filter_keywords must be a list of strings")
+    if (
+        not errors
+        and config["product_filter_min_price"] > config["product_filter_max_price"]
+    ):
+        errors.append(
+            "product_filter_min_price must not exceed product_filter_max_price"
+        )
+    return errors
+
+
+class ConfigService:
+    def __init__(self, path=CONFIG_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._sig = None
+        self._config = None
+
+    def _signature(self):
+        st = self.path.stat()
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load_locked(self) -> dict:
+        sig = self._signature()
+        if sig != self._sig:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._config = json.load(f)
+            self._sig = sig
+        return self._config
+
+    def get(self) -> dict:
+        """Current config (a copy callers may modify). Raises OSError/ValueError if unreadable."""
+        with self._lock:
+            return copy.deepcopy(self._load_locked())
+
+    def update(self, changes: dict) -> dict:
+        """Merge ``changes``, validate and write atomically; raises ConfigError if invalid."""
+        with self._lock, open(
+            self.path.with_name(self.path.name + ".lock"), "a+"
+        ) as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            # Re-read under the lock so another process's save is not lost
+            self._sig = None
+            config = {**self._load_locked(), **changes}
+            errors = validate(config)
+            if errors:
+                raise ConfigError("; ".join(errors))
+            atomic_write_text(self.path, json.dumps(config, indent=2))
+            self._config = config
+            self._sig = self._signature()
+            return copy.deepcopy(config)
+
+
+_default = None
+
+
+def get_config(path=None) -> dict:
+    """Cached read for pipeline processes; re-parses only when the file changes."""
+    global _default
+    if path is not None:
+        return ConfigService(path).get()
+    if _default is None:
+        _default = ConfigService()
+    return _default.get()
@@ -0,0 +1,331 @@
+"""Pipeline performance numbers for the admin GUI, built from the run logs.
+
+Sources, all under logs/:
+  run_<RUN_ID>/trace.jsonl         spans from instrument.py (step timings, cache hits)
+  run_<RUN_ID>/audit_summary.csv   per-pack audit rows from scripts/run_pipeline.py
+  scheduler_<day>.log              START/END lines from the daily scheduler
+
+Ingest is incremental: each file's byte offset is stored in a SQLite
+database (.cache/dashboard.sqlite) and only the lines appended since the
+last visit are parsed, so the page stays fast with months of logs.
+"""
+
+import contextlib
+import csv
+import io
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+LOGS_DIR = ROOT / "logs"
+DB_PATH = ROOT / ".cache" / "dashboard.sqlite"
+SCHED_CONFIG = ROOT / "config" / "scheduler.config.json"
+LINE_RE = re.compile(r"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] (.*)$")
+END_RE = re.compile(r"END\s+pack=(\S+)\s+status=(\S+)\s+duration_s=(\d+)")
+# The database is only a cache of the logs: a new version rebuilds it from them
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, kind TEXT NOT NULL, offset INTEGER NOT NULL DEFAULT 0,
+    header TEXT, mtime_ns INTEGER
+);
+CREATE TABLE IF NOT EXISTS spans (
+    src TEXT NOT NULL, run_id TEXT, name TEXT NOT NULL, pack TEXT, start REAL,
+    wall_s REAL, status TEXT, cache TEXT, bytes_in INTEGER, rc INTEGER, ok INTEGER
+);
+CREATE INDEX IF NOT EXISTS spans_name ON spans (name, start);
+CREATE TABLE IF NOT EXISTS pack_runs (
+    src TEXT NOT NULL, ts REAL NOT NULL, pack TEXT NOT NULL, ok INTEGER NOT NULL,
+    status TEXT, duration_s REAL
+);
+CREATE INDEX IF NOT EXISTS pack_runs_ts ON pack_runs (ts);
+CREATE TABLE IF NOT EXISTS audit (
+    src TEXT NOT NULL, run_id TEXT, pack TEXT, mtime REAL,
+    images_missing_after INTEGER, fallbacks_created INTEGER, cta_changed INTEGER
+);
+"""
+
+
+def _scheduler_prefix():
+    try:
+        cfg = json.loads(SCHED_CONFIG.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        cfg = {}
+    return ROOT / cfg.get("log_dir", "logs"), cfg.get("log_prefix", "scheduler")
+
+
+def _int(v):
+    try:
+        return int(float(v))
+    except (TypeError, ValueError):
+        return 0
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    i = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[i]
+
+
+class Dashboard:
+    def __init__(self, db_path=DB_PATH, logs_dir=LOGS_DIR):
+        self.db_path = Path(db_path)
+        self.logs_dir = Path(logs_dir)
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                for table in ("files", "spans", "pack_runs", "audit"):
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.executescript(SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """One unit of work: committed (rolled back on error), then closed.
+
+        sqlite3's own ``with conn`` only ends the transaction.
+        """
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # -- Ingest --
+    def _sources(self):
+        for p in sorted(self.logs_dir.glob("run_*/trace.jsonl")):
+            yield p, "trace"
+        for p in sorted(self.logs_dir.glob("run_*/audit_summary.csv")):
+            yield p, "audit"
+        sched_dir, prefix = _scheduler_prefix()
+        for p in sorted(sched_dir.glob(f"{prefix}_*.log")):
+            yield p, "scheduler"
+
+    def ingest(self) -> int:
+        """Parse whatever was appended since the last call; returns rows added."""
+        added = 0
+        with self._lock, self._connect() as conn:
+            known = {r["path"]: r for r in conn.execute("SELECT * FROM files")}
+            for path, kind in self._sources():
+                key = str(path)
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                row = known.get(key)
+                offset, header = (row["offset"], row["header"]) if row else (0, None)
+                if row and st.st_size == offset and st.st_mtime_ns == row["mtime_ns"]:
+                    continue
+                if st.st_size < offset:  # truncated or replaced: start over
+                    for table in ("spans", "pack_runs", "audit"):
+                        conn.execute(f"DELETE FROM {table} WHERE src = ?", (key,))
+                    offset, header = 0, None
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    data = f.read()
+                end = data.rfind(b"\n") + 1  # only complete lines
+                text = data[:end].decode("utf-8", errors="replace")
+                if kind == "audit" and header is None and text:
+                    header, _, text = text.partition("\n")
+                added += getattr(self, f"_ingest_{kind}")(conn, key, path, text, header)
+                conn.execute(
+                    "INSERT OR REPLACE INTO files (path, kind, offset, header, mtime_ns) VALUES (?, ?, ?, ?, ?)",
+                    (key, kind, offset + end, header, st.st_mtime_ns),
+                )
+        return added
+
+    def _ingest_trace(self, conn, src, path, text, header):
+        rows = []
+        for line in text.splitlines():
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            attrs = rec.get("attrs") or {}
+            rows.append(
+                (
+                    src,
+                    rec.get("run_id"),
+                    rec.get("name", ""),
+                    attrs.get("pack"),
+                    rec.get("start"),
+                    rec.get("wall_s"),
+                    rec.get("status"),
+                    attrs.get("cache"),
+                    _int(attrs.get("bytes_in")),
+                    _int(attrs["rc"]) if "rc" in attrs else None,
+                    int(bool(attrs["ok"])) if "ok" in attrs else None,
+                )
+            )
+        conn.executemany(
+            "INSERT INTO spans VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+        )
+        return len(rows)
+
+    def _ingest_audit(self, conn, src, path, text, header):
+        fields = next(csv.reader([header or ""]))
+        mtime = path.stat().st_mtime
+        rows = []
+        for rec in csv.DictReader(io.StringIO(text), fieldnames=fields):
+            rows.append(
+                (
+                    src,
+                    rec.get("run_id"),
+                    rec.get("pack"),
+                    mtime,
+                    _int(rec.get("images_missing_after")),
+                    _int(rec.get("fallbacks_created")),
+                    1 if rec.get("cta_changed") == "True" else 0,
+                )
+            )
+        conn.executemany("INSERT INTO audit VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def _ingest_scheduler(self, conn, src, path, text, header):
+        rows = []
+        for line in text.splitlines():
+            m = LINE_RE.match(line)
+            if not m:
+                continue
+            end = END_RE.search(m.group(2))
+            if not end:
+                continue
+            ts = datetime.strptime(m.group(1), "%Y-%m-%d %H:%M:%S").timestamp()
+            pack, status, dur = end.groups()
+            rows.append((src, ts, pack, 1 if status == "OK" else 0, status, float(dur)))
+        conn.executemany("INSERT INTO pack_runs VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    # -- Report --
+    def summary(self, days=30) -> dict:
+        since = time.time() - days * 86400
+        out = {"days": days, "generated": time.time()}
+        with self._connect() as conn:
+            steps = {}
+            for r in conn.execute(
+                "SELECT name, wall_s FROM spans WHERE name LIKE 'step:%' AND start >= ? ORDER BY name, wall_s",
+                (since,),
+            ):
+                steps.setdefault(r["name"][5:], []).append(r["wall_s"] or 0.0)
+            out["steps"] = [
+                {
+                    "step": name,
+                    "count": len(v),
+                    "p50": percentile(v, 0.5),
+                    "p95": percentile(v, 0.95),
+                    "max": v[-1],
+                }
+                for name, v in sorted(
+                    steps.items(), key=lambda kv: -percentile(kv[1], 0.95)
+                )
+            ]
+
+            runs = conn.execute(
+                "SELECT COUNT(*) AS n, SUM(ok) AS ok, MIN(ts) AS first, MAX(ts) AS last"
+                " FROM pack_runs WHERE ts >= ?",
+                (since,),
+            ).fetchone()
+            day = conn.execute(
+                "SELECT SUM(ok) AS ok FROM pack_runs WHERE ts >= ?",
+                (time.time() - 86400,),
+            ).fetchone()
+            span_h = (
+                max(1.0, ((runs["last"] or 0) - (runs["first"] or 0)) / 3600)
+                if runs["n"]
+                else None
+            )
+            out["throughput"] = {
+                "runs": runs["n"],
+                "ok": runs["ok"] or 0,
+                "failed": runs["n"] - (runs["ok"] or 0),
+                "packs_per_hour": (
+                    round((runs["ok"] or 0) / span_h, 2) if span_h else None
+                ),
+                "packs_last_24h": day["ok"] or 0,
+            }
+            if not runs["n"]:
+                # No scheduler logs: fall back to traced pipeline runs. Their ok
+                # attribute says whether every step succeeded; status only
+                # that nothing raised (traces from before ok was recorded)
+                pipe = conn.execute(
+                    "SELECT COUNT(*) AS n, MIN(start) AS first, MAX(start + wall_s) AS last,"
+                    " SUM(COALESCE(ok, status = 'ok')) AS ok FROM spans"
+                    " WHERE name = 'pipeline' AND start >= ?",
+                    (since,),
+                ).fetchone()
+                if pipe["n"]:
+                    hours = max(1.0, (pipe["last"] - pipe["first"]) / 3600)
+                    out["throughput"].update(
+                        runs=pipe["n"],
+                        ok=pipe["ok"] or 0,
+                        failed=pipe["n"] - (pipe["ok"] or 0),
+                        packs_per_hour=round((pipe["ok"] or 0) / hours, 2),
+                    )
+
+            out["cache"] = [
+                {
+                    "cache": r["name"],
+                    "hits": r["hits"],
+                    "misses": r["misses"],
+                    "hit_rate": round(r["hits"] / (r["hits"] + r["misses"]), 3),
+                }
+                for r in conn.execute(
+                    "SELECT name, SUM(cache = 'hit') AS hits, SUM(cache = 'miss') AS misses"
+                    " FROM spans WHERE cache IN ('hit', 'miss') AND start >= ? GROUP BY name ORDER BY name",
+                    (since,),
+                )
+            ]
+
+            out["failures"] = [
+                dict(r)
+                for r in conn.execute(
+                    "SELECT pack, COUNT(*) AS failures, MAX(ts) AS last FROM pack_runs"
+                    " WHERE ok = 0 AND ts >= ? GROUP BY pack ORDER BY failures DESC LIMIT 20",
+                    (since,),
+                )
+            ]
+            out["step_errors"] = [
+                dict(r)
+                for r in conn.execute(
+                    # A step subprocess that exits non-zero still ends its span 'ok'
+                    "SELECT name, COUNT(*) AS errors FROM spans"
+                    " WHERE (status LIKE 'error%' OR rc != 0) AND start >= ?"
+                    " GROUP BY name ORDER BY errors DESC LIMIT 20",
+                    (since,),
+                )
+            ]
+
+            slow = conn.execute(
+                "SELECT pack, duration_s, ts FROM pack_runs WHERE ok = 1 AND ts >= ?"
+                " ORDER BY duration_s DESC LIMIT 10",
+                (since,),
+            ).fetchall()
+            if not slow:
+                slow = conn.execute(
+                    "SELECT pack, wall_s AS duration_s, start AS ts FROM spans"
+                    " WHERE name = 'pipeline' AND COALESCE(ok, status = 'ok') AND start >= ?"
+                    " ORDER BY wall_s DESC LIMIT 10",
+                    (since,),
+                ).fetchall()
+            out["slowest"] = [dict(r) for r in slow]
+
+            out["audit"] = [
+                dict(r)
+                for r in conn.execute(
+                    "SELECT pack, run_id, images_missing_after, fallbacks_created FROM audit"
+                    " WHERE mtime >= ? AND (images_missing_after > 0 OR fallbacks_created > 0)"
+                    " ORDER BY mtime DESC LIMIT 20",
+                    (since,),
+                )
+            ]
+        return out
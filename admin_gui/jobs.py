@@ -0,0 +1,215 @@
+import collections
+import itertools
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+LOG_DIR = ROOT / "logs" / "admin_jobs"
+MAX_LINES = 5000  # per job, kept in memory for the live view; the full log is on disk
+
+
+def build_command(kind, pack="", dry_run=False, profile=""):
+    """argv for a job; only known scripts and flags, never a shell string."""
+    if kind == "batch_run":
+        cmd = [sys.executable, "-u", "batch_run.py"]
+        if pack:
+            cmd += ["--only", pack]
+        if dry_run:
+            cmd.append("--dry-run")
+    elif kind == "run_pipeline":
+        cmd = [sys.executable, "-u", "run_pipeline.py"]
+        if pack:
+            cmd.append(pack)
+    else:
+        raise ValueError(f"Unknown job kind: {kind}")
+    if profile:
+        cmd += ["--profile", profile]
+    return cmd
+
+
+class Job:
+    def __init__(self, job_id, kind, cmd, label):
+        self.id = job_id
+        self.kind = kind
+        self.cmd = cmd
+        self.label = label
+        self.status = "queued"
+        self.rc = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.lines = collections.deque(maxlen=MAX_LINES)
+        self.seq = 0  # number of lines ever appended; SSE event ids
+        self.proc = None
+        self.cancel_requested = False
+        self.cond = threading.Condition()
+
+    def append(self, line):
+        with self.cond:
+            self.seq += 1
+            self.lines.append((self.seq, line))
+            self.cond.notify_all()
+
+    def set_status(self, status, rc=None):
+        with self.cond:
+            self.status = status
+            self.rc = rc
+            self.cond.notify_all()
+
+    def start(self):
+        """Mark the job running; False if it was cancelled before it got here."""
+        with self.cond:
+            if self.cancel_requested:
+                return False
+            self.started = time.time()
+            self.status = "running"
+            self.cond.notify_all()
+            return True
+
+    @property
+    def done(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    def to_dict(self):
+        end = self.finished or time.time()
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "label": self.label,
+            "status": self.status,
+            "rc": self.rc,
+            "created": self.created,
+            "seconds": round(end - self.started, 1) if self.started else None,
+            "lines": self.seq,
+        }
+
+
+class JobManager:
+    """Runs pipeline/batch jobs on a small worker pool, off the request threads.
+
+    Each job is a subprocess in the repo root with its own RUN_ID, so its
+    audit CSVs and trace land in logs/run_gui_<id>/. Output is kept per job
+    for the live view and written to logs/admin_jobs/<id>.log.
+    """
+
+    def __init__(self, workers=2, root=ROOT, log_dir=LOG_DIR, keep=200):
+        self.root = Path(root)
+        self.log_dir = Path(log_dir)
+        self.keep = keep
+        self.jobs = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._queue = queue.Queue()
+        for i in range(workers):
+            threading.Thread(
+                target=self._worker, name=f"job-worker-{i}", daemon=True
+            ).start()
+
+    def submit(self, kind, pack="", dry_run=False, profile=""):
+        cmd = build_command(kind, pack, dry_run, profile)
+        label = " ".join(
+            [kind, pack or "all packs", "(dry run)" if dry_run else ""]
+        ).strip()
+        with self._lock:
+            job_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{next(self._ids)}"
+            job = Job(job_id, kind, cmd, label)
+            self.jobs[job_id] = job
+            while len(self.jobs) > self.keep:
+                oldest = next(iter(self.jobs.values()))
+                if not oldest.done:
+                    break
+                self.jobs.popitem(last=False)
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def list(self):
+        return [j.to_dict() for j in reversed(list(self.jobs.values()))]
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return False
+        with job.cond:
+            if job.done:
+                return False
+            # _run checks the flag once its process exists, so a cancel that
+            # lands between start() and Popen still stops it
+            job.cancel_requested = True
+            proc = job.proc
+        if proc is not None:
+            proc.terminate()
+        job.set_status("cancelled")
+        return True
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job.status == "queued":
+                self._run(job)
+
+    def _run(self, job):
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        env = dict(os.environ, RUN_ID=f"gui_{job.id}", PYTHONUNBUFFERED="1")
+        if not job.start():
+            return
+        with open(self.log_dir / f"{job.id}.log", "w", encoding="utf-8") as log:
+            try:
+                proc = subprocess.Popen(
+                    job.cmd,
+                    cwd=self.root,
+                    env=env,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                    encoding="utf-8",
+                    errors="replace",
+                )
+            except OSError as e:
+                job.append(f"❌ Could not start: {e}")
+                job.finished = time.time()
+                job.set_status("failed")
+                return
+            with job.cond:
+                job.proc = proc
+                cancelled = job.cancel_requested
+            if cancelled:
+                proc.terminate()
+            for line in proc.stdout:
+                log.write(line)
+                job.append(line.rstrip("\n"))
+            rc = proc.wait()
+        job.finished = time.time()
+        if job.status != "cancelled":
+            job.set_status("done" if rc == 0 else "failed", rc)
+
+    def events(self, job_id, last_seq=0, heartbeat_s=15.0):
+        """Server-sent events: one ``line`` event per output line, then ``done``."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+        sent = last_seq
+        while True:
+            with job.cond:
+                if job.seq == sent and not job.done:
+                    job.cond.wait(heartbeat_s)
+                pending = [(n, line) for n, line in job.lines if n > sent]
+                done = job.done
+                status = job.to_dict()
+            if not pending and not done:
+                yield ": keep-alive\n\n"
+                continue
+            for n, line in pending:
+                yield f"id: {n}\nevent: line\ndata: {json.dumps(line)}\n\n"
+                sent = n
+            if done:
+                yield f"event: done\ndata: {json.dumps(status)}\n\n"
+                return
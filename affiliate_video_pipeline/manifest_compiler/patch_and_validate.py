@@ -1,7 +1,5 @@
-from affiliate_video_pipeline.manifest_compiler.batch_patcher import \
-    batch_patch
-from affiliate_video_pipeline.manifest_compiler.batch_validator import \
-    batch_validate
+from affiliate_video_pipeline.manifest_compiler.batch_patcher import batch_patch
+from affiliate_video_pipeline.manifest_compiler.batch_validator import batch_validate
 
 
 def patch_and_validate():
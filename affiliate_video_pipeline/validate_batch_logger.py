@@ -1,7 +1,6 @@
 import os
 
-from affiliate_video_pipeline.manifest_compiler.audit_logger import \
-    log_pipeline_run
+from affiliate_video_pipeline.manifest_compiler.audit_logger import log_pipeline_run
 from affiliate_video_pipeline.validate_batch_ready import validate_pack
 
 
@@ -2,11 +2,17 @@
 import argparse
 import re
 import shutil
-import subprocess
+import wave
 from pathlib import Path
 
+from instrument import run as traced_run
+from instrument import span
+from utils.merge_audio import audio_args
+
 IMG_EXTS = {".jpg", ".jpeg", ".png"}
 NUM_RE = re.compile(r"nar(\d+)\.wav$", re.IGNORECASE)
+# Recorded in list.txt when combined.mp4 takes its audio from an external track
+NARRATION_COMMENT = "# narration: "
 
 
 def ffmpeg_or_die():
@@ -18,10 +24,11 @@ def ffmpeg_or_die():
 
 def pick_image(pack_dir: Path, idx: int, use_cta: bool) -> Path | None:
     name = f"img{idx}"
-    # Prefer CTA dir if requested
+    # Prefer CTA dir if requested, then images already normalized to the frame size
     dirs = []
     if use_cta:
         dirs.append(pack_dir / "images_cta")
+    dirs.append(pack_dir / "images_norm")
     dirs.append(pack_dir / "images")
 
     for d in dirs:
@@ -32,6 +39,14 @@ def pick_image(pack_dir: Path, idx: int, use_cta: bool) -> Path | None:
     return None
 
 
+def wav_seconds(path: Path) -> float | None:
+    try:
+        with wave.open(str(path), "rb") as w:
+            return w.getnframes() / float(w.getframerate())
+    except (OSError, EOFError, wave.Error):
+        return None
+
+
 def build_one(ffmpeg: str, image: Path, audio: Path, out: Path):
     out.parent.mkdir(parents=True, exist_ok=True)
     cmd = [
@@ -58,13 +73,27 @@ def build_one(ffmpeg: str, image: Path, audio: Path, out: Path):
         "+faststart",
         str(out),
     ]
-    subprocess.run(cmd, check=True)
+    traced_run(
+        cmd,
+        name="ffmpeg.encode",
+        attrs={"output": out.name, "output_seconds": wav_seconds(audio)},
+        check=True,
+    )
 
 
-def concat_all(ffmpeg: str, vdir: Path, outputs: list[Path], combined: Path):
+def concat_all(
+    ffmpeg: str,
+    vdir: Path,
+    outputs: list[Path],
+    combined: Path,
+    narration: Path | None = None,
+):
     # Write list file for concat demuxer
     list_path = vdir / "list.txt"
     with list_path.open("w", encoding="utf-8") as f:
+        if narration:
+            # A concat-demuxer comment; tools/verify_outputs.py reads it back
+            f.write(f"{NARRATION_COMMENT}{narration.resolve()}\n")
         for p in outputs:
             f.write(f"file '{p.name}'\n")
 
@@ -77,15 +106,29 @@ def concat_all(ffmpeg: str, vdir: Path, outputs: list[Path], combined: Path):
         "0",
         "-i",
         str(list_path),
-        "-c",
-        "copy",
-        str(combined),
     ]
-    subprocess.run(cmd, check=True)
+    if narration:
+        # Mux the external track now rather than re-muxing combined.mp4 after
+        cmd += ["-i", str(narration), "-map", "0:v:0", "-map", "1:a:0", "-c:v", "copy"]
+        cmd += audio_args(narration) + ["-shortest", "-movflags", "+faststart"]
+    else:
+        cmd += ["-c", "copy"]
+    cmd.append(str(combined))
+    traced_run(
+        cmd,
+        name="ffmpeg.concat",
+        attrs={
+            "clips": len(outputs),
+            "narration": narration.name if narration else None,
+        },
+        check=True,
+    )
 
 
-def assemble(pack_id: str, use_cta: bool):
+def assemble(pack_id: str, use_cta: bool, narration: Path | None = None):
     ffmpeg = ffmpeg_or_die()
+    if narration and not narration.exists():
+        raise SystemExit(f"❌ Narration track not found: {narration}")
     pack_dir = Path("content") / pack_id
     narr_dir = pack_dir / "narration"
     vdir = pack_dir / "video"
@@ -116,7 +159,7 @@ def assemble(pack_id: str, use_cta: bool):
 
     combined = vdir / "combined.mp4"
     print(f"📼 Concatenating {len(outputs)} clips into {combined.name}")
-    concat_all(ffmpeg, vdir, outputs, combined)
+    concat_all(ffmpeg, vdir, outputs, combined, narration)
     print("✅ Video assembly complete.")
 
 
@@ -130,8 +173,15 @@ def main():
         action="store_true",
         help="Use CTA overlays instead of raw images if available",
     )
+    ap.add_argument(
+        "--narration",
+        type=Path,
+        help="External narration track (e.g. content/<pack>/narration.mp3) to use as "
+        "combined.mp4's audio; muxed while concatenating, no separate merge pass",
+    )
     args = ap.parse_args()
-    assemble(args.pack_id, use_cta=args.use_cta)
+    with span("assemble_videos", pack=args.pack_id):
+        assemble(args.pack_id, use_cta=args.use_cta, narration=args.narration)
 
 
 if __name__ == "__main__":
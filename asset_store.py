@@ -0,0 +1,192 @@
+# asset_store.py
+"""Content-addressed blob store shared by all packs.
+
+Seeded images, CTA copies, fallbacks and synced pack YAMLs are stored once
+under .store/sha256/<ab>/<sha256> and placed into each pack as hardlinks
+(reflink or plain copy when the filesystem can't link), so seeding or
+syncing many packs costs directory entries rather than bytes.
+
+Linked files share their bytes with the store: anything that rewrites a
+pack file must replace it (write a temp file, os.replace) rather than
+open it for writing in place. ``verify`` catches blobs that were modified.
+
+    python asset_store.py stats
+    python asset_store.py gc [--min-age SECONDS] [--dry-run]   # drop blobs no pack links to
+    python asset_store.py verify
+"""
+import argparse
+import errno
+import os
+import shutil
+import time
+from pathlib import Path
+
+from fsutil import file_sha256
+
+try:
+    import fcntl
+except ImportError:  # Windows: no reflinks
+    fcntl = None
+
+ROOT = Path(__file__).resolve().parent
+STORE_DIR = Path(os.getenv("ASSET_STORE_DIR", str(ROOT / ".store")))
+LINK_MODE = os.getenv("ASSET_LINK_MODE", "hardlink")  # hardlink | reflink | copy
+FICLONE = 0x40049409  # Linux ioctl: share extents (btrfs, xfs, bcachefs)
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "reflink not supported")
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            os.unlink(dst)
+            raise
+
+
+class AssetStore:
+    def __init__(self, root=STORE_DIR, mode: str = LINK_MODE):
+        self.root = Path(root)
+        self.mode = mode
+
+    def blob_path(self, sha: str) -> Path:
+        return self.root / "sha256" / sha[:2] / sha
+
+    def put(self, src) -> str:
+        """Add ``src``'s bytes to the store (once); returns their sha256."""
+        sha = file_sha256(src)
+        blob = self.blob_path(sha)
+        if not blob.exists():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_name(f".{sha}.{os.getpid()}.tmp")
+            shutil.copyfile(src, tmp)
+            os.replace(tmp, blob)
+        return sha
+
+    def link_into(self, sha: str, dst) -> str:
+        """Point ``dst`` at blob ``sha``; returns how: same, hardlink, reflink or copy."""
+        blob = self.blob_path(sha)
+        dst = Path(dst)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if os.path.samefile(blob, dst):
+                return "same"
+        except OSError:
+            pass
+        # Build next to dst and swap in, so an existing dst (maybe itself a
+        # link to another blob) is replaced rather than written through
+        tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+        how = self.mode
+        if how == "hardlink":
+            try:
+                os.link(blob, tmp)
+            except OSError:  # other filesystem, link limit, no permission
+                how = "reflink"
+        if how == "reflink":
+            try:
+                _reflink(blob, tmp)
+            except OSError:
+                how = "copy"
+        if how == "copy":
+            shutil.copyfile(blob, tmp)
+        os.replace(tmp, dst)
+        return how
+
+    def place(self, src, dst) -> str:
+        """Put ``src`` in the store and link it at ``dst`` (the copy2 replacement)."""
+        return self.link_into(self.put(src), dst)
+
+    def blobs(self):
+        yield from (
+            p for p in self.root.glob("sha256/*/*") if not p.name.startswith(".")
+        )
+
+    def gc(self, min_age: float = 3600, dry_run: bool = False) -> tuple[int, int]:
+        """Delete blobs nothing links to any more; returns (blobs, bytes) freed.
+
+        A hardlinked blob's link count says whether a pack still uses it.
+        Copied/reflinked placements don't need the blob, so those go too.
+        ``min_age`` spares blobs put moments ago and not yet linked.
+        """
+        now = time.time()
+        freed = size = 0
+        for blob in self.blobs():
+            st = blob.stat()
+            if st.st_nlink > 1 or now - st.st_mtime < min_age:
+                continue
+            if not dry_run:
+                blob.unlink()
+            freed += 1
+            size += st.st_size
+        for tmp in self.root.glob("sha256/*/.*.tmp"):
+            if now - tmp.stat().st_mtime > min_age and not dry_run:
+                tmp.unlink()
+        return freed, size
+
+    def verify(self) -> list[Path]:
+        """Blobs whose bytes no longer match their name (written through a link)."""
+        return [b for b in self.blobs() if file_sha256(b) != b.name]
+
+    def stats(self) -> dict:
+        blobs = linked = size = saved = 0
+        for blob in self.blobs():
+            st = blob.stat()
+            blobs += 1
+            size += st.st_size
+            if st.st_nlink > 1:
+                linked += 1
+                # Links beyond the first pack copy
+                saved += st.st_size * (st.st_nlink - 2)
+        return {"blobs": blobs, "linked": linked, "bytes": size, "bytes_saved": saved}
+
+
+_default = None
+
+
+def place(src, dst) -> str:
+    """Store ``src`` and link it at ``dst`` using the default store."""
+    global _default
+    if _default is None:
+        _default = AssetStore()
+    return _default.place(src, dst)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Shared content-addressed asset store.")
+    ap.add_argument("--root", type=Path, default=STORE_DIR)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats", help="Blob count and space saved")
+    p = sub.add_parser("gc", help="Delete blobs no pack links to")
+    p.add_argument(
+        "--min-age",
+        type=float,
+        default=3600,
+        help="Keep blobs younger than this (seconds)",
+    )
+    p.add_argument("--dry-run", action="store_true")
+    sub.add_parser("verify", help="Re-hash blobs and report any that changed")
+    args = ap.parse_args()
+
+    store = AssetStore(args.root)
+    if args.cmd == "stats":
+        s = store.stats()
+        print(
+            f"blobs: {s['blobs']}  linked: {s['linked']}  "
+            f"size: {s['bytes'] / 1e6:.1f} MB  saved by links: {s['bytes_saved'] / 1e6:.1f} MB"
+        )
+    elif args.cmd == "gc":
+        freed, size = store.gc(args.min_age, args.dry_run)
+        verb = "Would free" if args.dry_run else "Freed"
+        print(f"🧹 {verb} {freed} blob(s), {size / 1e6:.1f} MB")
+    else:
+        bad = store.verify()
+        for blob in bad:
+            print(f"❌ Modified in place: {blob}")
+        print(f"{'✅' if not bad else '❌'} {len(bad)} corrupt blob(s)")
+        raise SystemExit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
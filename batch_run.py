@@ -5,9 +5,12 @@ import os
 import sys
 from datetime import datetime
 
+from profiling import PROFILERS, parse_steps, profiled
+
 DEFAULT_CONTENT_DIR = "content"
 DEFAULT_EXPORT_DIR = "exports"
 VALID_IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+PROFILE_STEP_NAMES = ("load_metadata", "validate_pack", "simulate_export")
 
 
 def setup_logging(verbose: bool):
@@ -162,11 +165,28 @@ def main():
     parser.add_argument(
         "--fail-on-warn", action="store_true", help="Treat warnings as failures"
     )
+    parser.add_argument(
+        "--profile",
+        default="",
+        metavar="STEP[,STEP]",
+        help=f"Profile these steps ({','.join(PROFILE_STEP_NAMES)}); "
+        "output goes to logs/run_<RUN_ID>/profile/",
+    )
+    parser.add_argument(
+        "--profiler",
+        choices=PROFILERS,
+        default="cprofile",
+        help="Profiler for --profile",
+    )
     args = parser.parse_args()
 
     setup_logging(args.verbose)
     only_set = parse_csv_set(args.only)
     skip_set = parse_csv_set(args.skip)
+    profile = parse_steps(args.profile)
+    unknown = profile.difference(PROFILE_STEP_NAMES)
+    if unknown:
+        parser.error(f"unknown --profile step(s): {', '.join(sorted(unknown))}")
 
     content_dir = args.content_dir
     export_dir = args.export_dir
@@ -185,13 +205,19 @@ def main():
             continue
 
         pack_path = os.path.join(content_dir, pack_name)
-        metadata, meta_err = load_metadata(pack_path)
+        with profiled(
+            "load_metadata", profile, args.profiler, f"load_metadata_{pack_name}"
+        ):
+            metadata, meta_err = load_metadata(pack_path)
         if meta_err:
             logging.warning(f"{pack_name}: {meta_err}")
             summary.append((pack_name, "NO METADATA"))
             continue
 
-        check = validate_pack(content_dir, pack_name, metadata)
+        with profiled(
+            "validate_pack", profile, args.profiler, f"validate_pack_{pack_name}"
+        ):
+            check = validate_pack(content_dir, pack_name, metadata)
         for w in check["warnings"]:
             logging.warning(f"{pack_name}: {w}")
         for e in check["errors"]:
@@ -211,7 +237,10 @@ def main():
             summary.append((pack_name, "DRY-RUN OK"))
             continue
 
-        outfile = simulate_export(export_dir, pack_name, metadata)
+        with profiled(
+            "simulate_export", profile, args.profiler, f"simulate_export_{pack_name}"
+        ):
+            outfile = simulate_export(export_dir, pack_name, metadata)
         logging.info(f"{pack_name}: Exported -> {outfile}")
         summary.append((pack_name, "EXPORTED"))
 
@@ -1,8 +1,9 @@
 import os
 
-import yaml
 from PIL import Image, ImageDraw, ImageFont
 
+from pack_config import load_yaml
+
 
 def slugify(name):
     return name.lower().replace(" ", "_").replace("-", "_")
@@ -31,8 +32,7 @@ def generate_images(pack_id):
         print(f"⚠️ Missing input.yaml for pack '{pack_id}'")
         return
 
-    with open(input_file) as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(input_file)
 
     products = data.get("products", [])
     if not products:
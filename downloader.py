@@ -0,0 +1,191 @@
+# downloader.py
+"""Resumable HTTP downloads: <dest>.part + Range resume + verify + atomic rename.
+
+A dropped connection keeps what was already received; the next attempt (or
+the next run) asks for ``Range: bytes=<part size>-``. ``If-Range`` with the
+ETag/Last-Modified of the first response makes the server send the whole
+file again if it changed in between, instead of splicing two versions.
+
+    python downloader.py URL DEST [--sha256 HEX] [--size N]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+from instrument import span
+
+CHUNK_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(1 << 20)))
+CONTENT_RANGE_RE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+
+class DownloadError(RuntimeError):
+    pass
+
+
+def _read_meta(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _hash_file(path: Path, h) -> None:
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+
+
+def download(
+    url: str,
+    dest,
+    session=None,
+    chunk_size: int = CHUNK_SIZE,
+    expected_size: int | None = None,
+    sha256: str | None = None,
+    timeout: float = 30.0,
+    retries: int = 5,
+    headers: dict | None = None,
+    progress=None,
+) -> dict:
+    """Download ``url`` to ``dest``.
+
+    Returns {path, bytes, sha256, content_type, resumed}.
+
+    ``progress(new_bytes, total_or_None)`` is called after each chunk.
+    Raises DownloadError if the size or checksum does not match.
+    """
+    import requests
+
+    http = session or requests
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    part = dest.with_name(dest.name + ".part")
+    meta_path = dest.with_name(dest.name + ".part.json")
+    meta = _read_meta(meta_path) if part.exists() else {}
+    resumed = False
+
+    with span("http.get", url=url) as a:
+        for attempt in range(retries + 1):
+            have = part.stat().st_size if part.exists() else 0
+            h = None
+            req_headers = dict(headers or {})
+            if have and meta.get("validator"):
+                req_headers["Range"] = f"bytes={have}-"
+                req_headers["If-Range"] = meta["validator"]
+            try:
+                with http.get(
+                    url, headers=req_headers, stream=True, timeout=timeout
+                ) as r:
+                    if r.status_code == 416 and have:
+                        # Nothing left to send: .part is already whole (checked below)
+                        total = meta.get("total")
+                        break
+                    r.raise_for_status()
+                    if r.status_code == 206:
+                        m = CONTENT_RANGE_RE.match(r.headers.get("Content-Range", ""))
+                        if not m or int(m.group(1)) != have:
+                            cr = r.headers.get("Content-Range")
+                            raise DownloadError(f"Bad Content-Range for resume: {cr}")
+                        total = int(m.group(3)) if m.group(3) != "*" else None
+                        mode = "ab"
+                        resumed = True
+                    else:
+                        length = r.headers.get("Content-Length")
+                        total = (
+                            int(length)
+                            if length and "Content-Encoding" not in r.headers
+                            else None
+                        )
+                        mode = "wb"
+                        have = 0
+                    meta = {
+                        "url": url,
+                        "validator": r.headers.get("ETag")
+                        or r.headers.get("Last-Modified"),
+                        "total": total,
+                        "content_type": r.headers.get(
+                            "Content-Type", meta.get("content_type", "")
+                        ),
+                    }
+                    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+                    h = hashlib.sha256()
+                    if mode == "ab":
+                        _hash_file(part, h)
+                    with open(part, mode) as f:
+                        for chunk in r.iter_content(chunk_size=chunk_size):
+                            f.write(chunk)
+                            h.update(chunk)
+                            a["bytes_in"] = a.get("bytes_in", 0) + len(chunk)
+                            if progress:
+                                progress(len(chunk), total)
+                        f.flush()
+                        os.fsync(f.fileno())
+                break
+            except (
+                requests.ConnectionError,
+                requests.Timeout,
+                requests.exceptions.ChunkedEncodingError,
+            ) as e:
+                if attempt == retries:
+                    raise DownloadError(
+                        f"{url}: {e} (partial data kept in {part})"
+                    ) from e
+                time.sleep(min(30.0, 2**attempt))
+
+        size = part.stat().st_size
+        want = expected_size if expected_size is not None else total
+        if want is not None and size != want:
+            part.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            raise DownloadError(f"{url}: got {size} bytes, expected {want}")
+        if h is None:
+            h = hashlib.sha256()
+            _hash_file(part, h)
+        digest = h.hexdigest()
+        if sha256 and digest != sha256.lower():
+            part.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            raise DownloadError(f"{url}: sha256 {digest} != {sha256}")
+        os.replace(part, dest)
+        meta_path.unlink(missing_ok=True)
+        a.update(resumed=resumed, size=size)
+
+    return {
+        "path": str(dest),
+        "bytes": size,
+        "sha256": digest,
+        "content_type": meta.get("content_type", ""),
+        "resumed": resumed,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Resumable download with size/sha256 verification."
+    )
+    ap.add_argument("url")
+    ap.add_argument("dest")
+    ap.add_argument("--sha256", help="Expected sha256 hex digest")
+    ap.add_argument("--size", type=int, help="Expected size in bytes")
+    ap.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = ap.parse_args()
+    res = download(
+        args.url,
+        args.dest,
+        chunk_size=args.chunk_size,
+        expected_size=args.size,
+        sha256=args.sha256,
+    )
+    resumed = ", resumed" if res["resumed"] else ""
+    print(
+        f"✅ {res['path']} ({res['bytes']} bytes, "
+        f"sha256 {res['sha256'][:12]}…{resumed})"
+    )
+
+
+if __name__ == "__main__":
+    main()
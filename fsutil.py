@@ -0,0 +1,67 @@
+# fsutil.py
+"""Small file helpers shared by the pipeline, the scheduler and the admin GUI.
+
+Kept free of imports from the rest of the repo so any module can use it.
+"""
+import hashlib
+import os
+import secrets
+from pathlib import Path
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Replace ``path`` with ``text`` (temp file, fsync, rename, fsync the dir).
+
+    Readers see the old or the new content, never a partial write, and a
+    file hardlinked elsewhere (the asset store) is replaced, not written through.
+    The file keeps its permissions; a new one gets the umask default, as
+    with open().
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{secrets.token_hex(4)}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    try:
+        dfd = os.open(path.parent, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dfd)
+    except OSError:
+        pass
+    finally:
+        os.close(dfd)
+
+
+def is_stale(src, dst) -> bool:
+    """True if ``dst`` is missing or was built from an older ``src``.
+
+    A hardlink of ``src`` (asset store placement) is always current.
+    """
+    try:
+        if os.path.samefile(src, dst):
+            return False
+        return os.stat(dst).st_mtime_ns < os.stat(src).st_mtime_ns
+    except FileNotFoundError:
+        return True
+
+
+def file_sha256(path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
 import argparse
-import shutil
 from pathlib import Path
 
+from asset_store import place
+from fsutil import is_stale
+
 
 def generate_cta_images(pack_id: str):
     base = Path("content") / pack_id
-    images_dir = base / "images"
+    images_dir = base / "images_norm"  # normalized by normalize_images.py
+    if not images_dir.is_dir():
+        images_dir = base / "images"
     overlays_dir = base / "cta_overlays"
 
     if not images_dir.is_dir():
@@ -15,20 +19,20 @@ def generate_cta_images(pack_id: str):
 
     overlays_dir.mkdir(parents=True, exist_ok=True)
 
-    existing = list(overlays_dir.glob("*.jpg")) + list(overlays_dir.glob("*.png"))
-    if existing:
-        print(f"CTA overlays present for {pack_id}: {len(existing)} file(s).")
-        return
-
-    count = 0
+    count = current = 0
     for src in sorted(images_dir.glob("*")):
         if src.suffix.lower() in {".jpg", ".jpeg", ".png"} and src.is_file():
             dst = overlays_dir / src.name
-            if not dst.exists():
-                shutil.copy2(src, dst)
+            # Redo overlays made from an older image (e.g. before normalization)
+            if is_stale(src, dst):
+                place(src, dst)
                 count += 1
+            else:
+                current += 1
 
-    print(f"✅ Created {count} CTA overlay(s) for {pack_id}")
+    print(
+        f"✅ Created {count} CTA overlay(s) for {pack_id} ({current} already current)"
+    )
 
 
 def main():
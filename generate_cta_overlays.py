@@ -1,9 +1,16 @@
 # generate_cta_overlays.py
+from __future__ import annotations
+
 import argparse
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+from fsutil import is_stale
+from instrument import span
+from pack_config import load_yaml as _load_yaml
 
-import yaml
-from PIL import Image, ImageDraw, ImageFont
+if TYPE_CHECKING:  # PIL is imported where it is used so --help stays fast
+    from PIL import Image, ImageFont
 
 DEFAULT_TEXT = "Shop Now"
 DEFAULT_TEXT_COLOR = "#FFFFFF"
@@ -14,11 +21,12 @@ DEFAULT_BAR_HEIGHT_FRAC = 0.18  # 18% of height
 
 
 def load_yaml(path: Path) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+    return _load_yaml(path) or {}
 
 
 def find_font(size: int) -> ImageFont.FreeTypeFont:
+    from PIL import ImageFont
+
     # Try a few common macOS/system fonts; fall back to default bitmap
     font_paths = [
         "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
@@ -44,6 +52,8 @@ def draw_cta(
     margin: int,
     bar_height_frac: float,
 ) -> Image.Image:
+    from PIL import Image, ImageDraw
+
     w, h = img.size
     overlay = Image.new("RGBA", (w, h), (0, 0, 0, 0))
     draw = ImageDraw.Draw(overlay)
@@ -93,12 +103,15 @@ def process_pack(
     bar_height_frac: float,
     overwrite: bool,
 ):
+    from PIL import Image
+
     pack_dir = Path("content") / pack_id
     yaml_path = pack_dir / "input.yaml"
     data = load_yaml(yaml_path)
     products = data.get("products") or []
 
     src_dir = pack_dir / "images"
+    norm_dir = pack_dir / "images_norm"  # from normalize_images.py, already frame-sized
     out_dir = pack_dir / "images_cta"
     out_dir.mkdir(parents=True, exist_ok=True)
 
@@ -108,17 +121,20 @@ def process_pack(
         image_name = product.get("image")
         if not image_name:
             continue
-        src_path = src_dir / image_name
+        src_path = norm_dir / image_name
+        if not src_path.exists():
+            src_path = src_dir / image_name
         if not src_path.exists():
             print(f"⚠️ Missing source image: {src_path}")
             continue
 
         dst_path = out_dir / image_name
-        if dst_path.exists() and not overwrite:
+        # Rebuilt when the source is newer, e.g. images_norm/ was (re)generated
+        if not overwrite and not is_stale(src_path, dst_path):
             skipped += 1
             continue
 
-        with Image.open(src_path) as im:
+        with span("overlay.image", image=image_name), Image.open(src_path) as im:
             out = draw_cta(
                 im, text, text_color, bar_color, bar_alpha, margin, bar_height_frac
             )
@@ -173,16 +189,17 @@ def main():
     )
     args = ap.parse_args()
 
-    process_pack(
-        args.pack_id,
-        args.text,
-        args.text_color,
-        args.bar_color,
-        args.bar_alpha,
-        args.margin,
-        args.bar_height_frac,
-        args.overwrite,
-    )
+    with span("generate_cta_overlays", pack=args.pack_id):
+        process_pack(
+            args.pack_id,
+            args.text,
+            args.text_color,
+            args.bar_color,
+            args.bar_alpha,
+            args.margin,
+            args.bar_height_frac,
+            args.overwrite,
+        )
 
 
 if __name__ == "__main__":
@@ -1,16 +1,16 @@
 import os
 
-import yaml
 from PIL import Image, ImageDraw
 
+from pack_config import load_yaml
+
 
 def generate_images(pack_id):
     input_path = f"content/{pack_id}/input.yaml"
     output_dir = f"content/{pack_id}/images"
     os.makedirs(output_dir, exist_ok=True)
 
-    with open(input_path, "r") as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(input_path)
 
     for product in data["products"]:
         img_path = os.path.join(output_dir, product["image"])
@@ -21,10 +21,16 @@ def generate_images(pack_id):
 
         # Optional: Customize font size and layout
         draw.text((20, 220), title, fill="black")
-        img.save(img_path)
+        # Save then swap in: the old file may be a hardlink into the asset store
+        tmp = os.path.join(output_dir, f".tmp_{product['image']}")
+        img.save(tmp)
+        os.replace(tmp, img_path)
 
         print(f"🖼️ Generated: {img_path}")
 
 
-# 👇 Run for your current pack
-generate_images("003_affiliate_airfryer")
+if __name__ == "__main__":
+    import sys
+
+    # 👇 Defaults to the original sample pack when no pack_id is given
+    generate_images(sys.argv[1] if len(sys.argv) > 1 else "003_affiliate_airfryer")
@@ -3,15 +3,14 @@ import argparse
 import os
 from pathlib import Path
 
-import yaml
+from pack_config import load_yaml as _load_yaml
 
 
 def load_yaml(path):
     if not os.path.isfile(path):
         print(f"❌ Missing input.yaml: {path}")
         return {}
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    return _load_yaml(path)
 
 
 def synthesize_narration(text: str, output_path: Path):
@@ -0,0 +1,323 @@
+# image_index.py
+"""Catalogue-wide index of image hashes for spotting duplicate pack images.
+
+Every image gets an exact hash (sha256 of the bytes) and a perceptual one
+(64-bit dHash), computed once and kept in .cache/image_index.sqlite keyed
+by path and reused while the file's (mtime_ns, size) is unchanged. The
+index also remembers which download URL produced which bytes, so
+images_auto can reuse a file instead of fetching the same URL again.
+
+    python image_index.py scan                  # index content/ and packs/
+    python image_index.py dups                  # exact duplicates
+    python image_index.py dups --distance 6     # near-duplicates too
+    python image_index.py dups --hardlink       # replace exact copies with hardlinks
+    python image_index.py stats
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from fsutil import file_sha256
+from instrument import span
+
+ROOT = Path(__file__).resolve().parent
+INDEX_PATH = Path(
+    os.getenv("IMAGE_INDEX_PATH", str(ROOT / ".cache" / "image_index.sqlite"))
+)
+SCAN_ROOTS = ("content", "packs")
+IMG_EXTS = {".jpg", ".jpeg", ".png"}
+# dHash bits that may differ for two images to count as the same visual
+DEFAULT_DISTANCE = int(os.getenv("IMAGE_DEDUP_DISTANCE", "6"))
+# Near-duplicate lookups bucket the 64-bit dHash by byte: two hashes at most
+# BANDS - 1 bits apart agree on at least one byte, so only images sharing a
+# byte with the query need comparing. Wider distances fall back to a full scan.
+BANDS = 8
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL, dhash TEXT
+);
+CREATE INDEX IF NOT EXISTS images_sha ON images (sha256);
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY, sha256 TEXT NOT NULL, fetched REAL NOT NULL
+);
+"""
+SCHEMA += "".join(
+    f"CREATE INDEX IF NOT EXISTS images_dh{i} ON images "
+    f"(substr(dhash, {2 * i + 1}, 2));\n"
+    for i in range(BANDS)
+)
+
+
+def dhash(path, hash_size: int = 8) -> int:
+    """Difference hash: 1 bit per horizontally adjacent pixel pair of a tiny greyscale copy."""
+    from PIL import Image
+
+    with Image.open(path) as im:
+        im.draft("L", (hash_size * 8, hash_size * 8))
+        small = im.convert("L").resize(
+            (hash_size + 1, hash_size), Image.Resampling.BILINEAR
+        )
+        px = small.tobytes()
+    bits = 0
+    for row in range(hash_size):
+        base = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (px[base + col] > px[base + col + 1])
+    return bits
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def bands(dh: int) -> list[str]:
+    """The dHash's bytes as the hex pairs stored in the index (band i = byte i)."""
+    h = f"{dh:016x}"
+    return [h[2 * i : 2 * i + 2] for i in range(BANDS)]
+
+
+def _key(path) -> str:
+    p = Path(path).resolve()
+    try:
+        return str(p.relative_to(ROOT))
+    except ValueError:
+        return str(p)
+
+
+def _abs(key: str) -> Path:
+    p = Path(key)
+    return p if p.is_absolute() else ROOT / p
+
+
+class ImageIndex:
+    def __init__(self, db_path=INDEX_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.row_factory = sqlite3.Row
+        return conn
+
+    def record(self, path) -> dict | None:
+        """Hashes for ``path``, computed only if the file changed since last seen."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = _key(path)
+        conn = self._conn()
+        row = conn.execute("SELECT * FROM images WHERE path = ?", (key,)).fetchone()
+        if row and row["mtime_ns"] == st.st_mtime_ns and row["size"] == st.st_size:
+            return self._row(row)
+        with span("image_index.hash", image=Path(path).name, bytes_hashed=st.st_size):
+            sha = file_sha256(path)
+            try:
+                dh = f"{dhash(path):016x}"
+            except (ImportError, OSError):  # no Pillow, or not a decodable image
+                dh = None
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?)",
+                (key, st.st_mtime_ns, st.st_size, sha, dh),
+            )
+        return {"path": key, "sha256": sha, "dhash": int(dh, 16) if dh else None}
+
+    @staticmethod
+    def _row(row) -> dict:
+        return {
+            "path": row["path"],
+            "sha256": row["sha256"],
+            "dhash": int(row["dhash"], 16) if row["dhash"] else None,
+        }
+
+    def scan(self, roots=SCAN_ROOTS) -> int:
+        """Index every image under ``roots`` and forget files that are gone."""
+        seen = 0
+        for root in roots:
+            for dirpath, _, files in os.walk(
+                ROOT / root if not os.path.isabs(root) else root
+            ):
+                for fn in files:
+                    if Path(fn).suffix.lower() in IMG_EXTS:
+                        self.record(Path(dirpath) / fn)
+                        seen += 1
+        conn = self._conn()
+        gone = [
+            r["path"]
+            for r in conn.execute("SELECT path FROM images")
+            if not _abs(r["path"]).exists()
+        ]
+        with conn:
+            conn.executemany("DELETE FROM images WHERE path = ?", [(p,) for p in gone])
+        return seen
+
+    def paths_for_sha(self, sha: str) -> list[Path]:
+        rows = self._conn().execute("SELECT path FROM images WHERE sha256 = ?", (sha,))
+        return [p for p in (_abs(r["path"]) for r in rows) if p.exists()]
+
+    def similar(
+        self, dh: int, max_distance: int = DEFAULT_DISTANCE
+    ) -> list[tuple[int, str]]:
+        """(distance, path) of images within ``max_distance`` dHash bits, nearest first."""
+        sql = "SELECT path, dhash FROM images WHERE dhash IS NOT NULL"
+        args = []
+        if max_distance < BANDS:
+            # Indexed: only rows sharing at least one dHash byte with ``dh``
+            sql = "SELECT path, dhash FROM images WHERE " + " OR ".join(
+                f"substr(dhash, {2 * i + 1}, 2) = ?" for i in range(BANDS)
+            )
+            args = bands(dh)
+        out = []
+        for r in self._conn().execute(sql, args):
+            d = hamming(dh, int(r["dhash"], 16))
+            if d <= max_distance:
+                out.append((d, r["path"]))
+        return sorted(out)
+
+    def path_for_url(self, url: str) -> Path | None:
+        """A local file holding the bytes previously downloaded from ``url``, if any."""
+        row = (
+            self._conn()
+            .execute("SELECT sha256 FROM urls WHERE url = ?", (url,))
+            .fetchone()
+        )
+        if row is None:
+            return None
+        for p in self.paths_for_sha(row["sha256"]):
+            # Only trust it if the file still has those bytes
+            rec = self.record(p)
+            if rec and rec["sha256"] == row["sha256"]:
+                return p
+        return None
+
+    def remember_url(self, url: str, sha: str) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO urls VALUES (?, ?, ?)", (url, sha, time.time())
+            )
+
+    def duplicates(self, max_distance: int = 0) -> list[list[str]]:
+        """Groups of paths: identical bytes, or (distance > 0) near-identical dHash."""
+        rows = [
+            self._row(r)
+            for r in self._conn().execute("SELECT * FROM images ORDER BY path")
+        ]
+        # Compare each image only with those sharing its sha256 or a dHash band
+        buckets = {}
+        for i, r in enumerate(rows):
+            buckets.setdefault(r["sha256"], []).append(i)
+            if max_distance and r["dhash"] is not None and max_distance < BANDS:
+                for band, value in enumerate(bands(r["dhash"])):
+                    buckets.setdefault((band, value), []).append(i)
+        groups, placed = [], set()
+        for i, a in enumerate(rows):
+            if a["path"] in placed:
+                continue
+            candidates = set(buckets[a["sha256"]])
+            if max_distance and a["dhash"] is not None:
+                if max_distance < BANDS:
+                    for band, value in enumerate(bands(a["dhash"])):
+                        candidates.update(buckets[(band, value)])
+                else:
+                    candidates.update(range(i + 1, len(rows)))
+            group = [a["path"]]
+            for j in sorted(c for c in candidates if c > i):
+                b = rows[j]
+                if b["path"] in placed:
+                    continue
+                same = a["sha256"] == b["sha256"]
+                if (
+                    not same
+                    and max_distance
+                    and a["dhash"] is not None
+                    and b["dhash"] is not None
+                ):
+                    same = hamming(a["dhash"], b["dhash"]) <= max_distance
+                if same:
+                    group.append(b["path"])
+            if len(group) > 1:
+                placed.update(group)
+                groups.append(group)
+        return groups
+
+    def hardlink_duplicates(self) -> tuple[int, int]:
+        """Replace byte-identical copies with hardlinks to one file; returns (linked, bytes saved)."""
+        linked = saved = 0
+        for group in self.duplicates(0):
+            keep = _abs(group[0])
+            for other in map(_abs, group[1:]):
+                try:
+                    if os.path.samefile(keep, other):
+                        continue
+                    size = other.stat().st_size
+                    tmp = other.with_name(f".{other.name}.{os.getpid()}.link")
+                    os.link(keep, tmp)
+                    os.replace(tmp, other)
+                except OSError as e:  # different filesystem, permissions...
+                    print(f"⚠️ Could not link {other}: {e}")
+                    continue
+                self.record(other)
+                linked += 1
+                saved += size
+        return linked, saved
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Catalogue-wide image hash index and duplicate finder."
+    )
+    ap.add_argument("--db", type=Path, default=INDEX_PATH, help="Index database")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("scan", help="Index images (incremental)")
+    p.add_argument("roots", nargs="*", default=list(SCAN_ROOTS))
+    p = sub.add_parser(
+        "dups", help="List duplicate groups (scans content/ and packs/ first)"
+    )
+    p.add_argument(
+        "--distance", type=int, default=0, help="Max dHash bits apart (0 = exact only)"
+    )
+    p.add_argument(
+        "--hardlink",
+        action="store_true",
+        help="Hardlink byte-identical copies to save disk",
+    )
+    sub.add_parser("stats", help="Index size")
+    args = ap.parse_args()
+
+    index = ImageIndex(args.db)
+    if args.cmd == "scan":
+        print(f"✅ Indexed {index.scan(args.roots)} image(s)")
+    elif args.cmd == "dups":
+        index.scan()
+        groups = index.duplicates(args.distance)
+        for group in groups:
+            print(f"🔁 {len(group)} × {group[0]}")
+            for path in group[1:]:
+                print(f"     {path}")
+        print(f"{len(groups)} duplicate group(s)")
+        if args.hardlink:
+            linked, saved = index.hardlink_duplicates()
+            print(f"🔗 Hardlinked {linked} file(s), {saved / 1e6:.1f} MB saved")
+    else:
+        conn = index._conn()
+        n = conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT sha256) FROM images"
+        ).fetchone()
+        urls = conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+        print(f"images: {n[0]}  distinct: {n[1]}  urls: {urls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# instrument.py
+"""Lightweight per-step spans written to logs/run_<RUN_ID>/trace.jsonl.
+
+Every process of a run (run_pipeline and the step scripts it launches) shares
+RUN_ID through the environment, so all spans land in one trace file. Set
+PIPELINE_TRACE=0 to turn tracing off.
+"""
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = Path(__file__).resolve().parent
+LOGS_DIR = ROOT / "logs"
+TRACE_NAME = "trace.jsonl"
+# ru_maxrss is KiB on Linux, bytes on macOS
+_MAXRSS_SCALE = 1 if sys.platform == "darwin" else 1024
+
+_ids = itertools.count(1)
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+def env_run_id() -> str:
+    """This run's id, shared with child processes; generated on first use."""
+    rid = os.environ.get("RUN_ID")
+    if not rid:
+        rid = time.strftime("%Y%m%d_%H%M%S")
+        os.environ["RUN_ID"] = rid
+    return rid
+
+
+def enabled() -> bool:
+    return os.getenv("PIPELINE_TRACE", "1") not in ("0", "false", "False")
+
+
+def run_log_dir() -> Path:
+    return LOGS_DIR / f"run_{env_run_id()}"
+
+
+def trace_path() -> Path:
+    return run_log_dir() / TRACE_NAME
+
+
+def _proc_io():
+    try:
+        with open("/proc/self/io", "rb") as f:
+            fields = dict(line.split(b":", 1) for line in f.read().splitlines())
+        return int(fields[b"read_bytes"]), int(fields[b"write_bytes"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _snapshot():
+    snap = {"wall": time.perf_counter(), "io": _proc_io()}
+    if resource is not None:
+        snap["self"] = resource.getrusage(resource.RUSAGE_SELF)
+        snap["children"] = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return snap
+
+
+def _delta(a, b) -> dict:
+    out = {"wall_s": round(b["wall"] - a["wall"], 6)}
+    if "self" in a:
+        s0, s1, c0, c1 = a["self"], b["self"], a["children"], b["children"]
+        out.update(
+            cpu_user_s=round(s1.ru_utime - s0.ru_utime, 6),
+            cpu_sys_s=round(s1.ru_stime - s0.ru_stime, 6),
+            child_user_s=round(c1.ru_utime - c0.ru_utime, 6),
+            child_sys_s=round(c1.ru_stime - c0.ru_stime, 6),
+            maxrss_bytes=s1.ru_maxrss * _MAXRSS_SCALE,
+            child_maxrss_bytes=c1.ru_maxrss * _MAXRSS_SCALE,
+            child_read_bytes=(c1.ru_inblock - c0.ru_inblock) * 512,
+            child_write_bytes=(c1.ru_oublock - c0.ru_oublock) * 512,
+        )
+    if a["io"] and b["io"]:
+        out["read_bytes"] = b["io"][0] - a["io"][0]
+        out["write_bytes"] = b["io"][1] - a["io"][1]
+    return out
+
+
+def _emit(path: Path, record: dict) -> None:
+    line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+    with _write_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time a block; yields ``attrs`` so the block can add fields (bytes, cache=hit...)."""
+    if not enabled():
+        yield attrs
+        return
+    path = trace_path()  # fixes RUN_ID in the env before any child starts
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    span_id = f"{os.getpid()}-{next(_ids)}"
+    parent = stack[-1] if stack else os.getenv("TRACE_PARENT")
+    stack.append(span_id)
+    start_ts = time.time()
+    before = _snapshot()
+    status = "ok"
+    try:
+        yield attrs
+    except BaseException as e:
+        status = f"error:{type(e).__name__}"
+        raise
+    finally:
+        after = _snapshot()
+        stack.pop()
+        record = {
+            "run_id": env_run_id(),
+            "pid": os.getpid(),
+            "span": span_id,
+            "parent": parent,
+            "name": name,
+            "start": round(start_ts, 6),
+            "status": status,
+        }
+        record.update(_delta(before, after))
+        if attrs:
+            record["attrs"] = attrs
+        _emit(path, record)
+
+
+def current_span():
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+def run(cmd, name: str | None = None, attrs: dict | None = None, **kwargs):
+    """``subprocess.run`` inside a span; children see the span as TRACE_PARENT."""
+    label = name or f"subprocess:{os.path.basename(str(cmd[0]))}"
+    with span(label, argv0=os.path.basename(str(cmd[0])), **(attrs or {})) as a:
+        sid = current_span()
+        if sid is not None:
+            env = dict(kwargs.pop("env", None) or os.environ)
+            env["TRACE_PARENT"] = sid
+            kwargs["env"] = env
+        proc = subprocess.run(cmd, **kwargs)
+        a["rc"] = proc.returncode
+        return proc
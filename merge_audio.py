@@ -1,30 +1,44 @@
-import subprocess
-from pathlib import Path
+import argparse
+import sys
 
-def merge_with_audio(video_path, audio_path="narration.mp3"):
-    video_path = Path(video_path)
-    audio_path = Path(audio_path)
-    out_path = video_path.with_name(f"{video_path.stem}_with_audio.mp4")
+from utils.merge_audio import (
+    audio_args,
+    audio_codec,
+    merge_many,
+    merge_with_audio,
+    pair_inputs,
+)
 
-    subprocess.run([
-        "ffmpeg", "-y",
-        "-i", str(video_path),
-        "-i", str(audio_path),
-        "-c:v", "copy",
-        "-c:a", "aac",
-        "-shortest",
-        str(out_path)
-    ], check=True)
-
-    print(f"[OK] Merged: {out_path}")
-    return out_path
+# Kept importable from here for callers of the old single-file helper
+__all__ = ["audio_args", "audio_codec", "merge_many", "merge_with_audio"]
 
 if __name__ == "__main__":
     # 🔹 EXAMPLE USAGE:
-    # For a single video
-    merge_with_audio("Segmind Video - No Sound.mp4", "narration.mp3")
+    #   python merge_audio.py "Segmind Video - No Sound.mp4" --audio narration.mp3
+    #   python merge_audio.py clip1.mp4=voice1.mp3 clip2.mp4=voice2.mp3 --jobs 8
+    #   python merge_audio.py video/nar*.mp4 --audio-dir narration   # nar1.mp4 + nar1.wav
+    ap = argparse.ArgumentParser(
+        description="Add an audio track to MP4s (video stream copied)."
+    )
+    ap.add_argument(
+        "videos",
+        nargs="+",
+        help="VIDEO=AUDIO pairs, or videos matched to audio with the same stem",
+    )
+    ap.add_argument("--audio", help="Audio track for every video not given as a pair")
+    ap.add_argument(
+        "--audio-dir",
+        help="Where to look for same-stem audio (default: beside each video)",
+    )
+    ap.add_argument("--jobs", type=int, default=4, help="Merges to run at once")
+    args = ap.parse_args()
 
-    # For a whole folder (all MP4s without audio)
-    # Path("outputs").glob("*No Sound.mp4")
-    # for vid in Path("outputs").glob("*No Sound.mp4"):
-    #     merge_with_audio(vid)
+    try:
+        pairs = pair_inputs(args.videos, args.audio, args.audio_dir)
+    except ValueError as e:
+        ap.error(str(e))
+    results = merge_many(pairs, jobs=args.jobs)
+    failed = [(v, err) for v, out, err in results if err]
+    for v, err in failed:
+        print(f"[FAIL] {v}: {err}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,228 @@
+# normalize_images.py
+"""Convert a pack's images once to the output frame: size, RGB, even dimensions.
+
+Sources arrive as 512x512 dummies, 1024x768 fallbacks, 1280x720
+placeholders and arbitrary Amazon downloads. Each is letterboxed (``fit``)
+or centre-cropped (``fill``) to the target size, converted to 8-bit sRGB
+(through its embedded ICC profile, if it has one) and written to
+content/<pack>/images_norm/ under its original name, which the overlay
+and assembly steps prefer over images/.
+
+Results are cached in .cache/normalized by (source sha256, size, mode), so
+an unchanged image is never resized twice, across runs or packs.
+
+    python normalize_images.py 003_affiliate_airfryer
+    python normalize_images.py 003_affiliate_airfryer --size 1080x1920 --mode fill
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from fsutil import file_sha256
+from instrument import span
+
+ROOT = Path(__file__).resolve().parent
+CACHE_DIR = Path(os.getenv("NORMALIZE_CACHE_DIR", str(ROOT / ".cache" / "normalized")))
+DEFAULT_SIZE = os.getenv("NORMALIZE_SIZE", "1280x720")
+IMG_EXTS = {".jpg", ".jpeg", ".png"}
+MODES = ("fit", "fill")
+BACKGROUND = (0, 0, 0)
+JPEG_QUALITY = 95
+VERSION = 2  # bump when the conversion changes so cached results are redone
+
+
+def parse_size(value: str) -> tuple[int, int]:
+    try:
+        w, h = (int(v) for v in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {value!r}")
+    if w < 2 or h < 2:
+        raise argparse.ArgumentTypeError(f"size too small: {value}")
+    # yuv420p needs even dimensions
+    return w - w % 2, h - h % 2
+
+
+def norm_key(sha: str, size: tuple[int, int], mode: str) -> str:
+    material = f"{VERSION}:{sha}:{size[0]}x{size[1]}:{mode}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def to_srgb(im):
+    """Convert ``im`` from its embedded ICC profile to sRGB (no-op without one)."""
+    icc = im.info.get("icc_profile")
+    if not icc:
+        return im
+    from PIL import ImageCms
+
+    try:
+        profile = ImageCms.ImageCmsProfile(io.BytesIO(icc))
+        if "srgb" in ImageCms.getProfileDescription(profile).lower():
+            return im
+        mode = "RGBA" if "A" in im.getbands() else "RGB"
+        return ImageCms.profileToProfile(
+            im, profile, ImageCms.createProfile("sRGB"), outputMode=mode
+        )
+    except (ImageCms.PyCMSError, OSError, ValueError):
+        return im  # unreadable profile: treat the pixels as sRGB, as before
+
+
+def normalize_image(
+    src: Path, dst: Path, size: tuple[int, int], mode: str = "fit"
+) -> None:
+    """Resize ``src`` to exactly ``size`` (letterbox or crop) as sRGB into ``dst``."""
+    from PIL import Image, ImageOps
+
+    with Image.open(src) as im:
+        # JPEG: let the decoder downscale by 1/2..1/8 first (less to resample)
+        im.draft("RGB", (size[0], size[1]))
+        im = to_srgb(ImageOps.exif_transpose(im))
+        if im.mode in ("RGBA", "LA", "P"):
+            im = im.convert("RGBA")
+            flat = Image.new("RGB", im.size, BACKGROUND)
+            flat.paste(im, mask=im.getchannel("A"))
+            im = flat
+        else:
+            im = im.convert("RGB")
+        if mode == "fill":
+            out = ImageOps.fit(im, size, method=Image.Resampling.LANCZOS)
+        else:
+            out = ImageOps.pad(
+                im, size, method=Image.Resampling.LANCZOS, color=BACKGROUND
+            )
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    if dst.suffix.lower() in (".jpg", ".jpeg"):
+        out.save(tmp, format="JPEG", quality=JPEG_QUALITY, subsampling="4:2:0")
+    else:
+        out.save(tmp, format="PNG", compress_level=1)
+    os.replace(tmp, dst)
+
+
+def normalize_one(
+    src: Path, out_dir: Path, size, mode, cache_dir: Path = CACHE_DIR
+) -> bool:
+    """Normalize one image into out_dir; returns True if it came from the cache."""
+    key = norm_key(file_sha256(src), size, mode)
+    cached = cache_dir / key[:2] / f"{key}{src.suffix.lower()}"
+    dst = out_dir / src.name
+    with span(
+        "normalize.image", image=src.name, cache="hit" if cached.exists() else "miss"
+    ) as a:
+        if not cached.exists():
+            normalize_image(src, cached, size, mode)
+        a["src_bytes"] = src.stat().st_size
+        tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+        shutil.copyfile(cached, tmp)
+        os.replace(tmp, dst)
+    return a["cache"] == "hit"
+
+
+def normalize_pack(pack_id: str, size, mode="fit", jobs=4, force=False) -> int:
+    pack_dir = Path("content") / pack_id
+    src_dir = pack_dir / "images"
+    out_dir = pack_dir / "images_norm"
+    if not src_dir.is_dir():
+        print(f"❌ Missing images directory: {src_dir}")
+        return 1
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # Source mtime/size recorded per output: unchanged images skip even the hash
+    manifest_path = out_dir / "normalized.json"
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        manifest = {}
+    target = f"{size[0]}x{size[1]}:{mode}"
+
+    todo, unchanged = [], 0
+    for src in sorted(src_dir.iterdir()):
+        if not (src.is_file() and src.suffix.lower() in IMG_EXTS):
+            continue
+        st = src.stat()
+        stamp = [st.st_mtime_ns, st.st_size, target]
+        if (
+            not force
+            and manifest.get(src.name) == stamp
+            and (out_dir / src.name).exists()
+        ):
+            unchanged += 1
+            continue
+        todo.append((src, stamp))
+
+    hits = failed = 0
+
+    def one(item):
+        src, _ = item
+        try:
+            return normalize_one(src, out_dir, size, mode), None
+        except OSError as e:  # UnidentifiedImageError (an OSError) on junk
+            return False, e
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        for (src, stamp), (hit, err) in zip(todo, pool.map(one, todo)):
+            if err:
+                failed += 1
+                print(f"⚠️ Could not normalize {src.name}: {err}")
+                continue
+            hits += hit
+            manifest[src.name] = stamp
+
+    # Drop outputs whose source image is gone
+    for name in list(manifest):
+        if not (src_dir / name).exists():
+            (out_dir / name).unlink(missing_ok=True)
+            del manifest[name]
+    manifest_path.write_text(
+        json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8"
+    )
+
+    print(
+        f"✅ Normalized {len(todo) - failed} image(s) to {target} for {pack_id} "
+        f"({hits} from cache, {unchanged} unchanged, {failed} failed)"
+    )
+    return 1 if failed else 0
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Normalize a pack's images to the output frame size."
+    )
+    ap.add_argument("pack_id", help="Pack under content/, e.g., 003_affiliate_airfryer")
+    ap.add_argument(
+        "--size",
+        type=parse_size,
+        default=parse_size(DEFAULT_SIZE),
+        help=f"WIDTHxHEIGHT (default {DEFAULT_SIZE})",
+    )
+    ap.add_argument(
+        "--mode",
+        choices=MODES,
+        default="fit",
+        help="fit: letterbox (default); fill: centre-crop",
+    )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 4,
+        help="Images to convert at once",
+    )
+    ap.add_argument(
+        "--force",
+        action="store_true",
+        help="Redo every image (the cache is still used)",
+    )
+    args = ap.parse_args()
+
+    with span("normalize_images", pack=args.pack_id):
+        rc = normalize_pack(args.pack_id, args.size, args.mode, args.jobs, args.force)
+    raise SystemExit(rc)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# pack_config.py
+"""Shared, cached loader for pack YAML (content/<pack>/input.yaml and friends).
+
+Every pipeline step used to re-parse input.yaml with the pure-Python
+loader. This module parses with LibYAML's CSafeLoader when PyYAML was built
+with it, and caches the result:
+
+  - in memory, keyed by (path, mtime_ns, size), for repeat loads within one
+    process (callers get a deep copy, so they may modify it);
+  - on disk as a pickle in .cache/yaml, keyed by a hash of the file's
+    content, so the next step's process skips parsing too. Set
+    PACK_CONFIG_DISK_CACHE=0 to turn that off.
+
+Unpickling runs code, so pickles are only loaded from a directory and files
+owned by the current user that nobody else can write to (the directory is
+created 0700, the files 0600). Writing a new version of a file's entry
+removes the old one, and entries unused for PACK_CONFIG_CACHE_MAX_AGE_DAYS
+(default 30) are pruned once per process.
+
+The pack schema is checked when a file version is first parsed and the
+result is cached with it; ``load_pack`` raises PackConfigError if it failed.
+"""
+import copy
+import hashlib
+import os
+import pickle
+import stat
+import threading
+import time
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent
+CACHE_DIR = Path(os.getenv("PACK_CONFIG_CACHE_DIR", str(ROOT / ".cache" / "yaml")))
+DISK_CACHE = os.getenv("PACK_CONFIG_DISK_CACHE", "1") not in ("0", "false", "False")
+MAX_AGE_S = float(os.getenv("PACK_CONFIG_CACHE_MAX_AGE_DAYS", "30")) * 86400
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+# Part of the disk cache key: a new PyYAML, loader or schema check invalidates it
+VERSION = f"2:{yaml.__version__}:{Loader.__name__}"
+PRODUCT_SCALAR_FIELDS = ("asin", "id", "name", "title", "image", "link")
+
+_memory = {}
+_lock = threading.Lock()
+_pruned = False
+
+
+class PackConfigError(ValueError):
+    pass
+
+
+def schema_errors(data) -> list[str]:
+    if data is None:
+        return []
+    if not isinstance(data, dict):
+        return [f"top level must be a mapping, not {type(data).__name__}"]
+    errors = []
+    products = data.get("products")
+    if products is not None:
+        if not isinstance(products, list):
+            errors.append("products must be a list")
+            products = []
+        for i, product in enumerate(products, start=1):
+            if not isinstance(product, dict):
+                errors.append(f"products[{i}] must be a mapping")
+                continue
+            for key in PRODUCT_SCALAR_FIELDS:
+                # Scalars only: an all-digit ASIN/ISBN legitimately parses as an int
+                if isinstance(product.get(key), (list, dict)):
+                    errors.append(f"products[{i}].{key} must be a single value")
+    return errors
+
+
+def _disk_path(path: Path, raw: bytes) -> Path:
+    """``<path hash>.<content hash>.pickle``: one live entry per source file."""
+    owner = hashlib.sha256(str(path).encode("utf-8")).hexdigest()[:16]
+    content = hashlib.sha256(VERSION.encode("utf-8") + b"\0" + raw).hexdigest()
+    return CACHE_DIR / f"{owner}.{content}.pickle"
+
+
+def _private(path: Path, kind) -> bool:
+    """True if ``path`` is a ``kind`` (S_ISREG/S_ISDIR) only we can write to."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not kind(st.st_mode) or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        return False
+    return not hasattr(os, "getuid") or st.st_uid == os.getuid()
+
+
+def _read_disk(disk: Path):
+    if not (_private(disk.parent, stat.S_ISDIR) and _private(disk, stat.S_ISREG)):
+        return None
+    try:
+        with open(disk, "rb") as f:
+            entry = pickle.load(f)
+        os.utime(disk)  # recently used: keep it out of prune_cache()
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    return entry
+
+
+def _write_disk(disk: Path, entry) -> None:
+    try:
+        disk.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if not _private(disk.parent, stat.S_ISDIR):
+            return
+        tmp = disk.with_name(f".{disk.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, disk)
+        owner = disk.name.split(".", 1)[0]
+        for old in disk.parent.glob(f"{owner}.*.pickle"):
+            if old != disk:
+                old.unlink(missing_ok=True)
+    except OSError:
+        pass  # read-only checkout: memory cache only
+
+
+def prune_cache(max_age_s: float = MAX_AGE_S) -> int:
+    """Delete disk entries not used for ``max_age_s`` seconds; returns the count."""
+    cutoff = time.time() - max_age_s
+    removed = 0
+    for entry in CACHE_DIR.glob("*.pickle"):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                entry.unlink()
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def _load_entry(path) -> tuple:
+    """(data, errors) for the current version of ``path``; cached, not copied."""
+    global _pruned
+    path = Path(path).resolve()
+    st = path.stat()
+    sig = (st.st_mtime_ns, st.st_size)
+    with _lock:
+        hit = _memory.get(path)
+    if hit and hit[0] == sig:
+        return hit[1]
+
+    raw = path.read_bytes()
+    disk = _disk_path(path, raw) if DISK_CACHE else None
+    entry = _read_disk(disk) if disk is not None else None
+    if entry is None:
+        data = yaml.load(raw.decode("utf-8"), Loader=Loader)
+        entry = (data, schema_errors(data))
+        if disk is not None:
+            _write_disk(disk, entry)
+            if not _pruned:
+                _pruned = True
+                prune_cache()
+    with _lock:
+        _memory[path] = (sig, entry)
+    return entry
+
+
+def load_yaml(path):
+    """Parsed YAML at ``path`` (a copy the caller may modify)."""
+    return copy.deepcopy(_load_entry(path)[0])
+
+
+def load_pack(path) -> dict:
+    """Parsed pack YAML as a dict; raises PackConfigError if the schema check failed."""
+    data, errors = _load_entry(path)
+    if errors:
+        raise PackConfigError(f"{path}: " + "; ".join(errors))
+    return copy.deepcopy(data) or {}
+
+
+def clear_cache() -> None:
+    with _lock:
+        _memory.clear()
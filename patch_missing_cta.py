@@ -2,12 +2,11 @@
 import re
 from pathlib import Path
 
-import yaml
+from pack_config import load_yaml as _load_yaml
 
 
 def load_yaml(yml_path: Path) -> dict:
-    with open(yml_path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+    return _load_yaml(yml_path) or {}
 
 
 def patch_product_files(pack_id: str) -> int:
@@ -21,18 +21,12 @@ import sys
 from pathlib import Path
 from typing import List, Optional
 
-import requests
 from dotenv import load_dotenv
-from PIL import Image, ImageDraw, ImageFont
-
-# Optional: amazon-paapi imports guarded so placeholders still work without creds
-try:
-    from amazon_paapi import AmazonApi, AmazonApiException
-except Exception:
-    AmazonApi = None
-    AmazonApiException = Exception
 
 ROOT = Path(__file__).resolve().parents[1]  # repo root
+sys.path.insert(0, str(ROOT))
+from instrument import span  # noqa: E402
+
 CONTENT_DIR = ROOT / "content"
 
 
@@ -69,7 +63,20 @@ def get_target_packs(only: Optional[List[str]]) -> List[Path]:
     return packs
 
 
+def load_paapi():
+    """Import amazon-paapi on first use; (None, Exception) if it is not installed.
+
+    Guarded so placeholders still work without it or without creds.
+    """
+    try:
+        from amazon_paapi import AmazonApi, AmazonApiException
+    except Exception:
+        return None, Exception
+    return AmazonApi, AmazonApiException
+
+
 def init_amazon_api(verbose: bool = True):
+    AmazonApi, _ = load_paapi()
     if AmazonApi is None:
         return None
     load_dotenv()
@@ -115,6 +122,7 @@ def fetch_amazon_image_urls(
 ) -> List[str]:
     if api is None:
         return []
+    _, AmazonApiException = load_paapi()
     # reconfigure region if needed
     try:
         api.country = country_from_marketplace(marketplace or "US")
@@ -122,30 +130,34 @@ def fetch_amazon_image_urls(
         pass
     urls: List[str] = []
     try:
-        if asin:
-            items = api.get_items([asin])
-            for it in items.items:
-                imgs = []
-                # Primary first
-                if it.images and it.images.large:
-                    imgs.append(it.images.large.url)
-                # Variants
-                if it.images and it.images.variants:
-                    for v in it.images.variants:
-                        if v.large and v.large.url:
-                            imgs.append(v.large.url)
-                urls.extend(imgs)
-        elif keywords:
-            results = api.search_items(keywords=keywords, item_count=min(10, count * 2))
-            for it in results.items:
-                if it.images and it.images.large:
-                    urls.append(it.images.large.url)
-        # Deduplicate and limit
-        dedup = []
-        for u in urls:
-            if u and u not in dedup:
-                dedup.append(u)
-        urls = dedup[:count]
+        with span("http.amazon_paapi", asin=asin, keywords=keywords) as a:
+            if asin:
+                items = api.get_items([asin])
+                for it in items.items:
+                    imgs = []
+                    # Primary first
+                    if it.images and it.images.large:
+                        imgs.append(it.images.large.url)
+                    # Variants
+                    if it.images and it.images.variants:
+                        for v in it.images.variants:
+                            if v.large and v.large.url:
+                                imgs.append(v.large.url)
+                    urls.extend(imgs)
+            elif keywords:
+                results = api.search_items(
+                    keywords=keywords, item_count=min(10, count * 2)
+                )
+                for it in results.items:
+                    if it.images and it.images.large:
+                        urls.append(it.images.large.url)
+            # Deduplicate and limit
+            dedup = []
+            for u in urls:
+                if u and u not in dedup:
+                    dedup.append(u)
+            urls = dedup[:count]
+            a["urls"] = len(urls)
         return urls
     except AmazonApiException as e:
         log(f"Amazon API error: {e}", "WARNING", verbose)
@@ -156,23 +168,44 @@ def fetch_amazon_image_urls(
 
 
 def download_images(urls: List[str], out_dir: Path, verbose: bool) -> List[str]:
+    from asset_store import place
+    from downloader import download
+    from image_index import DEFAULT_DISTANCE, ImageIndex, hamming
+
+    index = ImageIndex()
     saved = []
+    seen = []  # dHashes of the images kept for this pack
     ensure_dir(out_dir)
-    for idx, url in enumerate(urls, start=1):
+    for url in urls:
         try:
-            r = requests.get(url, timeout=15)
-            r.raise_for_status()
-            ext = ".jpg"
-            if "image/png" in r.headers.get("Content-Type", "") or url.lower().endswith(
-                ".png"
+            ext = ".png" if url.lower().endswith(".png") else ".jpg"
+            fpath = out_dir / f"img{len(saved) + 1}{ext}"
+            known = index.path_for_url(url)
+            if known:
+                # Same URL fetched before (any pack): reuse the bytes
+                fpath = fpath.with_suffix(known.suffix)
+                if known.resolve() != fpath.resolve():
+                    place(known, fpath)
+                log(f"Reused {known.name} for {url}", "DEBUG", verbose)
+            else:
+                # One retry: a dead product-image URL should not stall the pack
+                res = download(url, fpath, timeout=15, retries=1)
+                if "image/png" in res["content_type"] and ext != ".png":
+                    fpath = fpath.rename(fpath.with_suffix(".png"))
+            rec = index.record(fpath)
+            # Amazon variants often repeat the main image: keep one of each visual
+            if rec["dhash"] is not None and any(
+                hamming(rec["dhash"], d) <= DEFAULT_DISTANCE for d in seen
             ):
-                ext = ".png"
-            fname = f"img{idx}{ext}"
-            fpath = out_dir / fname
-            with open(fpath, "wb") as f:
-                f.write(r.content)
-            saved.append(fname)
-            log(f"Downloaded: {fname}", "DEBUG", verbose)
+                fpath.unlink()
+                log(f"Skipped duplicate image from {url}", "DEBUG", verbose)
+                continue
+            if rec["dhash"] is not None:
+                seen.append(rec["dhash"])
+            # Only kept files: a skipped duplicate's bytes are gone from disk
+            index.remember_url(url, rec["sha256"])
+            saved.append(fpath.name)
+            log(f"Downloaded: {fpath.name}", "DEBUG", verbose)
         except Exception as e:
             log(f"Download failed for {url}: {e}", "WARNING", verbose)
     return saved
@@ -181,6 +214,8 @@ def download_images(urls: List[str], out_dir: Path, verbose: bool) -> List[str]:
 def generate_placeholder(
     out_dir: Path, name: str, text: str, theme: str, size=(1280, 720)
 ) -> str:
+    from PIL import Image, ImageDraw, ImageFont
+
     ensure_dir(out_dir)
     img = Image.new("RGB", size, color=(28, 30, 34))  # dark bg
     draw = ImageDraw.Draw(img)
@@ -196,7 +231,10 @@ def generate_placeholder(
     draw.text(((W - tw) / 2, H / 2 - th), title, fill=(235, 235, 235), font=font)
     draw.text(((W - sw) / 2, H / 2 + 10), sub, fill=(180, 180, 180), font=font)
     fname = f"{name}.jpg"
-    img.save(out_dir / fname, format="JPEG", quality=90)
+    # Write aside and swap in: img<N>.jpg may be hardlinked to the asset store
+    tmp = out_dir / f".{fname}.tmp"
+    img.save(tmp, format="JPEG", quality=90)
+    os.replace(tmp, out_dir / fname)
     return fname
 
 
@@ -221,14 +259,20 @@ def ensure_image_count(
     added = []
     for i in range(1, remain + 1):
         name = f"img{have + i}"
-        fname = generate_placeholder(
-            images_dir, name=name, text=title or "Product", theme=theme or "generic"
-        )
+        with span("placeholder", image=name):
+            fname = generate_placeholder(
+                images_dir, name=name, text=title or "Product", theme=theme or "generic"
+            )
         added.append(fname)
     return sorted([*existing, *added])[:needed]
 
 
 def process_pack(pack_dir: Path, api, dry_run: bool, verbose: bool) -> dict:
+    with span("images_auto.pack", pack=pack_dir.name):
+        return _process_pack(pack_dir, api, dry_run, verbose)
+
+
+def _process_pack(pack_dir: Path, api, dry_run: bool, verbose: bool) -> dict:
     meta_path = pack_dir / "metadata.json"
     meta = load_json(meta_path)
     title = meta.get("title", pack_dir.name)
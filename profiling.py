@@ -0,0 +1,149 @@
+# profiling.py
+"""Opt-in per-step profiling for pipeline scripts.
+
+Outputs go to logs/run_<RUN_ID>/profile/, one file per profiled step:
+  <step>.prof       --profiler cprofile: cProfile stats (snakeviz, pstats)
+  <step>.collapsed  --profiler sample: "frame;frame;frame count" lines for
+                    flamegraph.pl / speedscope, at a fraction of cProfile's overhead
+
+When a step is not selected, ``profiled`` is a bare set lookup and
+``wrap_command`` returns the command unchanged.
+
+Run a script under the profiler directly:
+    python profiling.py --step assemble_videos -- assemble_videos.py 003_affiliate_airfryer
+"""
+import argparse
+import collections
+import contextlib
+import os
+import runpy
+import sys
+import threading
+from pathlib import Path
+
+from instrument import run_log_dir
+
+ROOT = Path(__file__).resolve().parent
+PROFILERS = ("cprofile", "sample")
+SAMPLE_INTERVAL_S = 0.005
+
+
+def parse_steps(value: str | None) -> frozenset:
+    if not value:
+        return frozenset()
+    return frozenset(Path(v.strip()).stem for v in value.split(",") if v.strip())
+
+
+def profile_dir() -> Path:
+    return run_log_dir() / "profile"
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack every ``interval`` seconds."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL_S):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = collections.Counter()
+        self._stop_evt = threading.Event()
+
+    def run(self):
+        while not self._stop_evt.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_evt.set()
+        self.join()
+
+    def write(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, n in self.counts.most_common():
+                f.write(f"{stack} {n}\n")
+
+
+@contextlib.contextmanager
+def profiled(
+    step: str, selected: frozenset, profiler: str = "cprofile", label: str | None = None
+):
+    """Profile the block if ``step`` is in ``selected``."""
+    if step not in selected:
+        yield
+        return
+    out_dir = profile_dir()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    name = label or step
+    sampler = prof = None
+    if profiler == "sample":
+        sampler = StackSampler(threading.get_ident())
+        sampler.start()
+    else:
+        import cProfile
+
+        prof = cProfile.Profile()
+        prof.enable()
+    try:
+        yield
+    finally:
+        # Append rather than with_suffix(): labels carry dotted pack ids
+        if prof is not None:
+            prof.disable()
+            out = out_dir / f"{name}.prof"
+            prof.dump_stats(str(out))
+        else:
+            sampler.stop()
+            out = out_dir / f"{name}.collapsed"
+            sampler.write(out)
+        print(f"🔬 Profile for {step} written to {out}", file=sys.stderr)
+
+
+def wrap_command(
+    cmd: list, selected: frozenset, profiler: str = "cprofile", label: str | None = None
+) -> list:
+    """Rewrite ``[python, script, *args]`` to run the script under this module if selected."""
+    step = Path(cmd[1]).stem
+    if step not in selected:
+        return cmd
+    extra = ["--label", label] if label else []
+    return [
+        cmd[0],
+        str(ROOT / "profiling.py"),
+        "--step",
+        step,
+        "--profiler",
+        profiler,
+        *extra,
+        "--",
+        *cmd[1:],
+    ]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run a pipeline script under a profiler.")
+    ap.add_argument("--step", help="Step name for output files (default: script stem)")
+    ap.add_argument("--label", help="Output file name (default: step name)")
+    ap.add_argument("--profiler", choices=PROFILERS, default="cprofile")
+    ap.add_argument("script", help="Script path")
+    ap.add_argument("args", nargs=argparse.REMAINDER, help="Script arguments")
+    args = ap.parse_args()
+
+    script = Path(args.script)
+    step = args.step or script.stem
+    script_args = args.args[1:] if args.args[:1] == ["--"] else args.args
+    sys.argv = [str(script), *script_args]
+    sys.path[0] = str(script.resolve().parent)
+    with profiled(step, frozenset([step]), args.profiler, args.label):
+        runpy.run_path(str(script), run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
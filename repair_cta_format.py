@@ -1,12 +1,11 @@
 # repair_cta_format.py
 from pathlib import Path
 
-import yaml
+from pack_config import load_yaml as _load_yaml
 
 
 def load_yaml(yml_path):
-    with open(yml_path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+    return _load_yaml(yml_path) or {}
 
 
 def repair_files(pack_id):
@@ -1,47 +1,180 @@
 # resolve_links.py
+"""Fill in product links in content/<pack>/input.yaml from affiliate_links.yaml.
+
+    python resolve_links.py 003_affiliate_airfryer      # one pack
+    python resolve_links.py --all                       # every pack, one pass
+    python resolve_links.py --all --sqlite              # large link tables
+
+The link table is loaded once per run: as a dict, or with --sqlite as an
+indexed table in .cache/affiliate_links.sqlite that is rebuilt only when
+the content of affiliate_links.yaml changes. Only YAMLs that gained a link are rewritten.
+``--all`` reports unresolved ASINs across the catalogue and writes them to
+logs/run_<RUN_ID>/unresolved_links.csv.
+"""
+import csv
+import sqlite3
 from pathlib import Path
 
 import yaml
 
+from fsutil import atomic_write_text, file_sha256
+from pack_config import load_yaml as _load_yaml
+
+CONTENT_DIR = Path("content")
+AFFILIATE_PATH = Path("affiliate_links.yaml")
+LINKS_DB = Path(".cache") / "affiliate_links.sqlite"
+
 
 def load_yaml(path):
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    return _load_yaml(path)
 
 
 def write_yaml(data, path):
-    with open(path, "w", encoding="utf-8") as f:
-        yaml.dump(data, f, allow_unicode=True, sort_keys=False)
+    # Replace, don't rewrite in place: input.yaml may be hardlinked to the asset store
+    atomic_write_text(Path(path), yaml.dump(data, allow_unicode=True, sort_keys=False))
 
 
-def resolve_links(pack_id):
-    base_dir = Path("content") / pack_id
-    input_path = base_dir / "input.yaml"
-    affiliate_path = Path("affiliate_links.yaml")
+class SqliteLinks:
+    """ASIN -> link lookups from an indexed SQLite copy of the YAML table."""
+
+    def __init__(self, yaml_path=AFFILIATE_PATH, db_path=LINKS_DB):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS links (asin TEXT PRIMARY KEY, link TEXT NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        # Content, not mtime/size: a same-size edit within the mtime tick still counts
+        sig = f"{Path(yaml_path).resolve()}:{file_sha256(yaml_path)}"
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'source'"
+        ).fetchone()
+        if not row or row[0] != sig:
+            table = load_yaml(yaml_path) or {}
+            with self.conn:
+                self.conn.execute("DELETE FROM links")
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO links VALUES (?, ?)",
+                    ((str(k), str(v)) for k, v in table.items() if v),
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('source', ?)", (sig,)
+                )
+
+    def get(self, asin, default=None):
+        row = self.conn.execute(
+            "SELECT link FROM links WHERE asin = ?", (str(asin),)
+        ).fetchone()
+        return row[0] if row else default
+
+
+def load_links(path=AFFILIATE_PATH, sqlite: bool = False):
+    """The link table: a dict, or a SqliteLinks for catalogues too big to hold comfortably."""
+    if sqlite:
+        return SqliteLinks(path)
+    return {str(k): v for k, v in (load_yaml(path) or {}).items()}
 
-    data = load_yaml(input_path)
-    links = load_yaml(affiliate_path)
-    updated = 0
 
-    for product in data.get("products", []):
+def resolve_pack(
+    input_path: Path, links, verbose: bool = True
+) -> tuple[int, list[str]]:
+    """Add missing links to one input.yaml; returns (links added, unresolved ASINs)."""
+    data = load_yaml(input_path) or {}
+    updated = 0
+    unresolved = []
+    for product in data.get("products") or []:
         asin = product.get("asin")
         if asin and "link" not in product:
-            link = links.get(asin)
+            link = links.get(str(asin))
             if link:
                 product["link"] = link
-                print(f"🔗 Added link for {asin}: {link}")
+                if verbose:
+                    print(f"🔗 Added link for {asin}: {link}")
                 updated += 1
             else:
-                print(f"⚠️ No link found for {asin}")
+                unresolved.append(str(asin))
+    if updated:
+        write_yaml(data, input_path)
+    return updated, unresolved
+
+
+def resolve_links(pack_id, links=None):
+    input_path = CONTENT_DIR / pack_id / "input.yaml"
+    if links is None:
+        links = load_links()
+    updated, unresolved = resolve_pack(input_path, links)
+    for asin in unresolved:
+        print(f"⚠️ No link found for {asin}")
+    if updated:
+        print(f"✅ Injected {updated} affiliate link(s) into {pack_id}/input.yaml")
+    else:
+        print(f"✅ No new links for {pack_id}/input.yaml (left unchanged)")
+
+
+def resolve_all(links, content_dir: Path = CONTENT_DIR) -> dict:
+    """Resolve every pack in one pass; returns {asin: [packs]} still lacking a link."""
+    missing = {}
+    packs = updated = written = 0
+    for input_path in sorted(content_dir.glob("*/input.yaml")):
+        pack_id = input_path.parent.name
+        packs += 1
+        n, unresolved = resolve_pack(input_path, links, verbose=False)
+        if n:
+            updated += n
+            written += 1
+            print(f"🔗 {pack_id}: added {n} link(s)")
+        for asin in unresolved:
+            missing.setdefault(asin, []).append(pack_id)
 
-    write_yaml(data, input_path)
-    print(f"✅ Injected {updated} affiliate link(s) into {pack_id}/input.yaml")
+    print(
+        f"\n✅ {packs} pack(s): {updated} link(s) added, {written} input.yaml file(s) rewritten"
+    )
+    if missing:
+        print(f"⚠️ {len(missing)} ASIN(s) without a link in {AFFILIATE_PATH}:")
+        for asin, in_packs in sorted(missing.items()):
+            print(f"   {asin}: {', '.join(in_packs)}")
+    return missing
+
+
+def write_unresolved_report(missing: dict) -> Path:
+    from instrument import run_log_dir
+
+    out = run_log_dir() / "unresolved_links.csv"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["asin", "packs"])
+        for asin, in_packs in sorted(missing.items()):
+            w.writerow([asin, " ".join(in_packs)])
+    return out
 
 
 if __name__ == "__main__":
-    import sys
+    import argparse
+
+    ap = argparse.ArgumentParser(
+        description="Inject affiliate links into pack input.yaml files."
+    )
+    ap.add_argument("pack_id", nargs="?", help="Pack under content/ (omit with --all)")
+    ap.add_argument(
+        "--all", action="store_true", help="Resolve every pack in content/ in one pass"
+    )
+    ap.add_argument(
+        "--sqlite",
+        action="store_true",
+        help=f"Look links up in {LINKS_DB} (large tables)",
+    )
+    args = ap.parse_args()
+    if not args.all and not args.pack_id:
+        ap.error("give a pack_id or --all")
 
-    if len(sys.argv) < 2:
-        print("Usage: python resolve_links.py <pack_id>")
-        sys.exit(1)
-    resolve_links(sys.argv[1])
+    table = load_links(sqlite=args.sqlite)
+    if args.all:
+        missing = resolve_all(table)
+        if missing:
+            print(f"📝 Report: {write_unresolved_report(missing)}")
+    else:
+        resolve_links(args.pack_id, table)
@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 import os
 import re
-import subprocess
 import sys
 from pathlib import Path
 from typing import List, Tuple
 
+from instrument import run as traced_run
+from instrument import span
+from profiling import PROFILERS, parse_steps, profiled, wrap_command
+
 # -----------------------------
 # Configuration (env-overridable)
 # -----------------------------
@@ -16,7 +19,22 @@ AUTO_REPAIR_CTA_DEFAULT = os.getenv("AUTO_REPAIR_CTA", "1") not in (
     "false",
     "False",
 )
+# A full-length voiceover next to the pack becomes combined.mp4's audio track
+NARRATION_TRACKS = ("narration.mp3", "narration.m4a", "narration.wav")
 GLOBAL_FALLBACK_CTA = os.getenv("FALLBACK_CTA", "CTA_PRIMARY: Check out this product")
+# Steps to profile (script stems, e.g. assemble_videos); set from --profile
+PROFILE_STEPS = parse_steps(os.getenv("PIPELINE_PROFILE"))
+PROFILER = os.getenv("PIPELINE_PROFILER", "cprofile")
+PROFILE_STEP_NAMES = (
+    "validate_pack",
+    "generate_narration",
+    "repair_narration_cta",
+    "validate_narration",
+    "generate_wav_from_txt",
+    "normalize_images",
+    "generate_cta_images",
+    "assemble_videos",
+)
 
 # -----------------------------
 # CTA repair utility (idempotent)
@@ -80,9 +98,19 @@ def get_all_pack_ids() -> List[str]:
 # -----------------------------
 # Subprocess runner
 # -----------------------------
-def run_step(script: str, pack_id: str) -> int:
-    cmd = [sys.executable, script, pack_id]
-    return subprocess.run(cmd).returncode
+def run_step(script: str, pack_id: str, *extra: str) -> int:
+    cmd = [sys.executable, script, pack_id, *extra]
+    cmd = wrap_command(
+        cmd, PROFILE_STEPS, PROFILER, label=f"{Path(script).stem}_{pack_id}"
+    )
+    return traced_run(cmd, name=f"step:{script}", attrs={"pack": pack_id}).returncode
+
+
+def external_narration(pack_id: str) -> Path | None:
+    pack_dir = Path(CONTENT_DIR) / pack_id
+    return next(
+        (pack_dir / n for n in NARRATION_TRACKS if (pack_dir / n).is_file()), None
+    )
 
 
 # -----------------------------
@@ -102,22 +130,38 @@ def choose_fallback_cta(pack_id: str) -> str:
 # -----------------------------
 # Per-pack pipeline
 # -----------------------------
-def run_pipeline_for(pack_id: str, auto_repair_cta: bool = True) -> None:
+def run_pipeline_for(pack_id: str, auto_repair_cta: bool = True) -> bool:
+    """Run every step for ``pack_id``; True if all of them exited 0."""
+    with span("pipeline", pack=pack_id) as a:
+        ok = _run_pipeline_steps(pack_id, auto_repair_cta)
+        a["ok"] = ok
+    return ok
+
+
+def _run_pipeline_steps(pack_id: str, auto_repair_cta: bool) -> bool:
     print(f"\n▶ Running pipeline for: {pack_id}")
 
-    run_step("validate_pack.py", pack_id)
-    run_step("generate_narration.py", pack_id)
+    # Steps keep going after a failure (as before); rc only records that one happened
+    rc = run_step("validate_pack.py", pack_id)
+    rc |= run_step("generate_narration.py", pack_id)
 
     # Auto-repair CTA before narration validation / TTS
     narr_dir = Path(CONTENT_DIR) / pack_id / "narration"
     if auto_repair_cta and narr_dir.exists():
         fallback_line = choose_fallback_cta(pack_id)
-        repaired, checked, _ = repair_narration_cta(
-            narr_dir=narr_dir,
-            fallback_cta=fallback_line,
-            make_backup=True,
-            dry_run=False,
-        )
+        with span("step:repair_narration_cta", pack=pack_id) as a, profiled(
+            "repair_narration_cta",
+            PROFILE_STEPS,
+            PROFILER,
+            label=f"repair_narration_cta_{pack_id}",
+        ):
+            repaired, checked, _ = repair_narration_cta(
+                narr_dir=narr_dir,
+                fallback_cta=fallback_line,
+                make_backup=True,
+                dry_run=False,
+            )
+            a.update(repaired=repaired, checked=checked)
         if checked == 0:
             print(f"❌ No narration .txt files found in {narr_dir}")
         elif repaired > 0:
@@ -129,13 +173,20 @@ def run_pipeline_for(pack_id: str, auto_repair_cta: bool = True) -> None:
                 f"✅ Narration CTA_PRIMARY already valid in {pack_id} ({checked} file(s) checked)"
             )
 
-    run_step("validate_narration.py", pack_id)
+    rc |= run_step("validate_narration.py", pack_id)
 
     # Generate WAVs from narration .txt (macOS TTS)
-    run_step("scripts/generate_wav_from_txt.py", pack_id)
+    rc |= run_step("scripts/generate_wav_from_txt.py", pack_id)
 
-    run_step("generate_cta_images.py", pack_id)
-    run_step("assemble_videos.py", pack_id)
+    # Resize/convert images once so overlays and encodes work at the output size
+    rc |= run_step("normalize_images.py", pack_id)
+    rc |= run_step("generate_cta_images.py", pack_id)
+    track = external_narration(pack_id)
+    extra = ["--narration", str(track)] if track else []
+    if track:
+        print(f"🎙 Using {track} as the combined video's audio")
+    rc |= run_step("assemble_videos.py", pack_id, *extra)
+    return rc == 0
 
 
 # -----------------------------
@@ -155,18 +206,61 @@ def parse_args():
         action="store_true",
         help="Disable auto-repair of CTA_PRIMARY in narration .txt files",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Only run packs synced by sync_packs_to_content.py since their last "
+        "successful run",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="STEP[,STEP]",
+        help=f"Profile these steps ({','.join(PROFILE_STEP_NAMES)}); "
+        "output goes to logs/run_<RUN_ID>/profile/",
+    )
+    parser.add_argument(
+        "--profiler",
+        choices=PROFILERS,
+        default=PROFILER,
+        help="cprofile: .prof stats; sample: collapsed stacks, lower overhead",
+    )
+    args = parser.parse_args()
+    unknown = parse_steps(args.profile).difference(PROFILE_STEP_NAMES)
+    if unknown:
+        parser.error(f"unknown --profile step(s): {', '.join(sorted(unknown))}")
+    return args
 
 
-def main(pack_id=None):
+def main(pack_id=None) -> bool:
+    """Run the selected packs; True if every one of them succeeded."""
+    global PROFILE_STEPS, PROFILER
     args = parse_args()
+    if args.profile:
+        PROFILE_STEPS = parse_steps(args.profile)
+    PROFILER = args.profiler
     auto_repair_cta = AUTO_REPAIR_CTA_DEFAULT and (not args.no_auto_repair_cta)
-    if args.pack_id:
-        run_pipeline_for(args.pack_id, auto_repair_cta=auto_repair_cta)
-    else:
-        for pack in get_all_pack_ids():
-            run_pipeline_for(pack, auto_repair_cta=auto_repair_cta)
+    packs = [args.pack_id] if args.pack_id else get_all_pack_ids()
+    from sync_packs_to_content import CHANGES_PATH, changed_packs, mark_processed
+
+    if args.changed_only:
+        changed = changed_packs()
+        # Synced packs live in content/ only, so take the change set as the pack list
+        packs = [p for p in packs if p in changed] if args.pack_id else changed
+        print(f"🔁 {len(packs)} changed pack(s) from {CHANGES_PATH}")
+    failed = []
+    for pack in packs:
+        if run_pipeline_for(pack, auto_repair_cta=auto_repair_cta):
+            # Off the pending list only once a run for it succeeded
+            mark_processed(pack)
+            continue
+        failed.append(pack)
+        if args.changed_only:
+            print(f"⚠️ {pack} failed; it stays pending for the next --changed-only run")
+    if failed:
+        print(f"❌ {len(failed)} pack(s) failed: {', '.join(failed)}")
+    return not failed
 
 
 if __name__ == "__main__":
-    main()
+    # Non-zero when any pack failed: the scheduler retries and scores on it
+    sys.exit(0 if main() else 1)
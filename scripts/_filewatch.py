@@ -0,0 +1,131 @@
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from pathlib import Path
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ATTRIB
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _stamp(path: Path):
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class FileWatcher:
+    """Calls ``callback(changed_paths)`` on the event loop when a watched file changes.
+
+    Uses inotify on the parent directories (so atomic replace-by-rename is seen)
+    when available, otherwise falls back to comparing (mtime, size) every
+    ``poll_s`` seconds, which is a stat per file and no reads.
+    """
+
+    def __init__(self, paths, callback):
+        self.paths = {Path(p).resolve() for p in paths}
+        self.callback = callback
+        self.backend = None
+        self._loop = None
+        self._fd = None
+        self._dirs = {}
+        self._stamps = {}
+        self._timer = None
+
+    def start(self, loop, poll_s: float = 30.0) -> str:
+        self._loop = loop
+        if self._start_inotify():
+            self.backend = "inotify"
+        else:
+            self._stamps = {p: _stamp(p) for p in self.paths}
+            self._schedule_poll(poll_s)
+            self.backend = "stat"
+        return self.backend
+
+    def stop(self) -> None:
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _start_inotify(self) -> bool:
+        libc = _load_libc()
+        if libc is None:
+            return False
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return False
+        for d in {p.parent for p in self.paths}:
+            d.mkdir(parents=True, exist_ok=True)
+            wd = libc.inotify_add_watch(fd, os.fsencode(str(d)), WATCH_MASK)
+            if wd < 0:
+                os.close(fd)
+                return False
+            self._dirs[wd] = d
+        self._fd = fd
+        self._loop.add_reader(fd, self._on_inotify)
+        return True
+
+    def _on_inotify(self) -> None:
+        changed = set()
+        while True:
+            try:
+                buf = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not buf:
+                break
+            off = 0
+            while off + EVENT_HEADER.size <= len(buf):
+                wd, _mask, _cookie, length = EVENT_HEADER.unpack_from(buf, off)
+                off += EVENT_HEADER.size
+                name = buf[off : off + length].rstrip(b"\0")
+                off += length
+                d = self._dirs.get(wd)
+                if d is not None and name:
+                    p = d / os.fsdecode(name)
+                    if p in self.paths:
+                        changed.add(p)
+        if changed:
+            self.callback(changed)
+
+    def _schedule_poll(self, poll_s: float) -> None:
+        self._timer = self._loop.call_later(poll_s, self._on_poll, poll_s)
+
+    def _on_poll(self, poll_s: float) -> None:
+        changed = set()
+        for p in self.paths:
+            s = _stamp(p)
+            if s != self._stamps.get(p):
+                self._stamps[p] = s
+                changed.add(p)
+        if changed:
+            self.callback(changed)
+        self._schedule_poll(poll_s)
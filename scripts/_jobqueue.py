@@ -0,0 +1,221 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_key TEXT NOT NULL UNIQUE,
+    pack_id TEXT NOT NULL,
+    payload TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    worker TEXT,
+    lease_until REAL,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    rc INTEGER,
+    duration_s REAL,
+    collected INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+"""
+
+
+class JobQueue:
+    """Pack job queue in a SQLite file that several hosts can share.
+
+    Workers ``lease`` a job for ``lease_s`` seconds and must ``heartbeat``
+    before it runs out; a job whose lease expires goes back to ``queued``
+    (until ``max_attempts``). A pack that is leased by one worker is never
+    handed to another, so the same pack is not rendered twice at once.
+
+    Uses the rollback journal rather than WAL because WAL needs shared memory
+    and does not work on network filesystems.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA busy_timeout = 30000")
+            self._local.conn = conn
+        return conn
+
+    def _conn(self):
+        return _Tx(self._connection())
+
+    def enqueue(self, job_key, pack_id, payload=None, max_attempts=3) -> bool:
+        with self._conn() as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO jobs (job_key, pack_id, payload, max_attempts, enqueued_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (
+                    job_key,
+                    pack_id,
+                    json.dumps(payload or {}),
+                    max_attempts,
+                    time.time(),
+                ),
+            )
+            return cur.rowcount == 1
+
+    def requeue_expired(self, now=None) -> int:
+        with self._conn() as conn:
+            return _requeue_expired(conn, now or time.time())
+
+    def lease(self, worker, lease_s):
+        now = time.time()
+        with self._conn() as conn:
+            _requeue_expired(conn, now)
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' AND pack_id NOT IN"
+                " (SELECT pack_id FROM jobs WHERE status = 'leased') ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_until = ?,"
+                " attempts = attempts + 1, started_at = ? WHERE id = ?",
+                (worker, now + lease_s, now, row["id"]),
+            )
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"] or "{}")
+        job["attempts"] += 1
+        return job
+
+    def heartbeat(self, job_id, worker, lease_s) -> bool:
+        with self._conn() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + lease_s, job_id, worker),
+            )
+            return cur.rowcount == 1
+
+    def complete(self, job_id, worker, rc, duration_s):
+        """Record a run's result; returns the job's new status, or None if the lease was lost.
+
+        A failed run goes back to ``queued`` while it has attempts left, so
+        another lease (on any worker) retries it.
+        """
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs"
+                " WHERE id = ? AND worker = ? AND status = 'leased'",
+                (job_id, worker),
+            ).fetchone()
+            if row is None:
+                return None
+            if rc == 0:
+                status = "done"
+            elif row["attempts"] < row["max_attempts"]:
+                status = "queued"
+            else:
+                status = "failed"
+            conn.execute(
+                "UPDATE jobs SET status = ?, rc = ?, duration_s = ?, finished_at = ?,"
+                " lease_until = NULL, worker = CASE WHEN ? = 'queued' THEN NULL"
+                " ELSE worker END WHERE id = ?",
+                (status, rc, duration_s, time.time(), status, job_id),
+            )
+            return status
+
+    def collect_finished(self):
+        """Return finished jobs not yet seen by the coordinator, marking them seen."""
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE status IN ('done', 'failed') AND collected = 0 ORDER BY id"
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET collected = 1 WHERE id = ?", [(r["id"],) for r in rows]
+            )
+        return [dict(r) for r in rows]
+
+    def outstanding(self, key_prefix="") -> int:
+        """Jobs (with keys starting ``key_prefix``) still queued or running."""
+        with self._conn() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'leased')"
+                " AND job_key LIKE ? || '%'",
+                (key_prefix,),
+            ).fetchone()[0]
+
+    def counts(self):
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"
+            ).fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+
+class _Tx:
+    """``BEGIN IMMEDIATE`` ... ``COMMIT`` so lease/requeue are atomic across hosts."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def _requeue_expired(conn, now) -> int:
+    conn.execute(
+        "UPDATE jobs SET status = 'failed', worker = NULL, lease_until = NULL, finished_at = ?"
+        " WHERE status = 'leased' AND lease_until < ? AND attempts >= max_attempts",
+        (now, now),
+    )
+    cur = conn.execute(
+        "UPDATE jobs SET status = 'queued', worker = NULL, lease_until = NULL"
+        " WHERE status = 'leased' AND lease_until < ?",
+        (now,),
+    )
+    return cur.rowcount
+
+
+class Heartbeat(threading.Thread):
+    """Renews a job lease every ``lease_s / 3`` seconds until stopped.
+
+    ``lost`` is set when the lease was taken away or could not be renewed
+    (``error`` then holds why), so the worker discards its result.
+    """
+
+    def __init__(self, queue, job_id, worker, lease_s):
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.job_id = job_id
+        self.worker = worker
+        self.lease_s = lease_s
+        self.lost = False
+        self.error = None
+        self._stop_evt = threading.Event()
+
+    def run(self):
+        while not self._stop_evt.wait(self.lease_s / 3.0):
+            try:
+                renewed = self.queue.heartbeat(self.job_id, self.worker, self.lease_s)
+            except sqlite3.Error as e:  # e.g. "database is locked" past busy_timeout
+                self.error = e
+                renewed = False
+            if not renewed:
+                self.lost = True
+                return
+
+    def stop(self):
+        self._stop_evt.set()
+        self.join()
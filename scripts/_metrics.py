@@ -0,0 +1,210 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from fsutil import atomic_write_text
+
+DURATION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+RATIO_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8)
+
+METRICS = {
+    "affiliate_scheduler_runs_total": (
+        "counter",
+        "Pack runs started by the scheduler.",
+    ),
+    "affiliate_scheduler_failures_total": (
+        "counter",
+        "Pack runs that exited non-zero.",
+    ),
+    "affiliate_scheduler_retries_total": (
+        "counter",
+        "Pack runs retried after a failure.",
+    ),
+    "affiliate_scheduler_jobs_total": (
+        "counter",
+        "Queued pack jobs finished, by final status (collected by the coordinator).",
+    ),
+    "affiliate_pack_run_duration_seconds": ("histogram", "Wall time of one pack run."),
+    "affiliate_step_duration_seconds": (
+        "histogram",
+        "Wall time of one traced pipeline step.",
+    ),
+    "affiliate_step_failures_total": (
+        "counter",
+        "Traced pipeline steps that raised or exited non-zero.",
+    ),
+    "affiliate_encode_seconds_per_output_second": (
+        "histogram",
+        "ffmpeg encode wall seconds per second of produced video.",
+    ),
+    "affiliate_cache_requests_total": ("counter", "Cache lookups by cache and result."),
+    "affiliate_download_bytes_total": ("counter", "Bytes downloaded over HTTP."),
+}
+BUCKETS = {
+    "affiliate_pack_run_duration_seconds": DURATION_BUCKETS,
+    "affiliate_step_duration_seconds": DURATION_BUCKETS,
+    "affiliate_encode_seconds_per_output_second": RATIO_BUCKETS,
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+
+def _fmt_labels(key, extra=()):
+    items = list(key) + list(extra)
+    if not items:
+        return ""
+    esc = [(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in items]
+    return "{" + ",".join(f'{k}="{v}"' for k, v in esc) + "}"
+
+
+class Registry:
+    """Counters and histograms rendered in the Prometheus text exposition format.
+
+    ``const_labels`` are added to every series, so several processes can
+    export the same metric names side by side (e.g. ``worker="host:1234"``).
+    """
+
+    def __init__(self, const_labels=None):
+        self._lock = threading.Lock()
+        self.const_labels = dict(const_labels or {})
+        self.counters = {}
+        self.histograms = {}
+
+    def _key(self, labels):
+        return _label_key({**labels, **self.const_labels})
+
+    def inc(self, name, value=1.0, **labels):
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            k = self._key(labels)
+            series[k] = series.get(k, 0.0) + value
+
+    def observe(self, name, value, **labels):
+        buckets = BUCKETS[name]
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            h = series.setdefault(
+                self._key(labels),
+                {"buckets": [0] * len(buckets), "sum": 0.0, "count": 0},
+            )
+            for i, le in enumerate(buckets):
+                if value <= le:
+                    h["buckets"][i] += 1
+            h["sum"] += value
+            h["count"] += 1
+
+    def render(self) -> str:
+        out = []
+        with self._lock:
+            for name, (kind, help_text) in METRICS.items():
+                if name in self.counters:
+                    out.append(f"# HELP {name} {help_text}")
+                    out.append(f"# TYPE {name} {kind}")
+                    for k, v in sorted(self.counters[name].items()):
+                        out.append(f"{name}{_fmt_labels(k)} {v:g}")
+                elif name in self.histograms:
+                    out.append(f"# HELP {name} {help_text}")
+                    out.append(f"# TYPE {name} {kind}")
+                    for k, h in sorted(self.histograms[name].items()):
+                        for le, n in zip(BUCKETS[name], h["buckets"]):
+                            out.append(
+                                f"{name}_bucket{_fmt_labels(k, [('le', le)])} {n}"
+                            )
+                        out.append(
+                            f"{name}_bucket{_fmt_labels(k, [('le', '+Inf')])} {h['count']}"
+                        )
+                        out.append(f"{name}_sum{_fmt_labels(k)} {h['sum']:g}")
+                        out.append(f"{name}_count{_fmt_labels(k)} {h['count']}")
+        return "\n".join(out) + "\n"
+
+    def dump(self) -> dict:
+        with self._lock:
+            return {
+                "counters": {
+                    n: [[list(k), v] for k, v in s.items()]
+                    for n, s in self.counters.items()
+                },
+                "histograms": {
+                    n: [[list(k), h] for k, h in s.items()]
+                    for n, s in self.histograms.items()
+                },
+            }
+
+    def restore(self, data: dict) -> None:
+        with self._lock:
+            for n, series in (data.get("counters") or {}).items():
+                self.counters[n] = {tuple(map(tuple, k)): v for k, v in series}
+            for n, series in (data.get("histograms") or {}).items():
+                if n in BUCKETS:
+                    self.histograms[n] = {
+                        tuple(map(tuple, k)): h
+                        for k, h in series
+                        if len(h.get("buckets", [])) == len(BUCKETS[n])
+                    }
+
+
+def ingest_trace(registry: Registry, trace_path: Path) -> int:
+    """Fold one run's trace.jsonl (see instrument.py) into ``registry``."""
+    try:
+        f = open(trace_path, encoding="utf-8")
+    except OSError:
+        return 0
+    n = 0
+    with f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            n += 1
+            name = rec.get("name", "")
+            attrs = rec.get("attrs") or {}
+            wall = float(rec.get("wall_s") or 0.0)
+            if name.startswith("step:"):
+                registry.observe("affiliate_step_duration_seconds", wall, step=name[5:])
+                if rec.get("status", "ok") != "ok" or attrs.get("rc"):
+                    registry.inc("affiliate_step_failures_total", step=name[5:])
+            if name == "ffmpeg.encode" and attrs.get("output_seconds"):
+                registry.observe(
+                    "affiliate_encode_seconds_per_output_second",
+                    wall / float(attrs["output_seconds"]),
+                )
+            if attrs.get("cache") in ("hit", "miss"):
+                registry.inc(
+                    "affiliate_cache_requests_total", cache=name, result=attrs["cache"]
+                )
+            # Only HTTP spans: other spans may report bytes read from local disk
+            if name.startswith("http.") and attrs.get("bytes_in"):
+                registry.inc("affiliate_download_bytes_total", float(attrs["bytes_in"]))
+    return n
+
+
+def write_textfile(registry: Registry, path: Path) -> None:
+    """Write for node_exporter's textfile collector (atomic, so never half-read)."""
+    atomic_write_text(Path(path), registry.render())
+
+
+def serve(
+    registry: Registry, port: int, host: str = "127.0.0.1"
+) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,121 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+
+# A success halves the failure score instead of wiping it, so a flaky pack
+# stays demoted for a few good runs
+FAILURE_DECAY = 0.5
+# Pipeline outputs and scratch files; changes here must not make a pack look stale.
+SKIP_DIRS = {"video", "output", "exports", "__pycache__"}
+SKIP_SUFFIXES = (".bak", ".tmp", ".part", ".wav", ".aiff", ".mp4")
+OUTPUT_SUFFIXES = (".mp4",)
+
+
+def _walk_stats(root: Path):
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return
+    for e in entries:
+        if e.is_dir(follow_symlinks=False):
+            if e.name not in SKIP_DIRS:
+                yield from _walk_stats(Path(e.path))
+        elif e.is_file() and not e.name.endswith(SKIP_SUFFIXES):
+            st = e.stat()
+            yield e.path, st.st_mtime_ns, st.st_size
+
+
+def input_fingerprint(pack_id: str, packs_dir: Path, content_dir: Path) -> str:
+    """Hash of (path, mtime_ns, size) over a pack's inputs; never reads file contents."""
+    h = hashlib.sha1()
+    roots = [packs_dir / pack_id, content_dir / pack_id]
+    stats = []
+    for r in roots:
+        stats.extend(_walk_stats(r))
+    single = packs_dir / f"{pack_id}.yaml"
+    if single.is_file():
+        st = single.stat()
+        stats.append((str(single), st.st_mtime_ns, st.st_size))
+    for path, mtime_ns, size in sorted(stats):
+        h.update(f"{path}\0{mtime_ns}\0{size}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def last_output_mtime(pack_id: str, content_dir: Path):
+    newest = None
+    for sub in ("video", "output"):
+        d = content_dir / pack_id / sub
+        try:
+            entries = list(os.scandir(d))
+        except OSError:
+            continue
+        for e in entries:
+            if e.name.endswith(OUTPUT_SUFFIXES) and e.is_file():
+                m = e.stat().st_mtime
+                newest = m if newest is None else max(newest, m)
+    return newest
+
+
+def failure_score(rec) -> float:
+    # Records written before the decayed score only have the streak
+    return rec.get("failure_score", rec.get("consecutive_failures", 0))
+
+
+def score_pack(pack_id, status, packs_dir, content_dir, weights, now=None):
+    """Higher is more urgent: changed inputs, stale output, few recent failures."""
+    now = now or time.time()
+    rec = status.get(pack_id, {})
+    changed = input_fingerprint(pack_id, packs_dir, content_dir) != rec.get(
+        "fingerprint"
+    )
+    out_mtime = last_output_mtime(pack_id, content_dir)
+    cap_h = weights["age_cap_hours"]
+    age_h = cap_h if out_mtime is None else min(cap_h, (now - out_mtime) / 3600.0)
+    return (
+        weights["changed"] * (1.0 if changed else 0.0)
+        + weights["age"] * (age_h / cap_h if cap_h else 0.0)
+        - weights["failure"] * failure_score(rec)
+    )
+
+
+def pick_pack(
+    candidates, status, packs_dir, content_dir, weights, history, default_s, planned=()
+):
+    """The top-scoring candidate; ties go to the longer predicted run.
+
+    Packs in ``planned`` (today's capacity plan) get ``weights["planned"]``
+    on top of their score, so a stale or changed pack outside the plan can
+    still win the slot.
+    """
+    planned = set(planned)
+    scored = [
+        (
+            score_pack(p, status, packs_dir, content_dir, weights)
+            + (weights.get("planned", 0.0) if p in planned else 0.0),
+            history.get(p, default_s),
+            p,
+        )
+        for p in dict.fromkeys(candidates)
+    ]
+    if not scored:
+        return None, None
+    score, _, pack = max(scored, key=lambda t: t[:2])
+    return pack, score
+
+
+def record_result(status, pack_id, rc, packs_dir, content_dir, now=None):
+    now = now or time.time()
+    rec = status.setdefault(pack_id, {})
+    if rc == 0:
+        rec["fingerprint"] = input_fingerprint(pack_id, packs_dir, content_dir)
+        rec["last_ok"] = now
+        # Decay first: legacy records fall back to the streak this resets
+        rec["failure_score"] = round(failure_score(rec) * FAILURE_DECAY, 4)
+        rec["consecutive_failures"] = 0
+    else:
+        rec["last_fail"] = now
+        rec["failure_score"] = failure_score(rec) + 1
+        rec["consecutive_failures"] = rec.get("consecutive_failures", 0) + 1
+        rec["total_failures"] = rec.get("total_failures", 0) + 1
+    return rec
@@ -0,0 +1,126 @@
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from fsutil import atomic_write_text
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-instance guard is best-effort only
+    fcntl = None
+
+
+class StateLocked(RuntimeError):
+    pass
+
+
+class StateStore:
+    """Daily scheduler state as an atomic JSON snapshot plus an append-only journal.
+
+    The snapshot is only rewritten when the day is (re)planned; each finished
+    slot appends one fsync'd line to the journal instead. ``load`` replays the
+    journal over the snapshot, so a restart resumes at the right slot with the
+    existing schedule. An exclusive lock file keeps a second scheduler from
+    sharing the same state directory.
+    """
+
+    def __init__(self, state_dir: Path, name: str = "daily"):
+        self.state_dir = Path(state_dir)
+        self.snapshot_path = self.state_dir / f"{name}_state.json"
+        self.journal_path = self.state_dir / f"{name}_journal.jsonl"
+        self.lock_path = self.state_dir / f"{name}.lock"
+        self._lock_fh = None
+
+    def acquire(self) -> None:
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        fh = open(self.lock_path, "a+", encoding="utf-8")
+        if fcntl is not None:
+            try:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                fh.seek(0)
+                holder = fh.read().strip() or "unknown"
+                fh.close()
+                raise StateLocked(f"{self.lock_path} is held by pid {holder}")
+        fh.seek(0)
+        fh.truncate()
+        fh.write(str(os.getpid()))
+        fh.flush()
+        self._lock_fh = fh
+
+    def release(self) -> None:
+        if self._lock_fh is not None:
+            self._lock_fh.close()
+            self._lock_fh = None
+
+    def load(self) -> dict:
+        try:
+            state = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            state = {}
+        for event in self._journal():
+            apply_event(state, event)
+        return state
+
+    def save(self, state: dict) -> None:
+        atomic_write_text(self.snapshot_path, json.dumps(state, indent=2))
+        # Everything journalled so far is now in the snapshot.
+        with open(self.journal_path, "w", encoding="utf-8"):
+            pass
+
+    def append(self, event: dict) -> None:
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _journal(self):
+        try:
+            f = open(self.journal_path, encoding="utf-8")
+        except OSError:
+            return
+        with f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Torn last line from a crash mid-append.
+                    continue
+
+
+def apply_event(state: dict, event: dict) -> None:
+    """Replay one journal event; idempotent so a snapshot/journal overlap is harmless."""
+    if event.get("day") != state.get("today_key"):
+        return
+    if event.get("event") == "slot":
+        # Only a slot not yet counted moves the ones after it
+        if event.get("slot_s") is not None and event["idx"] >= state.get(
+            "next_slot_idx", 0
+        ):
+            respace(state, event["idx"], event["slot_s"])
+        state["next_slot_idx"] = max(state.get("next_slot_idx", 0), event["idx"] + 1)
+        if event.get("pack"):
+            state["used_today"] = sorted(
+                set(state.get("used_today", [])) | {event["pack"]}
+            )
+
+
+def respace(state: dict, idx: int, slot_s: float) -> None:
+    """Re-derive the slots after ``idx`` from the prediction of the pack that ran there.
+
+    Slot gaps were planned from ``planned_s``, the predicted seconds of each
+    planned run in order. When the pick for slot ``idx`` is a different pack,
+    every later slot moves by the difference between the two predictions.
+    """
+    planned_s = state.get("planned_s")
+    if not planned_s or idx >= len(planned_s):
+        return
+    delta = slot_s - planned_s[idx]
+    planned_s[idx] = slot_s
+    if delta:
+        later = state["schedule"][idx + 1 :]
+        state["schedule"][idx + 1 :] = [
+            (datetime.fromisoformat(s) + timedelta(seconds=delta)).isoformat()
+            for s in later
+        ]
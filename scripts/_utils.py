@@ -1,11 +1,21 @@
+"""Helpers for the scripts/ step scripts.
+
+Uses repo-root modules, so the scripts put the repo root on sys.path first.
+"""
+
 import csv
 import os
-import shutil
 import time
 from typing import Any, Dict
 
 import yaml
 
+from asset_store import place
+
+# env_run_id lives with the tracing code; the step scripts keep importing it from here
+from instrument import env_run_id  # noqa: F401
+from pack_config import load_yaml as _load_yaml
+
 
 def timestamp() -> str:
     return time.strftime("%Y%m%d_%H%M%S")
@@ -16,8 +26,7 @@ def ensure_dir(path: str) -> None:
 
 
 def load_yaml(path: str) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+    data = _load_yaml(path) or {}
     if not isinstance(data, dict):
         raise ValueError(f"YAML at {path} is not a mapping")
     return data
@@ -64,17 +73,9 @@ def copy_if_missing(src: str, dst: str) -> bool:
     if os.path.exists(dst):
         return False
     ensure_dir(os.path.dirname(dst))
-    shutil.copy2(src, dst)
+    place(src, dst)
     return True
 
 
 def log(msg: str) -> None:
     print(msg, flush=True)
-
-
-def env_run_id() -> str:
-    rid = os.environ.get("RUN_ID")
-    if not rid:
-        rid = timestamp()
-        os.environ["RUN_ID"] = rid
-    return rid
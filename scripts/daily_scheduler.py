@@ -1,18 +1,40 @@
 #!/usr/bin/env python3
+import argparse
+import asyncio
 import csv
 import json
 import os
 import random
+import re
+import signal
+import socket
 import subprocess
 import sys
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
 
+# Repo root, for fsutil (used here and by _statestore/_metrics)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from _filewatch import FileWatcher  # noqa: E402
+from _jobqueue import Heartbeat, JobQueue  # noqa: E402
+from _metrics import Registry, ingest_trace, serve, write_textfile  # noqa: E402
+from _priority import pick_pack, record_result  # noqa: E402
+from _statestore import StateLocked, StateStore, respace  # noqa: E402
+
+from fsutil import atomic_write_text  # noqa: E402
+
 ROOT = Path(__file__).resolve().parents[1]
 STATE_DIR = ROOT / ".state"
 STATE_DIR.mkdir(parents=True, exist_ok=True)
-STATE_PATH = STATE_DIR / "daily_state.json"
+# Upper bound on a single timer wait so wall-clock jumps (suspend, DST) are noticed.
+MAX_WAIT_S = 3600
+DURATIONS_PATH = STATE_DIR / "pack_durations.json"
+PACK_STATUS_PATH = STATE_DIR / "pack_status.json"
+METRICS_STATE_PATH = STATE_DIR / "metrics.json"
+METRICS_TEXTFILE = None
+REGISTRY = Registry()
+END_RE = re.compile(r"END\s+pack=(\S+)\s+status=(\S+)\s+duration_s=(\d+)")
 
 
 def load_json(path, default):
@@ -23,8 +45,7 @@ def load_json(path, default):
 
 
 def save_json(path, obj):
-    Path(path).parent.mkdir(parents=True, exist_ok=True)
-    Path(path).write_text(json.dumps(obj, indent=2), encoding="utf-8")
+    atomic_write_text(Path(path), json.dumps(obj, indent=2))
 
 
 def load_config(cfg_path: Path):
@@ -44,6 +65,22 @@ def load_config(cfg_path: Path):
     cfg.setdefault("log_prefix", "scheduler")
     cfg.setdefault("min_gap_seconds", 60)
     cfg.setdefault("tts_voice", "Samantha")
+    cfg.setdefault("default_pack_duration_seconds", 600)
+    cfg.setdefault("duration_ewma_alpha", 0.3)
+    cfg.setdefault("priority", {})
+    for k, v in (
+        ("changed", 10.0),
+        ("age", 5.0),
+        ("age_cap_hours", 72),
+        ("failure", 2.0),
+        ("planned", 3.0),
+    ):
+        cfg["priority"].setdefault(k, v)
+    cfg.setdefault("queue_path", ".state/jobs.sqlite")
+    cfg.setdefault("lease_seconds", 300)
+    cfg.setdefault("worker_poll_seconds", 15)
+    cfg.setdefault("metrics_textfile", "logs/metrics/affiliate_pipeline.prom")
+    cfg.setdefault("metrics_port", 0)
     return cfg
 
 
@@ -57,19 +94,42 @@ def clamp(dt, start, end):
 
 
 def build_daily_schedule(
-    today: datetime, start_hhmm: str, end_hhmm: str, n: int, jitter_s: int
+    today: datetime,
+    start_hhmm: str,
+    end_hhmm: str,
+    n: int,
+    jitter_s: int,
+    durations=None,
+    not_before=None,
 ):
     start = parse_hhmm(today, start_hhmm)
     end = parse_hhmm(today, end_hhmm)
     if end <= start:
         end = end + timedelta(days=1)
+    rnd = random.Random()
+    rnd.seed(int(start.timestamp()) // 86400)
+    if not_before is not None:
+        start = max(start, not_before)
     total = (end - start).total_seconds()
-    if n <= 0:
+    if n <= 0 or total <= 0:
         return []
+    if durations:
+        # Back-to-back predicted work with the slack spread evenly between runs;
+        # jitter never pushes a run into its neighbour's predicted time.
+        durations = list(durations)[:n]
+        n = len(durations)
+        gap = max(0.0, total - sum(durations)) / n
+        jitter_s = min(jitter_s, gap / 2.0)
+        slots = []
+        offset = 0.0
+        for d in durations:
+            base = start + timedelta(seconds=offset + gap / 2.0)
+            jitter = rnd.uniform(-jitter_s, jitter_s) if jitter_s > 0 else 0
+            slots.append(clamp(base + timedelta(seconds=jitter), start, end))
+            offset += d + gap
+        return slots
     step = total / n
     slots = []
-    rnd = random.Random()
-    rnd.seed(int(start.timestamp()) // 86400)
     for i in range(n):
         base = start + timedelta(seconds=i * step + step / 2.0)
         jitter = rnd.uniform(-jitter_s, jitter_s) if jitter_s > 0 else 0
@@ -79,6 +139,85 @@ def build_daily_schedule(
     return slots
 
 
+def window_seconds(
+    today: datetime, start_hhmm: str, end_hhmm: str, not_before=None
+) -> float:
+    start = parse_hhmm(today, start_hhmm)
+    end = parse_hhmm(today, end_hhmm)
+    if end <= start:
+        end = end + timedelta(days=1)
+    if not_before is not None:
+        start = max(start, not_before)
+    return max(0.0, (end - start).total_seconds())
+
+
+def update_duration(history, pack_id, duration_s, alpha):
+    prev = history.get(pack_id)
+    if prev is None:
+        history[pack_id] = float(duration_s)
+    else:
+        history[pack_id] = alpha * float(duration_s) + (1.0 - alpha) * prev
+    return history[pack_id]
+
+
+def seed_durations_from_logs(cfg, history):
+    log_dir = ROOT / cfg["log_dir"]
+    if not log_dir.is_dir():
+        return history
+    for path in sorted(log_dir.glob(f"{cfg['log_prefix']}_*.log")):
+        with path.open(encoding="utf-8", errors="replace") as f:
+            for line in f:
+                m = END_RE.search(line)
+                if m and m.group(2) == "OK":
+                    update_duration(
+                        history,
+                        m.group(1),
+                        int(m.group(3)),
+                        cfg["duration_ewma_alpha"],
+                    )
+    return history
+
+
+def load_durations(cfg):
+    history = load_json(DURATIONS_PATH, None)
+    if history is None:
+        history = seed_durations_from_logs(cfg, {})
+        save_json(DURATIONS_PATH, history)
+    return history
+
+
+def record_duration(cfg, pack_id, duration_s):
+    history = load_json(DURATIONS_PATH, {})
+    update_duration(history, pack_id, duration_s, cfg["duration_ewma_alpha"])
+    save_json(DURATIONS_PATH, history)
+
+
+def plan_daily_runs(packs, history, n, window_s, min_gap_s, default_s, allow_repeat):
+    """Pick up to ``n`` packs, longest predicted first, that fit in ``window_s``.
+
+    Returns ``(planned, predicted, free_s)`` where ``predicted`` holds the
+    expected seconds of each planned run and ``free_s`` the capacity left.
+    """
+    if not packs or n <= 0:
+        return [], [], window_s
+    candidates = list(packs)
+    if allow_repeat:
+        candidates = [packs[i % len(packs)] for i in range(n)]
+    candidates.sort(key=lambda p: history.get(p, default_s), reverse=True)
+    planned, predicted = [], []
+    used = 0.0
+    for p in candidates:
+        if len(planned) >= n:
+            break
+        cost = history.get(p, default_s)
+        if used + cost + min_gap_s > window_s:
+            continue
+        planned.append(p)
+        predicted.append(cost)
+        used += cost + min_gap_s
+    return planned, predicted, window_s - used
+
+
 def load_manifest(manifest_path: Path):
     if not manifest_path.exists():
         return []
@@ -90,20 +229,30 @@ def load_manifest(manifest_path: Path):
     return packs
 
 
-def next_pack(packs, state, allow_repeat):
+def eligible_packs(packs, state, allow_repeat):
+    if allow_repeat:
+        return list(packs)
     used = set(state.get("used_today", []))
-    idx = state.get("round_robin_idx", 0)
-    if not packs:
-        return None
-    for _ in range(len(packs)):
-        p = packs[idx % len(packs)]
-        idx += 1
-        if allow_repeat or p not in used:
-            state["round_robin_idx"] = idx
-            used.add(p)
-            state["used_today"] = list(used)
-            return p
-    return None
+    return [p for p in packs if p not in used]
+
+
+def choose_pack(cfg, packs, state):
+    """Take the top-priority eligible pack; today's planned packs get a bonus."""
+    eligible = eligible_packs(packs, state, cfg["allow_repeat_packs_per_day"])
+    pack, score = pick_pack(
+        eligible,
+        load_json(PACK_STATUS_PATH, {}),
+        ROOT / cfg["packs_dir"],
+        ROOT / cfg["content_dir"],
+        cfg["priority"],
+        load_json(DURATIONS_PATH, {}),
+        cfg["default_pack_duration_seconds"],
+        planned=state.get("planned_packs") or (),
+    )
+    if pack is not None:
+        used = set(state.get("used_today", [])) | {pack}
+        state["used_today"] = sorted(used)
+    return pack, score
 
 
 def ensure_logs(cfg):
@@ -119,7 +268,7 @@ def log_line(path: Path, text: str):
         f.write(f"[{ts}] {text}\n")
 
 
-def run_once(cfg, pack_id, log_path):
+def run_once(cfg, pack_id, log_path, record=True):
     py = cfg["python_path"] or sys.executable
     env = os.environ.copy()
     env["PACKS_DIR"] = cfg["packs_dir"]
@@ -127,25 +276,75 @@ def run_once(cfg, pack_id, log_path):
     env["AUTO_REPAIR_CTA"] = "1" if cfg["auto_repair_cta"] else "0"
     env["FALLBACK_CTA"] = cfg["fallback_cta_default"]
     env["TTS_VOICE"] = cfg.get("tts_voice", "Samantha")
-    cmd = [py, cfg["run_pipeline_path"], pack_id]
     start = datetime.now()
-    log_line(log_path, f"START pack={pack_id} cmd={' '.join(cmd)}")
+    run_id = f"sched_{start:%Y%m%d_%H%M%S}_{pack_id}"
+    env["RUN_ID"] = run_id
+    cmd = [py, cfg["run_pipeline_path"], pack_id]
+    log_line(log_path, f"START pack={pack_id} run_id={run_id} cmd={' '.join(cmd)}")
     rc = subprocess.call(cmd, cwd=str(ROOT), env=env)
     dur = (datetime.now() - start).total_seconds()
     status = "OK" if rc == 0 else f"FAIL(rc={rc})"
     log_line(log_path, f"END   pack={pack_id} status={status} duration_s={int(dur)}")
+    REGISTRY.inc("affiliate_scheduler_runs_total", pack=pack_id)
+    if rc != 0:
+        REGISTRY.inc("affiliate_scheduler_failures_total", pack=pack_id)
+    REGISTRY.observe("affiliate_pack_run_duration_seconds", dur, pack=pack_id)
+    ingest_trace(REGISTRY, ROOT / "logs" / f"run_{run_id}" / "trace.jsonl")
+    publish_metrics(cfg)
+    if record:
+        record_run(cfg, pack_id, rc, dur)
     return rc
 
 
-def sleep_until(target_dt, min_gap_s):
-    now = datetime.now()
-    if target_dt <= now:
-        return
-    gap = (target_dt - now).total_seconds()
-    while gap > 0:
-        s = min(gap, max(5, min_gap_s))
-        time.sleep(s)
-        gap -= s
+def init_metrics(cfg, port=None, worker_id=None):
+    """Restore this process's counters and start exporting them.
+
+    A worker keeps its own state file and textfile (named after its id), and
+    its series carry a worker label. So a coordinator and workers on one host
+    never overwrite each other's counters, and node_exporter can read all
+    the textfiles side by side.
+    """
+    global METRICS_STATE_PATH, METRICS_TEXTFILE
+    textfile = ROOT / cfg["metrics_textfile"] if cfg.get("metrics_textfile") else None
+    if worker_id:
+        slug = re.sub(r"[^A-Za-z0-9_.-]", "_", worker_id)
+        REGISTRY.const_labels = {"worker": worker_id}
+        METRICS_STATE_PATH = STATE_DIR / f"metrics_worker_{slug}.json"
+        if textfile is not None:
+            textfile = textfile.with_name(
+                f"{textfile.stem}_worker_{slug}{textfile.suffix}"
+            )
+    METRICS_TEXTFILE = textfile
+    REGISTRY.restore(load_json(METRICS_STATE_PATH, {}))
+    port = cfg["metrics_port"] if port is None else port
+    if port:
+        serve(REGISTRY, port)
+    publish_metrics(cfg)
+
+
+def publish_metrics(cfg):
+    if METRICS_TEXTFILE is not None:
+        write_textfile(REGISTRY, METRICS_TEXTFILE)
+    save_json(METRICS_STATE_PATH, REGISTRY.dump())
+
+
+def record_run(cfg, pack_id, rc, duration_s):
+    if rc == 0:
+        record_duration(cfg, pack_id, duration_s)
+    status = load_json(PACK_STATUS_PATH, {})
+    record_result(
+        status, pack_id, rc, ROOT / cfg["packs_dir"], ROOT / cfg["content_dir"]
+    )
+    save_json(PACK_STATUS_PATH, status)
+
+
+def run_with_retry(cfg, pack_id, log_path, record=True):
+    rc = run_once(cfg, pack_id, log_path, record=record)
+    if rc != 0 and cfg["max_retries_per_pack"] > 0:
+        log_line(log_path, f"RETRY scheduling for pack={pack_id}")
+        REGISTRY.inc("affiliate_scheduler_retries_total", pack=pack_id)
+        rc = run_once(cfg, pack_id, log_path, record=record)
+    return rc
 
 
 def rollover_if_needed(state, today):
@@ -154,65 +353,350 @@ def rollover_if_needed(state, today):
         state.clear()
         state["today_key"] = today_key
         state["used_today"] = []
-        state["round_robin_idx"] = 0
         state["schedule"] = []
-        save_json(STATE_PATH, state)
+        return True
+    return False
 
 
-def main():
-    cfg_path = ROOT / "config" / "scheduler.config.json"
-    if len(sys.argv) > 1 and sys.argv[1] in ("-c", "--config"):
-        cfg_path = Path(sys.argv[2]).resolve()
-    cfg = load_config(cfg_path)
+class DailyScheduler:
+    """Plans the day and fires one pack per slot.
+
+    In ``local`` mode the pack runs here; in ``coordinator`` mode it is put on
+    the shared job queue for ``worker`` processes on any host to pick up.
+    """
+
+    def __init__(self, cfg_path: Path, queue=None):
+        self.cfg_path = cfg_path
+        self.queue = queue
+        self.cfg = load_config(cfg_path)
+        self.log_path = ensure_logs(self.cfg)
+        self.store = StateStore(STATE_DIR)
+        self.state = {}
+        self._packs = None
+        self._pending = set()
+        self._wake = None
+        self._watcher = None
+        self._complete_logged = False
+
+    def manifest_path(self) -> Path:
+        return ROOT / self.cfg["manifest_path"]
+
+    def packs(self):
+        if self._packs is None:
+            self._packs = load_manifest(self.manifest_path())
+        return self._packs
+
+    def request_reload(self, what):
+        self._pending |= set(what)
+        self._wake.set()
+
+    def _on_files_changed(self, paths):
+        what = set()
+        if self.cfg_path.resolve() in paths:
+            what.add("config")
+        if self.manifest_path().resolve() in paths:
+            what.add("manifest")
+        if what:
+            self.request_reload(what)
+
+    def _watch(self, loop):
+        if self._watcher is not None:
+            self._watcher.stop()
+        self._watcher = FileWatcher(
+            [self.cfg_path, self.manifest_path()], self._on_files_changed
+        )
+        backend = self._watcher.start(loop, poll_s=max(5, self.cfg["min_gap_seconds"]))
+        log_line(self.log_path, f"WATCH backend={backend}")
+
+    def _apply_reloads(self, loop) -> bool:
+        """Reload whatever changed; returns True if anything did."""
+        pending, self._pending = self._pending, set()
+        if "config" in pending:
+            old_manifest = self.manifest_path()
+            self.cfg = load_config(self.cfg_path)
+            self.log_path = ensure_logs(self.cfg)
+            log_line(self.log_path, f"RELOAD config {self.cfg_path}")
+            if self.manifest_path() != old_manifest:
+                pending.add("manifest")
+                self._watch(loop)
+        if "manifest" in pending:
+            self._packs = None
+            log_line(self.log_path, f"RELOAD manifest {self.manifest_path()}")
+        return bool(pending)
+
+    async def _sleep_until(self, target_dt) -> bool:
+        """Wait for ``target_dt``; returns False if woken early by a reload."""
+        while True:
+            remaining = (target_dt - datetime.now()).total_seconds()
+            if remaining <= 0:
+                return True
+            try:
+                await asyncio.wait_for(self._wake.wait(), min(remaining, MAX_WAIT_S))
+            except asyncio.TimeoutError:
+                continue
+            self._wake.clear()
+            return False
+
+    def _plan_today(self, today, replan=False):
+        """Plan the day; with ``replan``, only the slots not fired yet, from now on."""
+        cfg = self.cfg
+        done = self.state.get("next_slot_idx", 0) if replan else 0
+        not_before = today if replan else None
+        window_s = window_seconds(
+            today, cfg["window"]["start"], cfg["window"]["end"], not_before
+        )
+        packs = self.packs()
+        if replan:
+            packs = eligible_packs(packs, self.state, cfg["allow_repeat_packs_per_day"])
+        runs = max(0, cfg["daily_runs"] - done)
+        planned, predicted, free_s = plan_daily_runs(
+            packs,
+            load_durations(cfg),
+            runs,
+            window_s,
+            cfg["min_gap_seconds"],
+            cfg["default_pack_duration_seconds"],
+            cfg["allow_repeat_packs_per_day"],
+        )
+        slots = build_daily_schedule(
+            today,
+            cfg["window"]["start"],
+            cfg["window"]["end"],
+            len(planned) if planned else runs,
+            cfg["window"].get("jitter_seconds", 0),
+            durations=[d + cfg["min_gap_seconds"] for d in predicted],
+            not_before=not_before,
+        )
+        # Slots already fired stay as they were
+        fired = self.state.get("schedule", [])[:done]
+        fired_packs = (self.state.get("planned_packs") or [])[:done]
+        fired_s = (self.state.get("planned_s") or [])[:done]
+        fired_s += [cfg["default_pack_duration_seconds"]] * (done - len(fired_s))
+        self.state["schedule"] = fired + [dt.isoformat() for dt in slots]
+        self.state["planned_packs"] = fired_packs + planned
+        self.state["planned_s"] = fired_s + predicted
+        self.state["next_slot_idx"] = done
+        self.store.save(self.state)
+        self._complete_logged = False
+        verb, first = ("REPLAN", f"{today:%H:%M}") if replan else ("SCHEDULE", None)
+        log_line(
+            self.log_path,
+            f"{verb} {len(slots)} slots from {first or cfg['window']['start']} "
+            f"to {cfg['window']['end']}",
+        )
+        log_line(
+            self.log_path,
+            f"CAPACITY window_s={int(window_s)} predicted_s={int(sum(predicted))} "
+            f"free_s={int(free_s)} planned={len(planned)}/{cfg['daily_runs']}",
+        )
+
+    def _collect_finished(self):
+        jobs = self.queue.collect_finished()
+        for job in jobs:
+            rc = job["rc"] if job["rc"] is not None else -1
+            REGISTRY.inc(
+                "affiliate_scheduler_jobs_total",
+                pack=job["pack_id"],
+                status=job["status"],
+            )
+            log_line(
+                self.log_path,
+                f"JOB   pack={job['pack_id']} job={job['job_key']} worker={job['worker']} "
+                f"status={job['status']} attempts={job['attempts']}",
+            )
+            record_run(self.cfg, job["pack_id"], rc, job["duration_s"] or 0)
+        if jobs:
+            publish_metrics(self.cfg)
+
+    def _finish_slot(self, i, pack=None, rc=None, slot_s=None):
+        self.state["next_slot_idx"] = i + 1
+        self.store.append(
+            {
+                "event": "slot",
+                "day": self.state["today_key"],
+                "idx": i,
+                "pack": pack,
+                "rc": rc,
+                "slot_s": slot_s,
+                "ts": datetime.now().isoformat(timespec="seconds"),
+            }
+        )
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        try:
+            loop.add_signal_handler(
+                signal.SIGHUP, self.request_reload, {"config", "manifest"}
+            )
+        except (AttributeError, NotImplementedError):
+            pass
+        self.state = self.store.load()
+        if self.state.get("schedule"):
+            log_line(
+                self.log_path,
+                f"RESUME day={self.state.get('today_key')} next_slot={self.state.get('next_slot_idx', 0)}",
+            )
+        self._watch(loop)
+        while True:
+            reloaded = self._apply_reloads(loop)
+            cfg = self.cfg
+            today = datetime.now()
+            if rollover_if_needed(self.state, today):
+                self.store.save(self.state)
+            if not self.state.get("schedule"):
+                self._plan_today(today)
+            elif reloaded:
+                # New packs or settings count from now on, not from tomorrow
+                self._plan_today(today, replan=True)
+            slots = [datetime.fromisoformat(s) for s in self.state["schedule"]]
+            i = self.state.get("next_slot_idx", 0)
+            if i >= len(slots):
+                if self.queue is not None:
+                    # Fold in the last slots' results before calling it a day
+                    self._collect_finished()
+                    if self.queue.outstanding(f"{self.state['today_key']}#"):
+                        await self._sleep_until(
+                            datetime.now()
+                            + timedelta(seconds=cfg["worker_poll_seconds"])
+                        )
+                        continue
+                tomorrow = today + timedelta(days=1)
+                next_start = parse_hhmm(tomorrow, cfg["window"]["start"])
+                if not self._complete_logged:
+                    log_line(self.log_path, "DAY COMPLETE sleeping until next window.")
+                    self._complete_logged = True
+                await self._sleep_until(next_start)
+                continue
+            if not await self._sleep_until(slots[i]):
+                continue
+            packs = self.packs()
+            if not packs:
+                log_line(
+                    self.log_path, "WARN no enabled packs in manifest; skipping slot."
+                )
+                self._finish_slot(i)
+                continue
+            pack, score = choose_pack(cfg, packs, self.state)
+            if pack is None:
+                log_line(self.log_path, "INFO no eligible packs this slot; skipping.")
+                self._finish_slot(i)
+                continue
+            log_line(self.log_path, f"PICK  pack={pack} score={score:.2f}")
+            # The pick may not be the pack slot i was spaced for; later slots
+            # follow the picked pack's prediction instead
+            slot_s = load_json(DURATIONS_PATH, {}).get(
+                pack, cfg["default_pack_duration_seconds"]
+            )
+            respace(self.state, i, slot_s)
+            if self.queue is not None:
+                self._collect_finished()
+                key = f"{self.state['today_key']}#{i}"
+                added = self.queue.enqueue(
+                    key, pack, {"slot": i}, max_attempts=cfg["max_retries_per_pack"] + 1
+                )
+                log_line(self.log_path, f"ENQUEUE pack={pack} job={key} new={added}")
+                self._finish_slot(i, pack, None, slot_s)
+                continue
+            rc = await loop.run_in_executor(
+                None, run_with_retry, cfg, pack, self.log_path
+            )
+            self._finish_slot(i, pack, rc, slot_s)
+            await asyncio.sleep(cfg["min_gap_seconds"])
+
+
+def run_worker(cfg, queue, worker_id):
+    """Lease pack jobs from the shared queue until interrupted."""
     log_path = ensure_logs(cfg)
+    lease_s = cfg["lease_seconds"]
+    log_line(log_path, f"WORKER start id={worker_id} queue={queue.path}")
     while True:
-        today = datetime.now()
-        state = load_json(STATE_PATH, {})
-        rollover_if_needed(state, today)
-        if not state.get("schedule"):
-            slots = build_daily_schedule(
-                today,
-                cfg["window"]["start"],
-                cfg["window"]["end"],
-                cfg["daily_runs"],
-                cfg["window"].get("jitter_seconds", 0),
-            )
-            state["schedule"] = [dt.isoformat() for dt in slots]
-            state["next_slot_idx"] = 0
-            save_json(STATE_PATH, state)
+        job = queue.lease(worker_id, lease_s)
+        if job is None:
+            time.sleep(cfg["worker_poll_seconds"])
+            continue
+        pack = job["pack_id"]
+        log_line(
+            log_path,
+            f"LEASE pack={pack} job={job['job_key']} attempt={job['attempts']}",
+        )
+        hb = Heartbeat(queue, job["id"], worker_id, lease_s)
+        hb.start()
+        start = time.monotonic()
+        try:
+            rc = run_once(cfg, pack, log_path, record=False)
+        finally:
+            hb.stop()
+        status = None
+        if not hb.lost:
+            status = queue.complete(job["id"], worker_id, rc, time.monotonic() - start)
+        if status is None:
+            why = f" ({hb.error})" if hb.error else ""
             log_line(
                 log_path,
-                f"SCHEDULE {len(slots)} slots from {cfg['window']['start']} to {cfg['window']['end']}",
+                f"WARN lease lost for job={job['job_key']}{why}; result discarded",
             )
-        slots = [datetime.fromisoformat(s) for s in state["schedule"]]
-        i = state.get("next_slot_idx", 0)
-        if i >= len(slots):
-            tomorrow = today + timedelta(days=1)
-            next_start = parse_hhmm(tomorrow, cfg["window"]["start"])
-            log_line(log_path, "DAY COMPLETE sleeping until next window.")
-            sleep_until(next_start, cfg["min_gap_seconds"])
-            continue
-        target = slots[i]
-        sleep_until(target, cfg["min_gap_seconds"])
-        packs = load_manifest(ROOT / cfg["manifest_path"])
-        if not packs:
-            log_line(log_path, "WARN no enabled packs in manifest; skipping slot.")
-            state["next_slot_idx"] = i + 1
-            save_json(STATE_PATH, state)
-            continue
-        pack = next_pack(packs, state, cfg["allow_repeat_packs_per_day"])
-        if pack is None:
-            log_line(log_path, "INFO no eligible packs this slot; skipping.")
-            state["next_slot_idx"] = i + 1
-            save_json(STATE_PATH, state)
-            continue
-        rc = run_once(cfg, pack, log_path)
-        if rc != 0 and cfg["max_retries_per_pack"] > 0:
-            log_line(log_path, f"RETRY scheduling for pack={pack}")
-            rc = run_once(cfg, pack, log_path)
-        state["next_slot_idx"] = i + 1
-        save_json(STATE_PATH, state)
-        time.sleep(cfg["min_gap_seconds"])
+        elif status == "queued":
+            # Left for the next lease, here or on another worker
+            log_line(log_path, f"RETRY scheduling for pack={pack} job={job['job_key']}")
+            REGISTRY.inc("affiliate_scheduler_retries_total", pack=pack)
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Run packs on a daily schedule.")
+    ap.add_argument(
+        "-c",
+        "--config",
+        default=str(ROOT / "config" / "scheduler.config.json"),
+        help="Scheduler config JSON",
+    )
+    ap.add_argument(
+        "--mode",
+        choices=("local", "coordinator", "worker"),
+        default="local",
+        help="local: run packs here; coordinator: enqueue them; worker: run queued packs",
+    )
+    ap.add_argument(
+        "--queue", help="Shared job queue SQLite path (overrides queue_path)"
+    )
+    ap.add_argument(
+        "--worker-id",
+        default=f"{socket.gethostname()}:{os.getpid()}",
+        help="Worker identity recorded on leased jobs",
+    )
+    ap.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus metrics on 127.0.0.1:PORT (overrides metrics_port; 0 disables)",
+    )
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    cfg_path = Path(args.config).resolve()
+    cfg = load_config(cfg_path)
+    init_metrics(
+        cfg, args.metrics_port, args.worker_id if args.mode == "worker" else None
+    )
+    queue = None
+    if args.mode != "local":
+        queue = JobQueue(ROOT / (args.queue or cfg["queue_path"]))
+        if args.mode == "worker":
+            try:
+                run_worker(cfg, queue, args.worker_id)
+            except KeyboardInterrupt:
+                pass
+            return
+    scheduler = DailyScheduler(cfg_path, queue=queue)
+    try:
+        scheduler.store.acquire()
+    except StateLocked as e:
+        raise SystemExit(f"❌ Another scheduler is running: {e}")
+    try:
+        asyncio.run(scheduler.run())
+    finally:
+        scheduler.store.release()
 
 
 if __name__ == "__main__":
@@ -5,6 +5,10 @@ import subprocess
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from instrument import run as traced_run  # noqa: E402
+from instrument import span  # noqa: E402
+
 CONTENT_DIR = os.getenv("CONTENT_DIR", "content")
 CTA_PATTERN = re.compile(r"(?mi)^\s*CTA_PRIMARY\s*:\s*\S.+$")
 
@@ -25,10 +29,13 @@ def synth_one_txt(txt_path: Path, voice: str) -> bool:
     tmp_txt = txt_path.with_suffix(".tmp.txt")
     tmp_txt.write_text(text, encoding="utf-8")
     try:
-        subprocess.check_call(
-            ["say", "-v", voice, "-f", str(tmp_txt), "-o", str(aiff_path)]
+        traced_run(
+            ["say", "-v", voice, "-f", str(tmp_txt), "-o", str(aiff_path)],
+            name="tts.say",
+            attrs={"file": txt_path.name, "chars": len(text)},
+            check=True,
         )
-        subprocess.check_call(
+        traced_run(
             [
                 "afconvert",
                 "-f",
@@ -39,7 +46,10 @@ def synth_one_txt(txt_path: Path, voice: str) -> bool:
                 "22050",
                 str(aiff_path),
                 str(wav_path),
-            ]
+            ],
+            name="tts.afconvert",
+            attrs={"file": wav_path.name},
+            check=True,
         )
     finally:
         if aiff_path.exists():
@@ -50,6 +60,11 @@ def synth_one_txt(txt_path: Path, voice: str) -> bool:
 
 
 def main():
+    with span("generate_wav_from_txt", pack=sys.argv[1] if len(sys.argv) > 1 else None):
+        _main()
+
+
+def _main():
     if len(sys.argv) < 2:
         print("Usage: generate_wav_from_txt.py PACK_ID")
         sys.exit(2)
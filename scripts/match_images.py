@@ -1,9 +1,21 @@
 #!/usr/bin/env python3
 import os
 import re
+import sys
+from pathlib import Path
 
-from _utils import (copy_if_missing, ensure_dir, env_run_id, list_packs, log,
-                    write_csv)
+# Repo root, for image_index and the modules _utils builds on
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from _utils import (  # noqa: E402
+    copy_if_missing,
+    ensure_dir,
+    env_run_id,
+    list_packs,
+    log,
+    write_csv,
+)
+
+from image_index import DEFAULT_DISTANCE, ImageIndex, hamming  # noqa: E402
 
 PACKS_ROOT = "packs"
 RUN_ID = env_run_id()
@@ -19,20 +31,60 @@ def extract_step_index(filename: str, seq: int) -> str:
     return str(seq).zfill(2)
 
 
-def find_image_for_step(images_dir: str, step: str) -> str | None:
+def find_images_for_step(images_dir: str, step: str) -> list[str]:
+    """Candidates for a step: exact ``<step>.<ext>`` first, then ``<step>_*``."""
+    out = []
     for ext in IMG_EXTS:
         candidate = os.path.join(images_dir, f"{step}{ext}")
         if os.path.isfile(candidate):
-            return candidate
-    for fn in os.listdir(images_dir) if os.path.isdir(images_dir) else []:
+            out.append(candidate)
+    for fn in sorted(os.listdir(images_dir)) if os.path.isdir(images_dir) else []:
         base, ext = os.path.splitext(fn)
-        if ext.lower() in IMG_EXTS and (base == step or base.startswith(f"{step}_")):
-            return os.path.join(images_dir, fn)
-    return None
+        path = os.path.join(images_dir, fn)
+        if (
+            ext.lower() in IMG_EXTS
+            and (base == step or base.startswith(f"{step}_"))
+            and path not in out
+        ):
+            out.append(path)
+    return out
+
+
+def find_image_for_step(images_dir: str, step: str) -> str | None:
+    found = find_images_for_step(images_dir, step)
+    return found[0] if found else None
+
+
+def pick_distinct(
+    candidates: list[str], used: list[dict], index: ImageIndex
+) -> tuple[str | None, bool]:
+    """First candidate that does not look like an image already used in the pack.
+
+    Returns (path, is_duplicate); falls back to the first candidate when
+    every one repeats an earlier step's visual.
+    """
+    for path in candidates:
+        rec = index.record(path)
+        if rec is None:
+            continue
+        dup = any(
+            rec["sha256"] == u["sha256"]
+            or (
+                rec["dhash"] is not None
+                and u["dhash"] is not None
+                and hamming(rec["dhash"], u["dhash"]) <= DEFAULT_DISTANCE
+            )
+            for u in used
+        )
+        if not dup:
+            used.append(rec)
+            return path, False
+    return (candidates[0], True) if candidates else (None, False)
 
 
 def main():
     packs = list_packs(PACKS_ROOT)
+    index = ImageIndex()
     summary_rows = []
     for pack in packs:
         pack_name = os.path.basename(pack)
@@ -46,12 +98,16 @@ def main():
         )
         narration_txts = [p for p in narration_txts if p.lower().endswith(".txt")]
         fallback_src = os.path.join(img_dir, FALLBACK_NAME)
-        created = matched = missing = 0
+        created = matched = missing = duplicates = 0
         mapping_rows = []
+        used = []  # hashes of images already matched in this pack
 
         for i, npath in enumerate(narration_txts, start=1):
             step = extract_step_index(npath, i)
-            found = find_image_for_step(img_dir, step)
+            found, is_duplicate = pick_distinct(
+                find_images_for_step(img_dir, step), used, index
+            )
+            duplicates += is_duplicate
             out_img = ""
             is_fallback = False
             if found:
@@ -78,6 +134,7 @@ def main():
                     "image_path": out_img,
                     "is_fallback": is_fallback,
                     "had_image": bool(found),
+                    "is_duplicate": is_duplicate,
                 }
             )
 
@@ -93,6 +150,7 @@ def main():
                 "image_path",
                 "is_fallback",
                 "had_image",
+                "is_duplicate",
             ],
         )
 
@@ -109,7 +167,8 @@ def main():
             }
         )
         log(
-            f"[{RUN_ID}] IMG  | {pack_name} | matched={matched} fallback_created={created} missing={missing}"
+            f"[{RUN_ID}] IMG  | {pack_name} | matched={matched} "
+            f"fallback_created={created} missing={missing} duplicates={duplicates}"
         )
 
     out_csv = os.path.join("logs", f"run_{RUN_ID}", "match_images.csv")
@@ -3,8 +3,11 @@ import csv
 import os
 import subprocess
 import sys
+from pathlib import Path
 
-from _utils import ensure_dir, env_run_id, log
+# Repo root, for the modules _utils builds on
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from _utils import ensure_dir, env_run_id, log  # noqa: E402
 
 RUN_ID = env_run_id()
 
@@ -1,7 +1,18 @@
 #!/usr/bin/env python3
 import os
+import sys
+from pathlib import Path
 
-from _utils import dump_yaml, env_run_id, list_packs, load_yaml, log, write_csv
+# Repo root, for the modules _utils builds on
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from _utils import (  # noqa: E402
+    dump_yaml,
+    env_run_id,
+    list_packs,
+    load_yaml,
+    log,
+    write_csv,
+)
 
 PACKS_ROOT = "packs"
 TEMPLATE_CTA = "templates/cta_primary.txt"
@@ -1,8 +1,8 @@
 # seed_images_from_template.py
 import os
-import shutil
 
-import yaml
+from asset_store import place
+from pack_config import load_yaml
 
 
 def slugify(name):
@@ -15,8 +15,7 @@ def seed_images(pack_id, source_pool="content/003_affiliate_airfryer/images"):
 
     os.makedirs(image_dest, exist_ok=True)
 
-    with open(input_path) as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(input_path)
 
     products = data.get("products", [])
     if not products:
@@ -41,7 +40,7 @@ def seed_images(pack_id, source_pool="content/003_affiliate_airfryer/images"):
         slug = slugify(product.get("name", f"product{i+1}"))
         target_path = os.path.join(image_dest, f"{slug}.jpg")
         source_img = pool_images[i % len(pool_images)]
-        shutil.copy2(source_img, target_path)
+        place(source_img, target_path)  # hardlink to the shared store, not a copy
         print(f"✅ {slug}.jpg ← {os.path.basename(source_img)}")
 
 
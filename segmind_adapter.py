@@ -1,16 +1,27 @@
 import os
 
-import requests
-from tqdm import tqdm
-
 SEGMIND_API_KEY = os.getenv("SEGMIND_API_KEY", "SG_1da1828b99ada0e6")
 SEGMIND_ENDPOINT = "https://api.segmind.com/v1/pixelflow"
+# (connect, read) seconds; generation runs inside the request, so read is long
+SEGMIND_TIMEOUT = (10, float(os.getenv("SEGMIND_TIMEOUT_S", "600")))
 
 
 def generate_product_video(image_path, prompt, output_path):
+    import requests
+    from tqdm import tqdm
+
+    from downloader import download
+    from segmind_cache import SegmindCache, cache_key
+
     if not os.path.exists(image_path):
         raise FileNotFoundError(f"Image not found: {image_path}")
 
+    cache = SegmindCache()
+    key = cache_key(image_path, prompt, SEGMIND_ENDPOINT)
+    if cache.fetch(key, output_path):
+        print(f"♻️ Cache hit ({key[:12]}), no generation needed: {output_path}")
+        return
+
     with open(image_path, "rb") as img_file:
         files = {"image": img_file}
         data = {"prompt": prompt}
@@ -18,7 +29,11 @@ def generate_product_video(image_path, prompt, output_path):
 
         print(f"📤 Sending image to Segmind: {image_path}")
         response = requests.post(
-            SEGMIND_ENDPOINT, headers=headers, files=files, data=data
+            SEGMIND_ENDPOINT,
+            headers=headers,
+            files=files,
+            data=data,
+            timeout=SEGMIND_TIMEOUT,
         )
         response.raise_for_status()
 
@@ -27,13 +42,20 @@ def generate_product_video(image_path, prompt, output_path):
             raise ValueError("No video URL returned from Segmind")
 
         print(f"📥 Downloading video from: {video_url}")
-        video_response = requests.get(video_url, stream=True)
-        video_response.raise_for_status()
-
-        with open(output_path, "wb") as f:
-            for chunk in tqdm(
-                video_response.iter_content(chunk_size=8192), desc="Saving video"
-            ):
-                f.write(chunk)
+        # Resumes from output_path.part if an earlier download was cut off
+        with tqdm(desc="Saving video", unit="B", unit_scale=True) as bar:
+
+            def on_chunk(n, total):
+                bar.total = total
+                bar.update(n)
+
+            download(video_url, output_path, progress=on_chunk)
+        cache.store(
+            key,
+            output_path,
+            prompt=prompt,
+            endpoint=SEGMIND_ENDPOINT,
+            image=str(image_path),
+        )
 
         print(f"✅ Video saved to: {output_path}")
@@ -0,0 +1,206 @@
+# segmind_cache.py
+"""Content-addressed cache of generated Segmind videos.
+
+Key = sha256 over (sha256 of the image bytes, prompt, endpoint, params), so
+the same image and prompt never pay for a second generation. Videos live in
+.cache/segmind/objects/<ab>/<key>.mp4 with a JSON index (size, last use,
+hits, pinned). When the cache grows past ``max_bytes`` the least recently
+used unpinned entries are evicted.
+
+    python segmind_cache.py stats
+    python segmind_cache.py list
+    python segmind_cache.py pin KEY [KEY ...]     # never evict (key prefix ok)
+    python segmind_cache.py unpin KEY [KEY ...]
+    python segmind_cache.py --max-bytes N evict
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+from fsutil import atomic_write_text, file_sha256
+from instrument import span
+
+try:
+    import fcntl
+except ImportError:  # Windows: index updates are not serialised across processes
+    fcntl = None
+
+ROOT = Path(__file__).resolve().parent
+CACHE_DIR = Path(os.getenv("SEGMIND_CACHE_DIR", str(ROOT / ".cache" / "segmind")))
+MAX_BYTES = int(os.getenv("SEGMIND_CACHE_MAX_BYTES", str(5 << 30)))
+
+
+def cache_key(
+    image_path, prompt: str, endpoint: str, params: dict | None = None
+) -> str:
+    material = {
+        "image": file_sha256(image_path),
+        "prompt": prompt,
+        "endpoint": endpoint,
+        "params": params or {},
+    }
+    return hashlib.sha256(
+        json.dumps(material, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def _copy_atomic(src: Path, dst: Path) -> None:
+    # A copy, not a hardlink: ffmpeg -y truncates its output in place, which
+    # would corrupt a linked cache object.
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+class SegmindCache:
+    def __init__(self, root=CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.index_path = self.root / "index.json"
+        self.lock_path = self.root / "index.lock"
+
+    def object_path(self, key: str) -> Path:
+        return self.root / "objects" / key[:2] / f"{key}.mp4"
+
+    @contextlib.contextmanager
+    def _index(self):
+        """Load, yield and save the index under an exclusive file lock."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a+") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                index = json.loads(self.index_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                index = {}
+            yield index
+            atomic_write_text(
+                self.index_path, json.dumps(index, indent=1, sort_keys=True)
+            )
+
+    def entries(self) -> dict:
+        try:
+            return json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def fetch(self, key: str, dest) -> bool:
+        """Copy the cached video for ``key`` to ``dest``; False on a miss."""
+        with span("segmind_cache", key=key[:12]) as a:
+            obj = self.object_path(key)
+            with self._index() as index:
+                entry = index.get(key)
+                if entry is None or not obj.exists():
+                    index.pop(key, None)
+                    a["cache"] = "miss"
+                    return False
+                # Still under the lock, so another process's evict can't
+                # unlink the object halfway through the copy
+                _copy_atomic(obj, Path(dest))
+                entry["last_used"] = time.time()
+                entry["hits"] = entry.get("hits", 0) + 1
+            a["cache"] = "hit"
+            return True
+
+    def store(self, key: str, video_path, **meta) -> Path:
+        obj = self.object_path(key)
+        _copy_atomic(Path(video_path), obj)
+        now = time.time()
+        with self._index() as index:
+            old = index.get(key) or {}
+            index[key] = {
+                **meta,
+                "size": obj.stat().st_size,
+                "created": old.get("created", now),
+                "last_used": now,
+                "hits": old.get("hits", 0),
+                "pinned": old.get("pinned", False),
+            }
+            self._evict(index)
+        return obj
+
+    def set_pinned(self, prefixes, pinned: bool) -> list[str]:
+        with self._index() as index:
+            keys = [k for k in index if any(k.startswith(p) for p in prefixes)]
+            for k in keys:
+                index[k]["pinned"] = pinned
+            if not pinned:
+                self._evict(index)
+        return keys
+
+    def evict(self) -> list[str]:
+        with self._index() as index:
+            return self._evict(index)
+
+    def _evict(self, index: dict) -> list[str]:
+        total = sum(e.get("size", 0) for e in index.values())
+        removed = []
+        for key, entry in sorted(
+            index.items(), key=lambda kv: kv[1].get("last_used", 0)
+        ):
+            if total <= self.max_bytes:
+                break
+            if entry.get("pinned"):
+                continue
+            self.object_path(key).unlink(missing_ok=True)
+            total -= entry.get("size", 0)
+            removed.append(key)
+        for key in removed:
+            del index[key]
+        return removed
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Inspect and manage the Segmind result cache."
+    )
+    ap.add_argument("--dir", default=str(CACHE_DIR))
+    ap.add_argument("--max-bytes", type=int, default=MAX_BYTES)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats")
+    sub.add_parser("list")
+    for name in ("pin", "unpin"):
+        p = sub.add_parser(name)
+        p.add_argument("keys", nargs="+", help="Cache keys or key prefixes")
+    sub.add_parser("evict")
+    args = ap.parse_args()
+
+    cache = SegmindCache(args.dir, args.max_bytes)
+    if args.cmd == "stats":
+        entries = cache.entries()
+        size = sum(e.get("size", 0) for e in entries.values())
+        pinned = sum(1 for e in entries.values() if e.get("pinned"))
+        hits = sum(e.get("hits", 0) for e in entries.values())
+        print(
+            f"📦 {len(entries)} entries, {size / 1e6:.1f} MB of "
+            f"{cache.max_bytes / 1e6:.0f} MB, {pinned} pinned, {hits} hits"
+        )
+    elif args.cmd == "list":
+        for key, e in sorted(
+            cache.entries().items(), key=lambda kv: -kv[1].get("last_used", 0)
+        ):
+            used = time.strftime(
+                "%Y-%m-%d %H:%M", time.localtime(e.get("last_used", 0))
+            )
+            pin = "📌" if e.get("pinned") else "  "
+            mb = e.get("size", 0) / 1e6
+            print(
+                f"{pin} {key[:16]}  {mb:7.1f} MB  hits={e.get('hits', 0):<3} "
+                f"{used}  {e.get('prompt', '')[:50]}"
+            )
+    elif args.cmd in ("pin", "unpin"):
+        keys = cache.set_pinned(args.keys, args.cmd == "pin")
+        print(f"✅ {args.cmd}ned {len(keys)} entr{'y' if len(keys) == 1 else 'ies'}")
+    elif args.cmd == "evict":
+        removed = cache.evict()
+        print(f"🧹 Evicted {len(removed)} entr{'y' if len(removed) == 1 else 'ies'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+# segmind_client.py
+"""Async client for Segmind workflow runs (submit -> poll_url -> video_out).
+
+Many product-video jobs run at once: ``concurrency`` caps jobs in flight,
+``rate_per_s`` caps HTTP requests across all of them, and polling backs off
+exponentially with jitter. Results are fetched with downloader.download
+(``<output>.part``, Range resume, atomic rename).
+
+HTTP calls are blocking ``requests`` calls run in worker threads, so the
+client needs nothing beyond what segmind_adapter already uses.
+
+    python segmind_client.py jobs.json
+    # jobs.json: [{"image": "...jpg", "prompt": "...", "output": "...mp4"}, ...]
+
+Try it offline against utils/segmind_mock_server.py:
+    python utils/segmind_mock_server.py --port 8765 &
+    SEGMIND_WORKFLOW_URL=http://127.0.0.1:8765/workflows/mock-v1 python segmind_client.py jobs.json
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+from downloader import download
+from instrument import span
+from segmind_cache import SegmindCache, cache_key
+
+WORKFLOW_URL = os.getenv(
+    "SEGMIND_WORKFLOW_URL", "https://api.segmind.com/workflows/<your_workflow_id>-v1"
+)
+OUTPUT_KEY = "video_out"
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class SegmindError(RuntimeError):
+    pass
+
+
+class RateLimiter:
+    """Spaces calls at least ``1 / rate_per_s`` seconds apart (0 = unlimited)."""
+
+    def __init__(self, rate_per_s: float):
+        self.interval = 1.0 / rate_per_s if rate_per_s > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with "equal jitter": half fixed, half random."""
+    d = min(cap, base * (2**attempt))
+    return d / 2 + random.uniform(0, d / 2)
+
+
+def not_sent(exc) -> bool:
+    """True if ``exc`` (a requests error) means the request never reached the server."""
+    import requests
+    from urllib3.exceptions import ConnectTimeoutError
+
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    if not isinstance(exc, requests.ConnectionError):
+        return False
+    # Refused/unresolvable/connect timeout; not a reset after the body went out
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, ConnectTimeoutError)
+
+
+def extract_video_url(result: dict) -> str | None:
+    for out in result.get("outputs") or []:
+        if out.get("keyname") == OUTPUT_KEY:
+            return (out.get("value") or {}).get("data")
+    return None
+
+
+class SegmindClient:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        workflow_url: str = WORKFLOW_URL,
+        concurrency: int = 4,
+        rate_per_s: float = 2.0,
+        poll_base_s: float = 2.0,
+        poll_max_s: float = 30.0,
+        job_timeout_s: float = 900.0,
+        http_timeout_s: float = 30.0,
+        max_retries: int = 5,
+        cache: SegmindCache | None = None,
+    ):
+        self.api_key = (
+            api_key if api_key is not None else os.getenv("SEGMIND_API_KEY", "")
+        )
+        self.workflow_url = workflow_url
+        self.concurrency = concurrency
+        self.rate_per_s = rate_per_s
+        self.poll_base_s = poll_base_s
+        self.poll_max_s = poll_max_s
+        self.job_timeout_s = job_timeout_s
+        self.http_timeout_s = http_timeout_s
+        self.max_retries = max_retries
+        self.cache = cache if cache is not None else SegmindCache()
+        self._local = threading.local()
+
+    # -- HTTP (runs in worker threads) --
+    def _session(self):
+        import requests
+
+        s = getattr(self._local, "session", None)
+        if s is None:
+            s = self._local.session = requests.Session()
+            s.headers["x-api-key"] = self.api_key
+        return s
+
+    def _download_session(self):
+        """Keyless session: results live on a CDN/bucket host, not the API."""
+        import requests
+
+        s = getattr(self._local, "download_session", None)
+        if s is None:
+            s = self._local.download_session = requests.Session()
+        return s
+
+    def _request_sync(self, method: str, url: str, **kwargs):
+        with span(f"http.segmind.{method.lower()}", url=url) as a:
+            r = self._session().request(
+                method, url, timeout=self.http_timeout_s, **kwargs
+            )
+            a["status_code"] = r.status_code
+            return r
+
+    async def _request(self, method: str, url: str, **kwargs) -> dict:
+        """JSON request with retries on 429/5xx and connection errors.
+
+        A POST starts a paid generation, so it is only resent when the server
+        cannot have accepted it: a 429, or a connection that never got made.
+        A 5xx or a timeout after sending could mean the run was queued anyway.
+        """
+        import requests
+
+        resend_ok = method.upper() != "POST"
+        for attempt in range(self.max_retries + 1):
+            await self._limiter.wait()
+            try:
+                r = await asyncio.to_thread(self._request_sync, method, url, **kwargs)
+            except requests.RequestException as e:
+                if attempt == self.max_retries or not (resend_ok or not_sent(e)):
+                    raise SegmindError(f"{method} {url}: {e}") from e
+            else:
+                retry = r.status_code == 429 or (
+                    resend_ok and r.status_code in RETRY_STATUS
+                )
+                if not retry:
+                    if r.status_code >= 400:
+                        raise SegmindError(
+                            f"{method} {url}: {r.status_code} {r.text.strip()[:200]}"
+                        )
+                    return r.json()
+                if attempt == self.max_retries:
+                    raise SegmindError(
+                        f"{method} {url}: {r.status_code} after {attempt + 1} tries"
+                    )
+                retry_after = r.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    await asyncio.sleep(float(retry_after))
+                    continue
+            await asyncio.sleep(backoff_delay(attempt, 1.0, self.poll_max_s))
+        raise SegmindError(f"{method} {url}: retries exhausted")
+
+    def _download_sync(self, url: str, dest: Path) -> int:
+        return download(
+            url, dest, session=self._download_session(), timeout=self.http_timeout_s
+        )["bytes"]
+
+    # -- Workflow steps --
+    async def submit(self, job: dict) -> str:
+        image_b64 = base64.b64encode(
+            await asyncio.to_thread(Path(job["image"]).read_bytes)
+        ).decode()
+        payload = {
+            "prompt": job["prompt"],
+            "image": image_b64,
+            **(job.get("params") or {}),
+        }
+        resp = await self._request("POST", self.workflow_url, json=payload)
+        poll_url = (resp.get("data") or {}).get("poll_url") or resp.get("poll_url")
+        if not poll_url:
+            raise SegmindError(f"No poll_url in response: {resp}")
+        return poll_url
+
+    async def poll(self, poll_url: str) -> dict:
+        deadline = time.monotonic() + self.job_timeout_s
+        attempt = 0
+        while True:
+            await asyncio.sleep(
+                backoff_delay(attempt, self.poll_base_s, self.poll_max_s)
+            )
+            result = await self._request("GET", poll_url)
+            status = result.get("status")
+            if status == "COMPLETED":
+                return result
+            if status == "FAILED":
+                raise SegmindError(
+                    f"Workflow run failed: {result.get('error') or result}"
+                )
+            if time.monotonic() > deadline:
+                raise SegmindError(
+                    f"Timed out after {self.job_timeout_s:.0f}s (last status {status})"
+                )
+            attempt += 1
+
+    async def run_job(self, job: dict) -> dict:
+        out = {"image": job["image"], "output": job["output"]}
+        t0 = time.monotonic()
+        async with self._sem:
+            try:
+                key = await asyncio.to_thread(
+                    cache_key,
+                    job["image"],
+                    job["prompt"],
+                    self.workflow_url,
+                    job.get("params"),
+                )
+                if await asyncio.to_thread(self.cache.fetch, key, job["output"]):
+                    out.update(status="ok", cached=True)
+                    out["seconds"] = round(time.monotonic() - t0, 3)
+                    print(f"♻️ Cache hit: {job['output']}")
+                    return out
+                poll_url = await self.submit(job)
+                print(f"📤 Submitted {job['image']}")
+                result = await self.poll(poll_url)
+                url = extract_video_url(result)
+                if not url:
+                    raise SegmindError(f"No {OUTPUT_KEY}.data in outputs")
+                await self._limiter.wait()
+                out["bytes"] = await asyncio.to_thread(
+                    self._download_sync, url, Path(job["output"])
+                )
+                await asyncio.to_thread(
+                    self.cache.store,
+                    key,
+                    job["output"],
+                    prompt=job["prompt"],
+                    endpoint=self.workflow_url,
+                    image=str(job["image"]),
+                )
+                out["status"] = "ok"
+                print(f"✅ Video saved to: {job['output']}")
+            except Exception as e:
+                out["status"] = "failed"
+                out["error"] = str(e)
+                print(f"❌ {job['image']}: {e}")
+        out["seconds"] = round(time.monotonic() - t0, 3)
+        return out
+
+    async def run_all(self, jobs: list[dict]) -> list[dict]:
+        self._sem = asyncio.Semaphore(max(1, self.concurrency))
+        self._limiter = RateLimiter(self.rate_per_s)
+        return await asyncio.gather(*(self.run_job(j) for j in jobs))
+
+
+def generate_videos(jobs: list[dict], **client_kwargs) -> list[dict]:
+    """Blocking wrapper: run ``jobs`` concurrently and return one result dict per job."""
+    return asyncio.run(SegmindClient(**client_kwargs).run_all(jobs))
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Generate product videos via a Segmind workflow, concurrently."
+    )
+    ap.add_argument(
+        "jobs", help='JSON list of {"image", "prompt", "output"[, "params"]}'
+    )
+    ap.add_argument("--workflow-url", default=WORKFLOW_URL)
+    ap.add_argument("--concurrency", type=int, default=4, help="Jobs in flight")
+    ap.add_argument(
+        "--rate", type=float, default=2.0, help="Max HTTP requests per second"
+    )
+    ap.add_argument("--poll-base", type=float, default=2.0, help="First poll delay (s)")
+    ap.add_argument("--poll-max", type=float, default=30.0, help="Max poll delay (s)")
+    ap.add_argument("--timeout", type=float, default=900.0, help="Per-job timeout (s)")
+    args = ap.parse_args()
+
+    jobs = json.loads(Path(args.jobs).read_text(encoding="utf-8"))
+    results = generate_videos(
+        jobs,
+        workflow_url=args.workflow_url,
+        concurrency=args.concurrency,
+        rate_per_s=args.rate,
+        poll_base_s=args.poll_base,
+        poll_max_s=args.poll_max,
+        job_timeout_s=args.timeout,
+    )
+    failed = [r for r in results if r["status"] != "ok"]
+    print(f"\n=== Segmind: {len(results) - len(failed)}/{len(results)} OK ===")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,172 @@
 # sync_packs_to_content.py
+"""Sync packs/*.yaml into content/{id}/input.yaml, copying only what changed.
+
+Each source's sha256 (and mtime/size, so unchanged files are not even
+re-read) is remembered in .state/sync_state.json. A run places only new or
+changed packs (atomically, through the asset store), optionally archives or
+deletes content dirs whose pack YAML is gone, and writes the change set to
+.state/sync_changes.json.
+
+That file also keeps ``pending``: every pack synced since its last
+successful pipeline run, across any number of syncs. ``run_pipeline.py
+--changed-only`` runs those, and run_pipeline takes a pack off the list
+(``mark_processed``) only when all of its steps succeeded.
+"""
+import contextlib
+import json
 import shutil
+import time
 from pathlib import Path
 
+from asset_store import place
+from fsutil import atomic_write_text, file_sha256
+
+try:
+    import fcntl
+except ImportError:  # Windows: change-set updates are not serialised across processes
+    fcntl = None
+
 PACKS_DIR = Path("packs")
 CONTENT_DIR = Path("content")
+STATE_DIR = Path(".state")
+STATE_PATH = STATE_DIR / "sync_state.json"
+CHANGES_PATH = STATE_DIR / "sync_changes.json"
+ARCHIVE_DIR = Path("content_archive")
+
+
+def load_json(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def load_changes(path: Path = CHANGES_PATH) -> dict:
+    """The change set written by the last sync ({} if there is none)."""
+    return load_json(path)
+
+
+def _pending(changes: dict) -> set:
+    if "pending" in changes:
+        return set(changes["pending"])
+    # Written before ``pending`` was kept: the last sync's delta is all we know
+    return set(changes.get("added", [])) | set(changes.get("changed", []))
+
+
+def changed_packs(path: Path = CHANGES_PATH) -> list[str]:
+    """Packs synced since their last successful pipeline run."""
+    return sorted(_pending(load_changes(path)))
+
+
+@contextlib.contextmanager
+def _locked_changes(path: Path):
+    """Load, yield and save the change set under an exclusive file lock."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(path.name + ".lock"), "a+") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        changes = load_json(path)
+        yield changes
+        atomic_write_text(path, json.dumps(changes, indent=2))
+
+
+def mark_processed(pack_id: str, path: Path = CHANGES_PATH) -> bool:
+    """Drop ``pack_id`` from the pending list; False if it was not pending."""
+    if pack_id not in changed_packs(path):
+        return False
+    with _locked_changes(path) as changes:
+        pending = _pending(changes)
+        pending.discard(pack_id)
+        changes["pending"] = sorted(pending)
+    return True
+
 
+def sync_packs(
+    overwrite: bool = False, prune: str | None = None, dry_run: bool = False
+) -> dict:
+    state = load_json(STATE_PATH)
+    changes = {
+        "time": time.time(),
+        "added": [],
+        "changed": [],
+        "unchanged": [],
+        "removed": [],
+    }
+    seen = set()
 
-def sync_packs(overwrite: bool = False):
-    count = 0
-    for pack_file in PACKS_DIR.glob("*.yaml"):
+    for pack_file in sorted(PACKS_DIR.glob("*.yaml")):
         pack_id = pack_file.stem
-        target_dir = CONTENT_DIR / pack_id
-        target_dir.mkdir(parents=True, exist_ok=True)
-        target_file = target_dir / "input.yaml"
+        seen.add(pack_id)
+        target_file = CONTENT_DIR / pack_id / "input.yaml"
+        st = pack_file.stat()
+        prev = state.get(pack_id)
 
-        if target_file.exists() and not overwrite:
-            print(f"⏩ Skipped existing: {target_file}")
+        if (
+            not overwrite
+            and prev
+            and target_file.exists()
+            and (prev["mtime_ns"], prev["size"]) == (st.st_mtime_ns, st.st_size)
+        ):
+            changes["unchanged"].append(pack_id)
             continue
 
-        shutil.copy2(pack_file, target_file)
-        print(f"✅ Synced: {pack_file.name} → {target_file}")
-        count += 1
+        sha = file_sha256(pack_file)
+        entry = {"sha256": sha, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+        if not target_file.exists():
+            kind = "added"
+        elif overwrite or (prev and prev["sha256"] != sha):
+            kind = "changed"
+        else:
+            # Same bytes as last time (touched only), or synced before state was
+            # kept: leave content/ alone, downstream steps may have edited it
+            state[pack_id] = entry
+            changes["unchanged"].append(pack_id)
+            continue
+
+        if not dry_run:
+            place(pack_file, target_file)
+            state[pack_id] = entry
+        changes[kind].append(pack_id)
+        print(
+            f"✅ {'Would sync' if dry_run else 'Synced'} ({kind}): {pack_file.name} → {target_file}"
+        )
+
+    # Content dirs we synced earlier whose pack YAML has since been removed
+    for pack_id in sorted(set(state) - seen):
+        content_dir = CONTENT_DIR / pack_id
+        changes["removed"].append(pack_id)
+        if dry_run or not prune:
+            print(f"🗑️  Stale: {content_dir} (packs/{pack_id}.yaml is gone)")
+            continue
+        if content_dir.exists():
+            if prune == "archive":
+                dest = ARCHIVE_DIR / f"{pack_id}_{time.strftime('%Y%m%d_%H%M%S')}"
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(str(content_dir), str(dest))
+                print(f"📦 Archived {content_dir} → {dest}")
+            else:
+                shutil.rmtree(content_dir)
+                print(f"🗑️  Deleted {content_dir}")
+        del state[pack_id]
+
+    if not dry_run:
+        atomic_write_text(STATE_PATH, json.dumps(state, indent=2, sort_keys=True))
+        with _locked_changes(CHANGES_PATH) as saved:
+            # Earlier syncs' packs stay pending until the pipeline has run them
+            pending = _pending(saved) | set(changes["added"]) | set(changes["changed"])
+            pending -= set(changes["removed"])
+            changes["pending"] = sorted(pending)
+            saved.clear()
+            saved.update(changes)
 
-    print(f"\n🔁 Sync complete: {count} packs updated.")
+    print(
+        f"\n🔁 Sync complete: {len(changes['added'])} added, "
+        f"{len(changes['changed'])} changed, {len(changes['unchanged'])} unchanged, "
+        f"{len(changes['removed'])} removed."
+    )
+    if "pending" in changes:
+        print(f"   {len(changes['pending'])} pack(s) pending a pipeline run.")
+    return changes
 
 
 if __name__ == "__main__":
@@ -34,34 +178,15 @@ if __name__ == "__main__":
     ap.add_argument(
         "--overwrite",
         action="store_true",
-        help="Overwrite existing input.yaml files in content/",
+        help="Recopy every pack, changed or not",
+    )
+    ap.add_argument(
+        "--prune",
+        choices=("archive", "delete"),
+        help=f"What to do with content dirs whose pack YAML was removed (archive → {ARCHIVE_DIR}/)",
+    )
+    ap.add_argument(
+        "--dry-run", action="store_true", help="Report changes without copying"
     )
     args = ap.parse_args()
-    sync_packs(overwrite=args.overwrite)
-
-# filepath: tools/verify_video.py
-import sys
-from moviepy.editor import VideoFileClip
-
-
-def verify_video(path):
-    clip = VideoFileClip(path)
-    print(f"Duration: {clip.duration:.2f}s")
-    print(f"Resolution: {clip.size}")
-    if clip.audio is None:
-        print("No audio track found!")
-        return False
-    audio = clip.audio.to_soundarray(fps=22050)
-    if audio.max() == 0:
-        print("Audio track is silent!")
-        return False
-    print("Audio track present and non-silent.")
-    return True
-
-
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python tools/verify_video.py <video_path>")
-        sys.exit(1)
-    video_path = sys.argv[1]
-    verify_video(video_path)
+    sync_packs(overwrite=args.overwrite, prune=args.prune, dry_run=args.dry_run)
@@ -0,0 +1,15 @@
+import os
+import sys
+from pathlib import Path
+
+# Spans would otherwise append to logs/run_<RUN_ID>/trace.jsonl in the checkout
+os.environ.setdefault("PIPELINE_TRACE", "0")
+# and pack_config would pickle the tests' YAML files into .cache/yaml
+os.environ.setdefault("PACK_CONFIG_DISK_CACHE", "0")
+
+ROOT = Path(__file__).resolve().parents[1]
+# Root modules import as top-level names; helpers in scripts/ and tools/ import
+# each other the same way, because the scripts run with their own dir on sys.path
+for path in (ROOT, ROOT / "scripts", ROOT / "tools"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,56 @@
+import subprocess
+import sys
+import time
+
+from admin_gui import jobs
+from admin_gui.jobs import Job, JobManager
+
+SLEEP = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+def make_manager(tmp_path):
+    return JobManager(workers=0, root=tmp_path, log_dir=tmp_path / "logs")
+
+
+def add_job(manager, cmd):
+    job = Job("j1", "run_pipeline", cmd, "test")
+    manager.jobs[job.id] = job
+    return job
+
+
+def test_job_cancelled_while_queued_never_starts(tmp_path):
+    manager = make_manager(tmp_path)
+    job = add_job(manager, SLEEP)
+    assert manager.cancel(job.id)
+    manager._run(job)
+    assert job.status == "cancelled"
+    assert job.proc is None
+    assert not (tmp_path / "logs" / "j1.log").exists()
+
+
+def test_cancel_before_process_exists_still_stops_it(tmp_path, monkeypatch):
+    manager = make_manager(tmp_path)
+    job = add_job(manager, SLEEP)
+    real_popen = subprocess.Popen
+
+    def popen(*args, **kwargs):
+        # The job is "running" but has no process yet: the old race window
+        assert job.status == "running" and job.proc is None
+        assert manager.cancel(job.id)
+        return real_popen(*args, **kwargs)
+
+    monkeypatch.setattr(jobs.subprocess, "Popen", popen)
+    t0 = time.monotonic()
+    manager._run(job)
+    assert time.monotonic() - t0 < 10
+    assert job.status == "cancelled"
+    assert job.proc.returncode != 0
+
+
+def test_finished_job_reports_exit_status(tmp_path):
+    manager = make_manager(tmp_path)
+    job = add_job(manager, [sys.executable, "-c", "print('hi'); raise SystemExit(3)"])
+    manager._run(job)
+    assert (job.status, job.rc) == ("failed", 3)
+    assert [line for _, line in job.lines] == ["hi"]
+    assert not manager.cancel(job.id)
@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+
+from admin_gui.config_service import ConfigError, ConfigService, validate
+
+VALID = {
+    "min_duration_seconds": 30.0,
+    "default_source": "amazon",
+    "default_platform": "youtube",
+    "default_account": "main",
+    "product_filter_keywords": ["electronics"],
+    "product_filter_min_price": 50,
+    "product_filter_max_price": 300,
+}
+
+
+@pytest.fixture
+def service(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(VALID), encoding="utf-8")
+    return ConfigService(path)
+
+
+def test_valid_config_has_no_errors():
+    assert validate(VALID) == []
+
+
+@pytest.mark.parametrize(
+    "changes, error",
+    [
+        ({"min_duration_seconds": "30"}, "min_duration_seconds must be a number"),
+        ({"min_duration_seconds": -1}, "min_duration_seconds must be >= 0"),
+        ({"product_filter_min_price": 9.5}, "must be an integer"),
+        ({"product_filter_max_price": True}, "must be an integer"),
+        ({"default_source": "  "}, "default_source must be a non-empty string"),
+        ({"default_platform": "myspace"}, "default_platform must be one of"),
+        ({"product_filter_keywords": "a,b"}, "must be a list of strings"),
+        (
+            {"product_filter_min_price": 400},
+            "product_filter_min_price must not exceed product_filter_max_price",
+        ),
+    ],
+)
+def test_invalid_values_are_reported(changes, error):
+    errors = validate({**VALID, **changes})
+    assert any(error in e for e in errors), errors
+
+
+def test_missing_keys_are_reported():
+    errors = validate({})
+    assert len(errors) == 7
+
+
+def test_update_merges_and_writes(service):
+    config = service.update({"product_filter_max_price": 500})
+    assert config["product_filter_max_price"] == 500
+    on_disk = json.loads(service.path.read_text(encoding="utf-8"))
+    assert on_disk == {**VALID, "product_filter_max_price": 500}
+
+
+def test_invalid_update_leaves_file_untouched(service):
+    before = service.path.read_bytes()
+    with pytest.raises(ConfigError, match="default_platform"):
+        service.update({"default_platform": "myspace"})
+    assert service.path.read_bytes() == before
+    assert service.get() == VALID
+
+
+def test_get_returns_a_copy_and_rereads_changes(service):
+    config = service.get()
+    config["default_account"] = "changed in memory"
+    assert service.get()["default_account"] == "main"
+
+    service.path.write_text(
+        json.dumps({**VALID, "default_account": "edited on disk"}), encoding="utf-8"
+    )
+    st = service.path.stat()
+    os.utime(service.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert service.get()["default_account"] == "edited on disk"
@@ -0,0 +1,67 @@
+import json
+import sqlite3
+import time
+
+import pytest
+
+from admin_gui import dashboard
+from admin_gui.dashboard import Dashboard
+
+
+@pytest.fixture
+def logs(tmp_path, monkeypatch):
+    logs_dir = tmp_path / "logs"
+    monkeypatch.setattr(dashboard, "_scheduler_prefix", lambda: (logs_dir, "scheduler"))
+    return logs_dir
+
+
+def write_trace(logs_dir, run_id, spans):
+    now = time.time()
+    path = logs_dir / f"run_{run_id}" / "trace.jsonl"
+    path.parent.mkdir(parents=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for i, (name, status, wall_s, attrs) in enumerate(spans):
+            rec = {"run_id": run_id, "name": name, "start": now - 100 + i}
+            rec.update(wall_s=wall_s, status=status, attrs=attrs)
+            f.write(json.dumps(rec) + "\n")
+
+
+def test_failed_steps_and_pipelines_are_counted(tmp_path, logs):
+    write_trace(
+        logs,
+        "a",
+        [
+            ("step:validate_pack.py", "ok", 1.0, {"pack": "p1", "rc": 2}),
+            ("step:assemble_videos.py", "ok", 30.0, {"pack": "p1", "rc": 0}),
+            ("step:repair_narration_cta", "error:OSError", 0.1, {"pack": "p1"}),
+            ("pipeline", "ok", 40.0, {"pack": "p1", "ok": False}),
+            ("step:validate_pack.py", "ok", 1.0, {"pack": "p2", "rc": 0}),
+            ("pipeline", "ok", 20.0, {"pack": "p2", "ok": True}),
+            ("pipeline", "ok", 10.0, {"pack": "p3"}),  # trace from before "ok"
+        ],
+    )
+    board = Dashboard(tmp_path / "dash.sqlite", logs)
+    assert board.ingest() == 7
+    out = board.summary()
+    errors = {r["name"]: r["errors"] for r in out["step_errors"]}
+    assert errors == {"step:validate_pack.py": 1, "step:repair_narration_cta": 1}
+    assert out["throughput"]["runs"] == 3
+    assert out["throughput"]["ok"] == 2
+    assert out["throughput"]["failed"] == 1
+    assert [r["pack"] for r in out["slowest"]] == ["p2", "p3"]
+
+
+def test_old_database_is_rebuilt(tmp_path, logs):
+    db = tmp_path / "dash.sqlite"
+    conn = sqlite3.connect(db)
+    conn.executescript(
+        "CREATE TABLE files (path TEXT PRIMARY KEY, kind TEXT NOT NULL,"
+        " offset INTEGER NOT NULL DEFAULT 0, header TEXT, mtime_ns INTEGER);"
+        "CREATE TABLE spans (src TEXT NOT NULL, run_id TEXT, name TEXT NOT NULL,"
+        " pack TEXT, start REAL, wall_s REAL, status TEXT, cache TEXT, bytes_in INTEGER);"
+    )
+    conn.close()
+    write_trace(logs, "a", [("step:x.py", "ok", 1.0, {"rc": 1})])
+    board = Dashboard(db, logs)
+    assert board.ingest() == 1
+    assert board.summary()["step_errors"] == [{"name": "step:x.py", "errors": 1}]
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import downloader
+from downloader import DownloadError, download
+
+BODY = bytes(range(256)) * 64  # 16 KiB
+ETAG = '"v1"'
+
+
+class Server:
+    """Serves BODY at /file with an ETag, honouring Range and If-Range."""
+
+    def __init__(self):
+        self.body = BODY
+        self.etag = ETAG
+        self.cut_after = None  # drop the connection after this many bytes, once
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests.append(dict(self.headers))
+                body, start = server.body, 0
+                rng = self.headers.get("Range")
+                if rng and self.headers.get("If-Range") == server.etag:
+                    start = int(rng.split("=")[1].rstrip("-"))
+                    if start >= len(body):
+                        self.send_response(416)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header(
+                        "Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}"
+                    )
+                else:
+                    self.send_response(200)
+                self.send_header("ETag", server.etag)
+                self.send_header("Content-Type", "image/jpeg")
+                self.send_header("Content-Length", str(len(body) - start))
+                self.end_headers()
+                data = body[start:]
+                if server.cut_after is not None:
+                    data, server.cut_after = data[: server.cut_after], None
+                    self.wfile.write(data)
+                    self.wfile.flush()
+                    self.close_connection = True
+                    return
+                self.wfile.write(data)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/file"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    s = Server()
+    yield s
+    s.close()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(downloader.time, "sleep", lambda s: None)
+
+
+def write_part(dest, data, validator=ETAG):
+    dest.with_name(dest.name + ".part").write_bytes(data)
+    dest.with_name(dest.name + ".part.json").write_text(
+        json.dumps({"validator": validator, "total": len(BODY)}), encoding="utf-8"
+    )
+
+
+def test_fresh_download_is_renamed_into_place(server, tmp_path):
+    dest = tmp_path / "img.jpg"
+    res = download(server.url, dest)
+    assert dest.read_bytes() == BODY
+    assert res["sha256"] == hashlib.sha256(BODY).hexdigest()
+    assert res["content_type"] == "image/jpeg"
+    assert not res["resumed"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["img.jpg"]
+
+
+def test_part_file_is_resumed_with_range(server, tmp_path):
+    dest = tmp_path / "img.jpg"
+    write_part(dest, BODY[:5000])
+    res = download(server.url, dest)
+    assert server.requests[0]["Range"] == "bytes=5000-"
+    assert server.requests[0]["If-Range"] == ETAG
+    assert res["resumed"]
+    assert dest.read_bytes() == BODY
+    assert res["sha256"] == hashlib.sha256(BODY).hexdigest()
+
+
+def test_changed_file_is_fetched_whole(server, tmp_path):
+    dest = tmp_path / "img.jpg"
+    write_part(dest, b"x" * 5000, validator='"old"')
+    res = download(server.url, dest)
+    assert not res["resumed"]
+    assert dest.read_bytes() == BODY
+
+
+def test_complete_part_finishes_on_416(server, tmp_path):
+    dest = tmp_path / "img.jpg"
+    write_part(dest, BODY)
+    res = download(server.url, dest)
+    assert res["bytes"] == len(BODY)
+    assert dest.read_bytes() == BODY
+
+
+def test_dropped_connection_resumes_on_retry(server, tmp_path):
+    server.cut_after = 6000
+    dest = tmp_path / "img.jpg"
+    res = download(server.url, dest, retries=1, chunk_size=1024)
+    assert len(server.requests) == 2
+    assert server.requests[1]["Range"].startswith("bytes=")
+    assert res["resumed"]
+    assert dest.read_bytes() == BODY
+
+
+def test_checksum_mismatch_discards_the_part(server, tmp_path):
+    dest = tmp_path / "img.jpg"
+    with pytest.raises(DownloadError, match="sha256"):
+        download(server.url, dest, sha256="0" * 64)
+    assert not dest.exists()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,57 @@
+import hashlib
+import os
+import stat
+
+from fsutil import atomic_write_text, file_sha256, is_stale
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_atomic_write_keeps_existing_permissions(tmp_path):
+    path = tmp_path / "input.yaml"
+    path.write_text("old", encoding="utf-8")
+    path.chmod(0o640)
+    atomic_write_text(path, "new")
+    assert path.read_text(encoding="utf-8") == "new"
+    assert mode(path) == 0o640
+    assert [p.name for p in tmp_path.iterdir()] == ["input.yaml"]
+
+
+def test_atomic_write_new_file_gets_umask_default(tmp_path):
+    old = os.umask(0o022)
+    try:
+        atomic_write_text(tmp_path / "sub" / "config.json", "{}")
+    finally:
+        os.umask(old)
+    assert mode(tmp_path / "sub" / "config.json") == 0o644
+
+
+def test_atomic_write_replaces_rather_than_writes_through(tmp_path):
+    path, link = tmp_path / "a.txt", tmp_path / "b.txt"
+    path.write_text("shared", encoding="utf-8")
+    os.link(path, link)
+    atomic_write_text(path, "changed")
+    assert link.read_text(encoding="utf-8") == "shared"
+
+
+def test_file_sha256(tmp_path):
+    path = tmp_path / "blob"
+    path.write_bytes(b"x" * 100_000)
+    assert file_sha256(path) == hashlib.sha256(b"x" * 100_000).hexdigest()
+
+
+def test_is_stale(tmp_path):
+    src, dst = tmp_path / "src.jpg", tmp_path / "dst.jpg"
+    src.write_bytes(b"1")
+    assert is_stale(src, dst)
+    dst.write_bytes(b"2")
+    os.utime(src, ns=(0, 1_000_000_000))
+    os.utime(dst, ns=(0, 2_000_000_000))
+    assert not is_stale(src, dst)
+    os.utime(src, ns=(0, 3_000_000_000))
+    assert is_stale(src, dst)
+    dst.unlink()
+    os.link(src, dst)
+    assert not is_stale(src, dst)
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from image_index import ImageIndex, hamming
+
+
+def brute_force_duplicates(rows, max_distance):
+    """The original pairwise scan, as the reference result."""
+    rows = sorted(rows, key=lambda r: r[0])
+    groups, placed = [], set()
+    for i, (pa, sa, da) in enumerate(rows):
+        if pa in placed:
+            continue
+        group = [pa]
+        for pb, sb, db in rows[i + 1 :]:
+            if pb in placed:
+                continue
+            same = sa == sb
+            if not same and max_distance and da is not None and db is not None:
+                same = hamming(da, db) <= max_distance
+            if same:
+                group.append(pb)
+        if len(group) > 1:
+            placed.update(group)
+            groups.append(group)
+    return groups
+
+
+@pytest.fixture
+def index_rows(tmp_path):
+    """An index of 300 images: clusters of near-identical dHashes plus copies."""
+    rnd = random.Random(7)
+    rows = []
+    for c in range(40):
+        base = rnd.getrandbits(64)
+        for k in range(rnd.randint(1, 5)):
+            dh = base
+            for bit in rnd.sample(range(64), rnd.randint(0, 9)):
+                dh ^= 1 << bit
+            rows.append((f"c{c}/img{k}.jpg", f"sha{c}_{k}", dh))
+    while len(rows) < 280:
+        rows.append((f"solo/{len(rows)}.jpg", f"solo{len(rows)}", rnd.getrandbits(64)))
+    for n in range(10):  # byte-identical copies, one without a dHash
+        src = rows[n * 7]
+        rows.append((f"copy/{n}.jpg", src[1], None if n == 0 else src[2]))
+    index = ImageIndex(tmp_path / "index.sqlite")
+    with index._conn() as conn:
+        conn.executemany(
+            "INSERT INTO images VALUES (?, 0, 0, ?, ?)",
+            [(p, s, f"{d:016x}" if d is not None else None) for p, s, d in rows],
+        )
+    return index, rows
+
+
+@pytest.mark.parametrize("distance", [0, 3, 6, 7, 10])
+def test_bucketed_duplicates_match_full_scan(index_rows, distance):
+    index, rows = index_rows
+    assert index.duplicates(distance) == brute_force_duplicates(rows, distance)
+
+
+@pytest.mark.parametrize("distance", [0, 4, 7, 12])
+def test_similar_finds_everything_within_distance(index_rows, distance):
+    index, rows = index_rows
+    for _, _, dh in rows[::17]:
+        if dh is None:
+            continue
+        expected = sorted(
+            (hamming(dh, d), p)
+            for p, _, d in rows
+            if d is not None and hamming(dh, d) <= distance
+        )
+        assert index.similar(dh, distance) == expected
@@ -0,0 +1,109 @@
+import sqlite3
+import time
+
+import pytest
+from _jobqueue import Heartbeat, JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(tmp_path / "jobs.sqlite")
+
+
+def test_enqueue_is_idempotent_per_key(queue):
+    assert queue.enqueue("2026-10-19#0", "a")
+    assert not queue.enqueue("2026-10-19#0", "a")
+    assert queue.counts() == {"queued": 1}
+
+
+def test_lease_hands_out_each_job_once(queue):
+    queue.enqueue("d#0", "a", {"slot": 0})
+    job = queue.lease("w1", 60)
+    assert job["pack_id"] == "a"
+    assert job["payload"] == {"slot": 0}
+    assert job["attempts"] == 1
+    assert queue.lease("w2", 60) is None
+
+
+def test_same_pack_is_not_leased_twice_at_once(queue):
+    queue.enqueue("d#0", "a")
+    queue.enqueue("d#1", "a")
+    queue.enqueue("d#2", "b")
+    first = queue.lease("w1", 60)
+    second = queue.lease("w2", 60)
+    assert (first["pack_id"], second["pack_id"]) == ("a", "b")
+    assert queue.lease("w3", 60) is None
+
+
+def test_expired_lease_is_requeued_until_attempts_run_out(queue):
+    queue.enqueue("d#0", "a", max_attempts=2)
+    queue.lease("w1", 60)
+    assert queue.requeue_expired(now=time.time() + 120) == 1
+    job = queue.lease("w2", 60)
+    assert job["attempts"] == 2
+    queue.requeue_expired(now=time.time() + 120)
+    assert queue.counts() == {"failed": 1}
+    assert queue.lease("w3", 60) is None
+
+
+def test_failed_run_is_retried_then_fails_for_good(queue):
+    queue.enqueue("d#0", "a", max_attempts=2)
+    job = queue.lease("w1", 60)
+    assert queue.complete(job["id"], "w1", 1, 5.0) == "queued"
+    assert queue.collect_finished() == []
+
+    job = queue.lease("w2", 60)
+    assert job["attempts"] == 2
+    assert queue.complete(job["id"], "w2", 1, 5.0) == "failed"
+    [done] = queue.collect_finished()
+    assert (done["status"], done["rc"], done["attempts"]) == ("failed", 1, 2)
+
+
+def test_complete_after_losing_the_lease_is_rejected(queue):
+    queue.enqueue("d#0", "a")
+    job = queue.lease("w1", 60)
+    queue.requeue_expired(now=time.time() + 120)
+    queue.lease("w2", 60)
+    assert queue.complete(job["id"], "w1", 0, 1.0) is None
+
+
+def test_collect_finished_returns_each_job_once(queue):
+    queue.enqueue("d#0", "a")
+    job = queue.lease("w1", 60)
+    assert queue.complete(job["id"], "w1", 0, 3.0) == "done"
+    assert [j["pack_id"] for j in queue.collect_finished()] == ["a"]
+    assert queue.collect_finished() == []
+
+
+def test_outstanding_counts_queued_and_running_jobs_by_prefix(queue):
+    queue.enqueue("2026-10-19#0", "a")
+    queue.enqueue("2026-10-19#1", "b")
+    queue.enqueue("2026-10-20#0", "c")
+    job = queue.lease("w1", 60)
+    queue.complete(job["id"], "w1", 0, 1.0)
+    queue.lease("w1", 60)
+    assert queue.outstanding("2026-10-19#") == 1
+    assert queue.outstanding() == 2
+
+
+def test_heartbeat_extends_the_lease(queue):
+    queue.enqueue("d#0", "a")
+    job = queue.lease("w1", 0.3)
+    hb = Heartbeat(queue, job["id"], "w1", 0.3)
+    hb.start()
+    time.sleep(0.5)
+    hb.stop()
+    assert not hb.lost
+    assert queue.requeue_expired() == 0
+
+
+def test_heartbeat_error_marks_the_lease_lost(queue):
+    class LockedQueue:
+        def heartbeat(self, *args):
+            raise sqlite3.OperationalError("database is locked")
+
+    hb = Heartbeat(LockedQueue(), 1, "w1", 0.06)
+    hb.start()
+    hb.join(timeout=2)
+    assert hb.lost
+    assert isinstance(hb.error, sqlite3.OperationalError)
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pytest
+
+from utils.merge_audio import pair_inputs
+
+
+@pytest.fixture
+def files(tmp_path):
+    for name in ("video/nar1.mp4", "video/nar2.mp4", "narration/nar1.wav"):
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_bytes(b"")
+    (tmp_path / "narration" / "nar2.m4a").write_bytes(b"")
+    (tmp_path / "narration" / "nar2.wav").write_bytes(b"")
+    return tmp_path
+
+
+def test_explicit_pairs_keep_their_own_audio(files):
+    v1, v2 = files / "video/nar1.mp4", files / "video/nar2.mp4"
+    pairs = pair_inputs([f"{v1}=a.mp3", f"{v2}=b.mp3"])
+    assert pairs == [(v1, Path("a.mp3")), (v2, Path("b.mp3"))]
+
+
+def test_same_stem_audio_is_found(files):
+    v1, v2 = files / "video/nar1.mp4", files / "video/nar2.mp4"
+    pairs = pair_inputs([v1, v2], audio_dir=files / "narration")
+    # nar2 has both: the stream-copyable .m4a wins over .wav
+    assert pairs == [
+        (v1, files / "narration/nar1.wav"),
+        (v2, files / "narration/nar2.m4a"),
+    ]
+
+
+def test_one_track_for_every_unpaired_video(files):
+    v1, v2 = files / "video/nar1.mp4", files / "video/nar2.mp4"
+    pairs = pair_inputs([v1, f"{v2}=b.mp3"], audio="narration.mp3")
+    assert pairs == [(v1, Path("narration.mp3")), (v2, Path("b.mp3"))]
+
+
+def test_video_with_equals_in_its_name_is_not_split(files):
+    odd = files / "video/a=b.mp4"
+    odd.write_bytes(b"")
+    assert pair_inputs([odd], audio="x.mp3") == [(odd, Path("x.mp3"))]
+
+
+def test_missing_audio_is_reported(files):
+    with pytest.raises(ValueError, match="nar1.mp4"):
+        pair_inputs([files / "video/nar1.mp4"])
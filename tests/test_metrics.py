@@ -0,0 +1,79 @@
+import json
+
+from _metrics import Registry, ingest_trace
+
+
+def write_trace(path, records):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+
+
+def test_trace_with_a_failed_step(tmp_path):
+    trace = tmp_path / "trace.jsonl"
+    write_trace(
+        trace,
+        [
+            {
+                "name": "http.get",
+                "wall_s": 0.5,
+                "status": "ok",
+                "attrs": {"bytes_in": 2048},
+            },
+            {
+                "name": "image_index.hash",
+                "wall_s": 0.1,
+                "status": "ok",
+                "attrs": {"bytes_hashed": 9999},
+            },
+            {
+                "name": "segmind_cache",
+                "wall_s": 0.0,
+                "status": "ok",
+                "attrs": {"cache": "hit"},
+            },
+            {
+                "name": "step:validate_pack.py",
+                "wall_s": 2.0,
+                "status": "ok",
+                "attrs": {"rc": 2},
+            },
+            {
+                "name": "step:assemble_videos.py",
+                "wall_s": 40.0,
+                "status": "ok",
+                "attrs": {"rc": 0},
+            },
+            {
+                "name": "step:repair_narration_cta",
+                "wall_s": 0.2,
+                "status": "error:OSError",
+            },
+        ],
+    )
+    registry = Registry()
+    assert ingest_trace(registry, trace) == 6
+    assert registry.counters["affiliate_step_failures_total"] == {
+        (("step", "validate_pack.py"),): 1.0,
+        (("step", "repair_narration_cta"),): 1.0,
+    }
+    assert registry.counters["affiliate_download_bytes_total"] == {(): 2048.0}
+    steps = registry.histograms["affiliate_step_duration_seconds"]
+    assert sum(h["count"] for h in steps.values()) == 3
+    text = registry.render()
+    assert 'affiliate_step_failures_total{step="validate_pack.py"} 1' in text
+    assert (
+        'affiliate_cache_requests_total{cache="segmind_cache",result="hit"} 1' in text
+    )
+
+
+def test_local_bytes_are_not_downloads(tmp_path):
+    trace = tmp_path / "trace.jsonl"
+    write_trace(
+        trace, [{"name": "normalize", "wall_s": 0.1, "attrs": {"bytes_in": 500}}]
+    )
+    registry = Registry()
+    ingest_trace(registry, trace)
+    assert "affiliate_download_bytes_total" not in registry.counters
+
+
+def test_missing_trace_is_skipped(tmp_path):
+    assert ingest_trace(Registry(), tmp_path / "none.jsonl") == 0
@@ -0,0 +1,120 @@
+import os
+import pickle
+import stat
+import time
+
+import pytest
+
+import pack_config
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """A private disk cache and a counter of real YAML parses."""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(pack_config, "CACHE_DIR", cache_dir)
+    monkeypatch.setattr(pack_config, "DISK_CACHE", True)
+    monkeypatch.setattr(pack_config, "_pruned", True)
+    parses = []
+    real_load = pack_config.yaml.load
+
+    def counting_load(*args, **kwargs):
+        parses.append(1)
+        return real_load(*args, **kwargs)
+
+    monkeypatch.setattr(pack_config.yaml, "load", counting_load)
+    pack_config.clear_cache()
+    yield cache_dir, parses
+    pack_config.clear_cache()
+
+
+def write(path, text, mtime_s):
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, (mtime_s, mtime_s))
+
+
+def test_new_process_reuses_the_disk_entry(tmp_path, cache):
+    cache_dir, parses = cache
+    yml = tmp_path / "input.yaml"
+    write(yml, "products: [{asin: A1}]\n", 1_000_000)
+    assert pack_config.load_pack(yml) == {"products": [{"asin": "A1"}]}
+    pack_config.clear_cache()
+    assert pack_config.load_pack(yml) == {"products": [{"asin": "A1"}]}
+    assert len(parses) == 1
+    assert stat.S_IMODE(cache_dir.stat().st_mode) == 0o700
+    [entry] = cache_dir.glob("*.pickle")
+    assert stat.S_IMODE(entry.stat().st_mode) == 0o600
+
+
+def test_edit_is_reparsed_and_replaces_the_old_entry(tmp_path, cache):
+    cache_dir, parses = cache
+    yml = tmp_path / "input.yaml"
+    write(yml, "products: [{asin: A1}]\n", 1_000_000)
+    pack_config.load_pack(yml)
+    [old] = cache_dir.glob("*.pickle")
+    # Same size and mtime: only the content hash tells the versions apart
+    write(yml, "products: [{asin: B2}]\n", 1_000_000)
+    pack_config.clear_cache()
+    assert pack_config.load_pack(yml) == {"products": [{"asin": "B2"}]}
+    assert len(parses) == 2
+    [new] = cache_dir.glob("*.pickle")
+    assert new != old
+
+
+def test_touched_file_hits_the_disk_entry(tmp_path, cache):
+    _, parses = cache
+    yml = tmp_path / "input.yaml"
+    write(yml, "products: []\n", 1_000_000)
+    pack_config.load_pack(yml)
+    write(yml, "products: []\n", 2_000_000)
+    assert pack_config.load_pack(yml) == {"products": []}
+    assert len(parses) == 1
+
+
+def test_schema_errors_are_cached_with_the_parse(tmp_path, cache):
+    _, parses = cache
+    yml = tmp_path / "input.yaml"
+    write(yml, "products: {asin: A1}\n", 1_000_000)
+    for _ in range(2):
+        pack_config.clear_cache()
+        with pytest.raises(
+            pack_config.PackConfigError, match="products must be a list"
+        ):
+            pack_config.load_pack(yml)
+    assert len(parses) == 1
+
+
+@pytest.mark.parametrize("target", ["file", "dir"])
+def test_writable_by_others_is_not_unpickled(tmp_path, cache, target):
+    cache_dir, parses = cache
+    yml = tmp_path / "input.yaml"
+    write(yml, "products: []\n", 1_000_000)
+    pack_config.load_pack(yml)
+    [entry] = cache_dir.glob("*.pickle")
+    entry.write_bytes(pickle.dumps(({"products": ["planted"]}, [])))
+    (entry if target == "file" else cache_dir).chmod(
+        0o666 if target == "file" else 0o777
+    )
+    pack_config.clear_cache()
+    assert pack_config.load_pack(yml) == {"products": []}
+    assert len(parses) == 2
+
+
+def test_prune_removes_only_unused_entries(tmp_path, cache):
+    cache_dir, _ = cache
+    a, b = tmp_path / "a.yaml", tmp_path / "b.yaml"
+    write(a, "products: []\n", 1_000_000)
+    write(b, "products: []\n", 1_000_000)
+    pack_config.load_pack(a)
+    pack_config.load_pack(b)
+    old = time.time() - 40 * 86400
+    for entry in cache_dir.glob("*.pickle"):
+        os.utime(entry, (old, old))
+    pack_config.clear_cache()
+    pack_config.load_pack(a)  # a disk hit marks a's entry as used
+    assert pack_config.prune_cache(30 * 86400) == 1
+    assert len(list(cache_dir.glob("*.pickle"))) == 1
+    pack_config.clear_cache()
+    pack_config.load_pack(a)
+    pack_config.load_pack(b)
+    assert len(cache[1]) == 3
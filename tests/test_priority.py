@@ -0,0 +1,20 @@
+from _priority import FAILURE_DECAY, failure_score, record_result
+
+
+def test_success_decays_the_legacy_streak(tmp_path):
+    status = {"a": {"consecutive_failures": 4}}
+    rec = record_result(status, "a", 0, tmp_path, tmp_path, now=100.0)
+    assert rec["failure_score"] == 4 * FAILURE_DECAY
+    assert rec["consecutive_failures"] == 0
+    assert rec["last_ok"] == 100.0
+
+
+def test_failures_raise_the_score_and_successes_decay_it(tmp_path):
+    status = {}
+    for _ in range(2):
+        record_result(status, "a", 1, tmp_path, tmp_path)
+    assert failure_score(status["a"]) == 2
+    assert status["a"]["total_failures"] == 2
+    record_result(status, "a", 0, tmp_path, tmp_path)
+    assert failure_score(status["a"]) == 2 * FAILURE_DECAY
+    assert status["a"]["total_failures"] == 2
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+import yaml
+
+import pack_config
+import resolve_links
+from resolve_links import SqliteLinks, load_links, resolve_all
+
+
+def write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.dump(data, sort_keys=False), encoding="utf-8")
+
+
+@pytest.fixture
+def catalogue(tmp_path):
+    links = tmp_path / "affiliate_links.yaml"
+    write(links, {"A1": "https://example.com/a1", "B2": "https://example.com/b2"})
+    content = tmp_path / "content"
+    write(content / "p1" / "input.yaml", {"products": [{"asin": "A1"}, {"asin": "C3"}]})
+    write(content / "p2" / "input.yaml", {"products": [{"asin": "B2", "link": "kept"}]})
+    write(content / "p3" / "input.yaml", {"products": [{"asin": "C3"}, {"asin": "B2"}]})
+    return links, content
+
+
+@pytest.mark.parametrize("sqlite", [False, True])
+def test_resolve_all_fills_links_in_one_pass(tmp_path, catalogue, sqlite):
+    links_path, content = catalogue
+    table = (
+        SqliteLinks(links_path, tmp_path / "links.sqlite")
+        if sqlite
+        else load_links(links_path)
+    )
+    untouched = (content / "p2" / "input.yaml").read_bytes()
+
+    missing = resolve_all(table, content)
+
+    assert missing == {"C3": ["p1", "p3"]}
+    p1 = yaml.safe_load((content / "p1" / "input.yaml").read_text(encoding="utf-8"))
+    assert p1["products"] == [
+        {"asin": "A1", "link": "https://example.com/a1"},
+        {"asin": "C3"},
+    ]
+    p3 = yaml.safe_load((content / "p3" / "input.yaml").read_text(encoding="utf-8"))
+    assert p3["products"][1]["link"] == "https://example.com/b2"
+    assert (content / "p2" / "input.yaml").read_bytes() == untouched
+
+
+def test_sqlite_table_is_reused_until_the_yaml_content_changes(
+    tmp_path, catalogue, monkeypatch
+):
+    links_path, _ = catalogue
+    db = tmp_path / "links.sqlite"
+    loads = []
+    monkeypatch.setattr(
+        resolve_links,
+        "load_yaml",
+        lambda path: loads.append(path) or pack_config.load_yaml(path),
+    )
+    assert SqliteLinks(links_path, db).get("A1") == "https://example.com/a1"
+    assert SqliteLinks(links_path, db).get("A1") == "https://example.com/a1"
+    assert len(loads) == 1
+
+    # Same size, same mtime: only the content differs
+    st = links_path.stat()
+    write(links_path, {"A1": "https://example.com/x1", "B2": "https://example.com/b2"})
+    os.utime(links_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert links_path.stat().st_size == st.st_size
+    pack_config.clear_cache()  # a new run is a new process
+    links = SqliteLinks(links_path, db)
+    assert len(loads) == 2
+    assert links.get("A1") == "https://example.com/x1"
+    assert links.get("Z9", "none") == "none"
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+STEPS = (
+    "validate_pack.py",
+    "generate_narration.py",
+    "validate_narration.py",
+    "scripts/generate_wav_from_txt.py",
+    "normalize_images.py",
+    "generate_cta_images.py",
+    "assemble_videos.py",
+)
+
+
+def run_pipeline(cwd, *args):
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "PIPELINE_TRACE": "0"}
+    return subprocess.run(
+        [sys.executable, str(ROOT / "run_pipeline.py"), *args],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    """Stub step scripts that succeed, so a test can make one of them fail."""
+    for step in STEPS:
+        path = tmp_path / step
+        path.parent.mkdir(exist_ok=True)
+        path.write_text("import sys\nsys.exit(0)\n", encoding="utf-8")
+    for pack in ("good", "bad"):
+        (tmp_path / "packs" / pack).mkdir(parents=True)
+    (tmp_path / "validate_pack.py").write_text(
+        "import sys\nsys.exit(2 if sys.argv[1] == 'bad' else 0)\n", encoding="utf-8"
+    )
+    return tmp_path
+
+
+def test_successful_pack_exits_zero(workdir):
+    proc = run_pipeline(workdir, "good")
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+
+
+def test_failing_pack_exits_non_zero(workdir):
+    proc = run_pipeline(workdir, "bad")
+    assert proc.returncode == 1
+    assert "1 pack(s) failed: bad" in proc.stdout
+
+
+def test_one_failing_pack_fails_the_whole_run(workdir):
+    proc = run_pipeline(workdir)
+    assert proc.returncode == 1
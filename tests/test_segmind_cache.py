@@ -0,0 +1,103 @@
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+import segmind_cache
+from segmind_cache import SegmindCache, cache_key
+from segmind_client import generate_videos
+from utils.segmind_mock_server import start
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A time.time() that ticks one second per call, so LRU order is exact."""
+    ticks = itertools.count(1_000_000)
+    fake = SimpleNamespace(time=lambda: float(next(ticks)))
+    monkeypatch.setattr(segmind_cache, "time", fake)
+
+
+def video(tmp_path, name, size=100):
+    path = tmp_path / f"{name}.mp4"
+    path.write_bytes(name.encode()[:1] * size)
+    return path
+
+
+def cached_keys(cache):
+    return sorted(k for k in cache.entries() if cache.object_path(k).exists())
+
+
+def test_identical_request_is_served_from_the_cache(tmp_path):
+    server, state = start(polls=0, size=5000)
+    try:
+        url = "http://%s:%d/workflows/mock-v1" % server.server_address
+        image = tmp_path / "product.jpg"
+        image.write_bytes(b"image bytes")
+        cache = SegmindCache(tmp_path / "cache")
+        results = [
+            generate_videos(
+                [{"image": str(image), "prompt": "p", "output": str(tmp_path / out)}],
+                workflow_url=url,
+                rate_per_s=0,
+                poll_base_s=0.01,
+                cache=cache,
+            )[0]
+            for out in ("first.mp4", "second.mp4")
+        ]
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert [r["status"] for r in results] == ["ok", "ok"]
+    assert results[1]["cached"] is True
+    assert len(state.submitted) == 1
+    assert [m for m, _, _ in state.log].count("POST") == 1
+    first, second = (tmp_path / "first.mp4", tmp_path / "second.mp4")
+    assert second.read_bytes() == first.read_bytes()
+    key = cache_key(image, "p", url)
+    assert cache.entries()[key]["hits"] == 1
+
+
+def test_key_depends_on_image_content_prompt_and_params(tmp_path):
+    a, b = tmp_path / "a.jpg", tmp_path / "b.jpg"
+    a.write_bytes(b"same")
+    b.write_bytes(b"same")
+    key = cache_key(a, "p", "u")
+    assert cache_key(b, "p", "u") == key
+    assert cache_key(a, "q", "u") != key
+    assert cache_key(a, "p", "u", {"seed": 1}) != key
+
+
+def test_miss_and_hit(tmp_path, clock):
+    cache = SegmindCache(tmp_path / "cache")
+    dest = tmp_path / "out" / "video.mp4"
+    assert not cache.fetch("k1", dest)
+    cache.store("k1", video(tmp_path, "a"))
+    assert cache.fetch("k1", dest)
+    assert dest.read_bytes() == b"a" * 100
+
+
+def test_eviction_drops_least_recently_used_down_to_the_cap(tmp_path, clock):
+    cache = SegmindCache(tmp_path / "cache", max_bytes=250)
+    cache.store("k1", video(tmp_path, "a"))
+    cache.store("k2", video(tmp_path, "b"))
+    assert cache.fetch("k1", tmp_path / "out.mp4")  # k2 is now the oldest
+    cache.store("k3", video(tmp_path, "c"))
+    assert cached_keys(cache) == ["k1", "k3"]
+    assert sum(e["size"] for e in cache.entries().values()) <= 250
+    assert not cache.fetch("k2", tmp_path / "out.mp4")
+
+
+def test_pinned_entries_survive_eviction(tmp_path, clock):
+    cache = SegmindCache(tmp_path / "cache", max_bytes=250)
+    cache.store("k1", video(tmp_path, "a"))
+    assert cache.set_pinned(["k1"], True) == ["k1"]
+    for key, name in (("k2", "b"), ("k3", "c"), ("k4", "d")):
+        cache.store(key, video(tmp_path, name))
+    assert cached_keys(cache) == ["k1", "k4"]
+
+    # Pinned entries alone may exceed the cap; unpinning lets them go
+    cache.max_bytes = 50
+    cache.evict()
+    assert cached_keys(cache) == ["k1"]
+    cache.set_pinned(["k1"], False)
+    assert cached_keys(cache) == []
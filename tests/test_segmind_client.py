@@ -0,0 +1,106 @@
+import socket
+import time
+
+import pytest
+import requests
+
+import segmind_client
+from segmind_cache import SegmindCache
+from segmind_client import generate_videos, not_sent
+from utils.segmind_mock_server import file_bytes, start
+
+
+@pytest.fixture
+def mock():
+    servers = []
+
+    def run(**state_kwargs):
+        server, state = start(**state_kwargs)
+        servers.append(server)
+        url = "http://%s:%d/workflows/mock-v1" % server.server_address
+        return url, state
+
+    yield run
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def job(tmp_path):
+    image = tmp_path / "product.jpg"
+    image.write_bytes(b"not really a jpeg")
+    return {
+        "image": str(image),
+        "prompt": "spin it",
+        "output": str(tmp_path / "out.mp4"),
+    }
+
+
+def run(url, job, tmp_path, **kwargs):
+    kwargs = {
+        "api_key": "k",
+        "workflow_url": url,
+        "rate_per_s": 0,
+        "poll_base_s": 0.01,
+        "poll_max_s": 0.05,
+        "max_retries": 3,
+        "cache": SegmindCache(tmp_path / "cache"),
+        **kwargs,
+    }
+    [result] = generate_videos([job], **kwargs)
+    return result
+
+
+def api_calls(state, method):
+    return [status for m, path, status in state.log if m == method]
+
+
+def test_submit_poll_and_download(mock, job, tmp_path):
+    url, state = mock(polls=2, size=100_000, api_key="k")
+    result = run(url, job, tmp_path)
+    assert result["status"] == "ok", result
+    assert result["bytes"] == 100_000
+    with open(job["output"], "rb") as f:
+        assert f.read() == file_bytes(1, 100_000)
+    assert [b["prompt"] for b in state.submitted] == ["spin it"]
+    assert api_calls(state, "GET") == [200, 200, 200]
+
+
+def test_rate_limited_submit_waits_for_retry_after(mock, job, tmp_path, monkeypatch):
+    monkeypatch.setattr(segmind_client, "backoff_delay", lambda *a: 0.0)
+    url, state = mock(polls=0, size=1000, rate_limited=1, retry_after=1)
+    t0 = time.monotonic()
+    result = run(url, job, tmp_path)
+    assert result["status"] == "ok", result
+    assert time.monotonic() - t0 >= 1.0
+    assert api_calls(state, "POST") == [429, 200]
+    assert len(state.submitted) == 1
+
+
+def test_server_error_on_submit_is_not_resent(mock, job, tmp_path):
+    url, state = mock(polls=0, fail_every=1)
+    result = run(url, job, tmp_path)
+    assert result["status"] == "failed"
+    assert "503" in result["error"]
+    assert api_calls(state, "POST") == [503]
+
+
+def test_server_error_on_poll_is_retried(mock, job, tmp_path, monkeypatch):
+    monkeypatch.setattr(segmind_client, "backoff_delay", lambda *a: 0.0)
+    url, state = mock(polls=1, size=1000, fail_every=2)
+    result = run(url, job, tmp_path)
+    assert result["status"] == "ok", result
+    assert api_calls(state, "GET")[0] == 503
+
+
+def test_not_sent():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    with pytest.raises(requests.ConnectionError) as refused:
+        requests.post(f"http://127.0.0.1:{port}/", timeout=5)
+    assert not_sent(refused.value)
+    assert not_sent(requests.ConnectTimeout())
+    assert not not_sent(requests.ReadTimeout())
+    assert not not_sent(requests.ConnectionError("Connection aborted."))
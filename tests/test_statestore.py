@@ -0,0 +1,107 @@
+import pytest
+from _statestore import StateLocked, StateStore, apply_event
+
+DAY = "2026-10-19"
+
+
+def slot(idx, pack=None, day=DAY, **extra):
+    return {"event": "slot", "day": day, "idx": idx, "pack": pack, **extra}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return StateStore(tmp_path / "state")
+
+
+def planned_state():
+    return {
+        "today_key": DAY,
+        "schedule": [f"{DAY}T09:00:00", f"{DAY}T10:00:00", f"{DAY}T11:00:00"],
+        "planned_packs": ["a", "b", "c"],
+        "planned_s": [600, 600, 600],
+        "next_slot_idx": 0,
+        "used_today": [],
+    }
+
+
+def test_load_without_files_is_empty(store):
+    assert store.load() == {}
+
+
+def test_journal_replays_over_snapshot(store):
+    store.save(planned_state())
+    store.append(slot(0, "a"))
+    store.append(slot(1, "b"))
+
+    state = store.load()
+    assert state["next_slot_idx"] == 2
+    assert state["used_today"] == ["a", "b"]
+    assert state["schedule"] == planned_state()["schedule"]
+
+
+def test_save_folds_journal_into_snapshot(store):
+    store.save(planned_state())
+    store.append(slot(0, "a"))
+    state = store.load()
+    store.save(state)
+
+    assert store.journal_path.read_text(encoding="utf-8") == ""
+    assert store.load()["next_slot_idx"] == 1
+
+
+def test_torn_last_line_is_skipped(store):
+    store.save(planned_state())
+    store.append(slot(0, "a"))
+    with open(store.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"event":"slot","day":"' + DAY + '","idx":1,"pa')
+
+    state = store.load()
+    assert state["next_slot_idx"] == 1
+    assert state["used_today"] == ["a"]
+
+
+def test_events_from_another_day_are_ignored(store):
+    store.save(planned_state())
+    store.append(slot(0, "a", day="2026-10-18"))
+
+    state = store.load()
+    assert state["next_slot_idx"] == 0
+    assert state["used_today"] == []
+
+
+def test_replay_is_idempotent_when_snapshot_already_has_the_event():
+    state = planned_state()
+    event = slot(0, "c", slot_s=900)
+    apply_event(state, event)
+    once = {k: list(v) if isinstance(v, list) else v for k, v in state.items()}
+    apply_event(state, event)
+
+    assert state == once
+    assert state["next_slot_idx"] == 1
+
+
+def test_slot_event_respaces_later_slots(store):
+    store.save(planned_state())
+    # slot 0 ran a pack predicted 5 minutes longer than the plan assumed
+    store.append(slot(0, "c", slot_s=900))
+
+    state = store.load()
+    assert state["schedule"] == [
+        f"{DAY}T09:00:00",
+        f"{DAY}T10:05:00",
+        f"{DAY}T11:05:00",
+    ]
+    assert state["planned_s"] == [900, 600, 600]
+
+
+def test_second_instance_is_locked_out(tmp_path):
+    first = StateStore(tmp_path)
+    second = StateStore(tmp_path)
+    first.acquire()
+    try:
+        with pytest.raises(StateLocked):
+            second.acquire()
+    finally:
+        first.release()
+    second.acquire()
+    second.release()
@@ -0,0 +1,103 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+import sync_packs_to_content as sync
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Plain copies: keep test blobs out of the repo's asset store
+    monkeypatch.setattr(sync, "place", lambda src, dst: _copy(src, dst))
+    (tmp_path / "packs").mkdir()
+    return tmp_path
+
+
+def _copy(src, dst):
+    Path(dst).parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(src, dst)
+
+
+def write_pack(pack_id, text, mtime_s=None):
+    path = Path("packs") / f"{pack_id}.yaml"
+    path.write_text(text, encoding="utf-8")
+    if mtime_s is not None:
+        os.utime(path, (mtime_s, mtime_s))
+    return path
+
+
+def test_first_sync_adds_everything(workdir):
+    write_pack("a", "products: []\n")
+    write_pack("b", "products: []\n")
+    changes = sync.sync_packs()
+    assert changes["added"] == ["a", "b"]
+    assert sync.changed_packs() == ["a", "b"]
+    assert Path("content/a/input.yaml").read_text(encoding="utf-8") == "products: []\n"
+
+
+def test_pending_packs_survive_a_sync_with_no_changes(workdir):
+    write_pack("a", "products: []\n")
+    sync.sync_packs()
+    changes = sync.sync_packs()
+    assert changes["added"] == changes["changed"] == []
+    assert changes["unchanged"] == ["a"]
+    assert sync.changed_packs() == ["a"]
+
+
+def test_processed_pack_is_pending_again_only_after_it_changes(workdir):
+    write_pack("a", "products: []\n", mtime_s=1_000_000)
+    write_pack("b", "products: []\n")
+    sync.sync_packs()
+    assert sync.mark_processed("a")
+    assert not sync.mark_processed("a")
+    sync.sync_packs()
+    assert sync.changed_packs() == ["b"]
+
+    write_pack("a", "products: [{asin: X1}]\n", mtime_s=2_000_000)
+    changes = sync.sync_packs()
+    assert changes["changed"] == ["a"]
+    assert sync.changed_packs() == ["a", "b"]
+
+
+def test_touched_but_identical_pack_is_not_pending(workdir):
+    write_pack("a", "products: []\n", mtime_s=1_000_000)
+    sync.sync_packs()
+    sync.mark_processed("a")
+    write_pack("a", "products: []\n", mtime_s=2_000_000)
+    changes = sync.sync_packs()
+    assert changes["unchanged"] == ["a"]
+    assert sync.changed_packs() == []
+
+
+def test_removed_pack_leaves_the_pending_list(workdir):
+    write_pack("a", "products: []\n")
+    write_pack("b", "products: []\n")
+    sync.sync_packs()
+    Path("packs/b.yaml").unlink()
+    changes = sync.sync_packs(prune="delete")
+    assert changes["removed"] == ["b"]
+    assert sync.changed_packs() == ["a"]
+    assert not Path("content/b").exists()
+
+
+def test_dry_run_writes_nothing(workdir):
+    write_pack("a", "products: []\n")
+    changes = sync.sync_packs(dry_run=True)
+    assert changes["added"] == ["a"]
+    assert not Path("content").exists()
+    assert not Path(".state").exists()
+
+
+def test_change_set_from_before_pending_was_kept(workdir):
+    Path(".state").mkdir()
+    sync.CHANGES_PATH.write_text(
+        json.dumps({"added": ["a"], "changed": ["b"], "unchanged": ["c"]}),
+        encoding="utf-8",
+    )
+    assert sync.changed_packs() == ["a", "b"]
+    assert sync.mark_processed("b")
+    assert sync.changed_packs() == ["a"]
@@ -0,0 +1,60 @@
+import wave
+
+import pytest
+from verify_outputs import expected_seconds
+
+import assemble_videos
+
+
+def write_wav(path, seconds, rate=8000):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\0\0" * int(seconds * rate))
+
+
+@pytest.fixture
+def pack(tmp_path, monkeypatch):
+    """nar1/nar2 (1 s + 2 s) concatenated into video/combined.mp4 via concat_all."""
+    monkeypatch.setattr(assemble_videos, "traced_run", lambda *a, **k: None)
+    write_wav(tmp_path / "narration" / "nar1.wav", 1.0)
+    write_wav(tmp_path / "narration" / "nar2.wav", 2.0)
+    vdir = tmp_path / "video"
+    vdir.mkdir()
+    clips = [vdir / "nar1.mp4", vdir / "nar2.mp4"]
+
+    def concat(narration=None):
+        assemble_videos.concat_all(
+            "ffmpeg", vdir, clips, vdir / "combined.mp4", narration
+        )
+        return vdir / "combined.mp4"
+
+    return tmp_path, concat
+
+
+def test_clip_expects_its_own_wav(pack):
+    pack_dir, _ = pack
+    assert expected_seconds(pack_dir, pack_dir / "video" / "nar2.mp4") == 2.0
+
+
+def test_combined_expects_the_sum_of_its_clips(pack):
+    pack_dir, concat = pack
+    assert expected_seconds(pack_dir, concat()) == 3.0
+
+
+@pytest.mark.parametrize("track_s, expected", [(2.5, 2.5), (5.0, 3.0)])
+def test_combined_with_external_narration_expects_the_shorter(pack, track_s, expected):
+    pack_dir, concat = pack
+    track = pack_dir / "narration.wav"
+    write_wav(track, track_s)
+    assert expected_seconds(pack_dir, concat(track)) == expected
+
+
+def test_unreadable_external_narration_skips_the_check(pack, monkeypatch):
+    pack_dir, concat = pack
+    monkeypatch.setenv("PATH", "")  # no ffprobe for the mp3
+    track = pack_dir / "narration.mp3"
+    track.write_bytes(b"ID3")
+    assert expected_seconds(pack_dir, concat(track)) is None
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""Synthetic-pack benchmark for the pipeline stages.
+
+Generates N packs (images, narration text, tone WAVs) in a scratch directory,
+runs each stage against them and reports throughput. A stage whose step
+reports failure (or leaves its outputs missing) fails the run rather than
+being timed. Results are compared with a stored baseline JSON; a stage that
+is slower than the baseline by more than --tolerance fails the run.
+
+The startup stage times `python -c "import <entry point>"` end to end
+(interpreter start included) for the light entry points; any over
+STARTUP_BUDGET_MS fails the run even without a baseline.
+
+    python tools/benchmark.py --packs 5 --clips 4
+    python tools/benchmark.py --update-baseline
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+DEFAULT_BASELINE = ROOT / "tools" / "bench_baseline.json"
+# Must satisfy validate_narration.has_valid_cta, or the validate stage times
+# its failure path
+CTA_LINE = "CTA_PRIMARY Learn more at https://example.com/deals"
+# Entry points that must start fast (--help, dry runs, validation-only runs)
+STARTUP_ENTRY_POINTS = (
+    "run_pipeline.py",
+    "batch_run.py",
+    "validate_pack.py",
+    "generate_cta_overlays.py",
+    "assemble_videos.py",
+    "segmind_adapter.py",
+    "tools/verify_video.py",
+)
+STARTUP_BUDGET_MS = 100.0
+STARTUP_REPEAT = 3
+
+
+# -----------------------------
+# Synthetic pack generator
+# -----------------------------
+def write_tone_wav(
+    path: Path, seconds: float, freq: float = 440.0, rate: int = 22050
+) -> None:
+    n = int(seconds * rate)
+    step = 2 * math.pi * freq / rate
+    frames = struct.pack(f"<{n}h", *(int(12000 * math.sin(i * step)) for i in range(n)))
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(frames)
+
+
+def write_image(path: Path, size, seed: int) -> None:
+    from PIL import Image, ImageDraw
+
+    rnd = random.Random(seed)
+    img = Image.new("RGB", size, tuple(rnd.randrange(40, 220) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        x0, y0 = rnd.randrange(size[0]), rnd.randrange(size[1])
+        x1, y1 = x0 + rnd.randrange(20, size[0] // 2), y0 + rnd.randrange(
+            20, size[1] // 2
+        )
+        draw.rectangle(
+            [x0, y0, x1, y1], fill=tuple(rnd.randrange(256) for _ in range(3))
+        )
+    img.save(path, quality=90)
+
+
+def synth_pack(
+    content_dir: Path, pack_id: str, clips: int, size, seconds: float, seed: int
+) -> None:
+    import yaml
+
+    pack = content_dir / pack_id
+    (pack / "images").mkdir(parents=True, exist_ok=True)
+    (pack / "narration").mkdir(parents=True, exist_ok=True)
+    products = []
+    for i in range(1, clips + 1):
+        name = f"img{i}.jpg"
+        write_image(pack / "images" / name, size, seed * 1000 + i)
+        (pack / "narration" / f"nar{i}.txt").write_text(
+            f"Benchmark product {i} is a dependable everyday pick.\n\n{CTA_LINE}\n",
+            encoding="utf-8",
+        )
+        write_tone_wav(pack / "narration" / f"nar{i}.wav", seconds, freq=220.0 + 40 * i)
+        products.append(
+            {"asin": f"BENCH{seed:04d}{i:02d}", "id": f"p{i}", "image": name}
+        )
+    with open(pack / "input.yaml", "w", encoding="utf-8") as f:
+        yaml.safe_dump({"pack_name": pack_id, "products": products}, f, sort_keys=False)
+
+
+# -----------------------------
+# Stages
+# -----------------------------
+def stage_synth(ctx):
+    for n, pack_id in enumerate(ctx["packs"]):
+        synth_pack(
+            ctx["content"], pack_id, ctx["clips"], ctx["size"], ctx["seconds"], n
+        )
+    return {"packs": len(ctx["packs"]), "clips": len(ctx["packs"]) * ctx["clips"]}
+
+
+def require_outputs(directory: Path, pattern: str, expected: int, step: str) -> None:
+    made = len(list(directory.glob(pattern)))
+    if made < expected:
+        raise StageFailed(f"{step}: {made}/{expected} {pattern} in {directory}")
+
+
+def stage_overlays(ctx):
+    import generate_cta_overlays as gco
+
+    for pack_id in ctx["packs"]:
+        gco.process_pack(
+            pack_id,
+            gco.DEFAULT_TEXT,
+            gco.DEFAULT_TEXT_COLOR,
+            gco.DEFAULT_BAR_COLOR,
+            gco.DEFAULT_BAR_ALPHA,
+            gco.DEFAULT_MARGIN,
+            gco.DEFAULT_BAR_HEIGHT_FRAC,
+            True,
+        )
+        images_cta = ctx["content"] / pack_id / "images_cta"
+        require_outputs(images_cta, "img*.jpg", ctx["clips"], "overlays")
+    return {
+        "packs": len(ctx["packs"]),
+        "overlay_images": len(ctx["packs"]) * ctx["clips"],
+    }
+
+
+def stage_assemble(ctx):
+    import assemble_videos
+
+    if not shutil.which("ffmpeg"):
+        raise Skip("ffmpeg not found")
+    for pack_id in ctx["packs"]:
+        assemble_videos.assemble(pack_id, use_cta=True)
+        vdir = ctx["content"] / pack_id / "video"
+        require_outputs(vdir, "nar*.mp4", ctx["clips"], "assemble")
+        require_outputs(vdir, "combined.mp4", 1, "assemble")
+    return {"packs": len(ctx["packs"]), "clips": len(ctx["packs"]) * ctx["clips"]}
+
+
+def stage_validate(ctx):
+    import validate_pack
+
+    for pack_id in ctx["packs"]:
+        rc = validate_pack.validate_pack(pack_id, False, False, False)
+        if rc != 0:
+            raise StageFailed(f"validate_pack {pack_id} returned {rc}")
+    return {"packs": len(ctx["packs"])}
+
+
+def startup_ms(script: str) -> float:
+    """Wall time of ``python -c "import <script>"`` in ms (best of STARTUP_REPEAT)."""
+    path = ROOT / script
+    code = f"import sys; sys.path.insert(0, {str(path.parent)!r}); import {path.stem}"
+    best = None
+    for _ in range(STARTUP_REPEAT):
+        t0 = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+        )
+        ms = (time.perf_counter() - t0) * 1000.0
+        if proc.returncode != 0:
+            last = (proc.stderr.strip().splitlines() or ["?"])[-1]
+            raise RuntimeError(f"{script}: {last}")
+        best = ms if best is None else min(best, ms)
+    return best
+
+
+def stage_startup(ctx):
+    return {
+        f"max_{Path(s).stem}_startup_ms": round(startup_ms(s), 2)
+        for s in STARTUP_ENTRY_POINTS
+    }
+
+
+STAGES = {
+    "synth": stage_synth,
+    "overlays": stage_overlays,
+    "validate": stage_validate,
+    "assemble": stage_assemble,
+    "startup": stage_startup,
+}
+# Stages that run against the synthetic packs
+PACK_STAGES = {"overlays", "validate", "assemble"}
+
+
+class Skip(Exception):
+    pass
+
+
+class StageFailed(Exception):
+    """The stage ran but its step reported failure; its timing means nothing."""
+
+
+def rates(counts: dict, seconds: float) -> dict:
+    out = {"seconds": round(seconds, 4)}
+    if seconds <= 0:
+        return out
+    if "packs" in counts:
+        out["packs_per_min"] = round(counts["packs"] * 60 / seconds, 3)
+    if "clips" in counts:
+        out["clips_per_min"] = round(counts["clips"] * 60 / seconds, 3)
+    if "overlay_images" in counts:
+        out["overlay_images_per_s"] = round(counts["overlay_images"] / seconds, 3)
+    out.update({k: v for k, v in counts.items() if k.startswith("max_")})
+    return out
+
+
+def run_stages(names, ctx, verbose: bool) -> dict:
+    results = {}
+    for name in names:
+        if name in PACK_STAGES and "seconds" not in results.get("synth", {}):
+            results[name] = {"skipped": "no synthetic packs"}
+            continue
+        sink = io.StringIO()
+        redirect = (
+            contextlib.nullcontext() if verbose else contextlib.redirect_stdout(sink)
+        )
+        t0 = time.perf_counter()
+        try:
+            with redirect:
+                counts = STAGES[name](ctx)
+        except Skip as e:
+            results[name] = {"skipped": str(e)}
+            continue
+        except ImportError as e:
+            results[name] = {"skipped": f"missing dependency: {e.name}"}
+            continue
+        except (Exception, SystemExit) as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+            continue
+        results[name] = rates(counts, time.perf_counter() - t0)
+    return results
+
+
+# -----------------------------
+# Baseline comparison
+# -----------------------------
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return one message per metric that moved past baseline by more than ``tolerance``.
+
+    Throughput metrics must stay above baseline * (1 - tolerance); ``max_*``
+    metrics (lower is better) must stay below baseline * (1 + tolerance).
+    """
+    regressions = []
+    for stage, base in (baseline.get("stages") or {}).items():
+        cur = results.get(stage) or {}
+        for metric, base_val in base.items():
+            if metric == "seconds" or not isinstance(base_val, (int, float)):
+                continue
+            if metric not in cur:
+                continue
+            if metric.startswith("max_"):
+                ceiling = base_val * (1 + tolerance)
+                if cur[metric] > ceiling:
+                    regressions.append(
+                        f"{stage}.{metric}: {cur[metric]} > {ceiling:.3f} (baseline {base_val})"
+                    )
+                continue
+            floor = base_val * (1 - tolerance)
+            if cur[metric] < floor:
+                regressions.append(
+                    f"{stage}.{metric}: {cur[metric]} < {floor:.3f} (baseline {base_val})"
+                )
+    return regressions
+
+
+def over_budget(results: dict) -> list[str]:
+    return [
+        f"startup.{metric}: {ms} ms > {STARTUP_BUDGET_MS:g} ms budget"
+        for metric, ms in (results.get("startup") or {}).items()
+        if metric.startswith("max_") and ms > STARTUP_BUDGET_MS
+    ]
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Benchmark pipeline stages on synthetic packs."
+    )
+    ap.add_argument("--packs", type=int, default=3, help="Number of synthetic packs")
+    ap.add_argument(
+        "--clips", type=int, default=3, help="Images/narration clips per pack"
+    )
+    ap.add_argument("--size", default="1280x720", help="Synthetic image size WxH")
+    ap.add_argument(
+        "--seconds", type=float, default=2.0, help="Seconds of tone per WAV"
+    )
+    ap.add_argument(
+        "--stages",
+        default=",".join(STAGES),
+        help=f"Comma-separated stages to run (default: {','.join(STAGES)})",
+    )
+    ap.add_argument(
+        "--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON path"
+    )
+    ap.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed slowdown fraction"
+    )
+    ap.add_argument(
+        "--update-baseline", action="store_true", help="Store results as baseline"
+    )
+    ap.add_argument("--workdir", help="Keep synthetic packs here instead of a temp dir")
+    ap.add_argument("--out", help="Also write the results JSON here")
+    ap.add_argument("--verbose", action="store_true", help="Show stage output")
+    args = ap.parse_args()
+
+    names = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in names if s not in STAGES]
+    if unknown:
+        ap.error(f"unknown stage(s): {', '.join(unknown)}")
+    if "synth" not in names:
+        names.insert(0, "synth")
+    w, h = (int(v) for v in args.size.lower().split("x"))
+
+    workdir = (
+        Path(args.workdir)
+        if args.workdir
+        else Path(tempfile.mkdtemp(prefix="affbench_"))
+    )
+    workdir.mkdir(parents=True, exist_ok=True)
+    ctx = {
+        "content": workdir / "content",
+        "packs": [f"bench_{i:03d}" for i in range(args.packs)],
+        "clips": args.clips,
+        "size": (w, h),
+        "seconds": args.seconds,
+    }
+    cwd = os.getcwd()
+    env_trace = os.environ.get("PIPELINE_TRACE")
+    os.environ["PIPELINE_TRACE"] = "0"
+    os.chdir(workdir)
+    try:
+        results = run_stages(names, ctx, args.verbose)
+    finally:
+        os.chdir(cwd)
+        if env_trace is None:
+            os.environ.pop("PIPELINE_TRACE", None)
+        else:
+            os.environ["PIPELINE_TRACE"] = env_trace
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "params": {
+            "packs": args.packs,
+            "clips": args.clips,
+            "size": args.size,
+            "seconds": args.seconds,
+        },
+        "host": {"python": platform.python_version(), "machine": platform.machine()},
+        "stages": results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    failed = {k: v["error"] for k, v in results.items() if "error" in v}
+    if failed:
+        print("❌ Stage(s) failed; no timings compared:")
+        for stage, err in failed.items():
+            print(f"   {stage}: {err}")
+        sys.exit(1)
+
+    budget = over_budget(results)
+    if budget:
+        print("❌ Import-time budget exceeded:")
+        for b in budget:
+            print(f"   {b}")
+        sys.exit(1)
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        keep = {
+            k: v for k, v in results.items() if "skipped" not in v and "error" not in v
+        }
+        baseline_path.write_text(
+            json.dumps({**report, "stages": keep}, indent=2) + "\n", encoding="utf-8"
+        )
+        print(f"✅ Baseline written: {baseline_path}")
+        return
+    if not baseline_path.is_file():
+        print(
+            f"⚠️ No baseline at {baseline_path}; run with --update-baseline to create one."
+        )
+        return
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    if baseline.get("params") != report["params"]:
+        print(
+            "⚠️ Baseline was recorded with different parameters; comparison may be meaningless."
+        )
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("❌ Performance regressions:")
+        for r in regressions:
+            print(f"   {r}")
+        sys.exit(1)
+    print("✅ No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
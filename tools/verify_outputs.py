@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""Verify every pack's rendered videos in one pass.
+
+Walks content/<pack>/video/*.mp4 and content/<pack>/output/*.mp4, runs
+ffprobe on all of them in parallel and checks:
+  - the container opens and has a video stream (integrity)
+  - an audio stream is present (optionally: that it is not silent)
+  - the resolution matches --size, or at least the rest of the pack
+  - the duration matches the narration WAV(s) it was built from (for a
+    combined.mp4 muxed with --narration: the shorter of those and the track)
+
+One JSON report per pack goes to logs/run_<RUN_ID>/verify_outputs/.
+
+    python tools/verify_outputs.py
+    python tools/verify_outputs.py --only 003_affiliate_airfryer --check-silence
+"""
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from verify_video import audio_levels, probe  # noqa: E402
+
+from assemble_videos import NARRATION_COMMENT, wav_seconds  # noqa: E402
+from instrument import run_log_dir  # noqa: E402
+
+VIDEO_DIRS = ("video", "output")
+
+
+def track_seconds(path: Path) -> float | None:
+    if path.suffix.lower() == ".wav":
+        return wav_seconds(path)
+    try:
+        return probe(path)["duration"]
+    except RuntimeError:
+        return None
+
+
+def expected_seconds(pack_dir: Path, video: Path) -> float | None:
+    """Duration ``video`` should have, from the narration it was assembled from."""
+    narr = pack_dir / "narration"
+    track = None
+    if video.name == "combined.mp4":
+        list_file = video.parent / "list.txt"
+        if list_file.exists():
+            lines = list_file.read_text(encoding="utf-8").splitlines()
+            clips = [line.split("'")[1] for line in lines if line.startswith("file '")]
+            track = next(
+                (
+                    Path(line[len(NARRATION_COMMENT) :])
+                    for line in lines
+                    if line.startswith(NARRATION_COMMENT)
+                ),
+                None,
+            )
+        else:
+            clips = sorted(p.name for p in video.parent.glob("nar*.mp4"))
+        wavs = [narr / f"{Path(c).stem}.wav" for c in clips]
+    else:
+        wavs = [narr / f"{video.stem}.wav"]
+    secs = [wav_seconds(w) for w in wavs]
+    if not secs or any(s is None for s in secs):
+        return None
+    if track is None:
+        return sum(secs)
+    # Muxed with -shortest against the external track: the shorter one wins
+    narration = track_seconds(track)
+    return min(sum(secs), narration) if narration is not None else None
+
+
+def check_video(
+    pack_dir: Path, video: Path, tolerance: float, check_silence: bool
+) -> dict:
+    rec = {"file": str(video.relative_to(pack_dir)), "errors": []}
+    try:
+        meta = probe(video)
+    except RuntimeError as e:
+        rec["errors"].append(f"unreadable: {e}")
+        return rec
+    rec.update(meta)
+    if not meta["has_video"]:
+        rec["errors"].append("no video stream")
+    if not meta["has_audio"]:
+        rec["errors"].append("no audio stream")
+    elif check_silence:
+        try:
+            levels = audio_levels(video)
+        except RuntimeError as e:
+            rec["errors"].append(f"audio undecodable: {e}")
+        else:
+            rec["peak_dbfs"] = levels["peak_dbfs"]
+            if levels["silent"]:
+                rec["errors"].append("audio is silent")
+    expected = expected_seconds(pack_dir, video)
+    rec["expected_duration"] = round(expected, 3) if expected is not None else None
+    if expected is not None and meta["duration"] is not None:
+        allowed = max(0.5, expected * tolerance)
+        if abs(meta["duration"] - expected) > allowed:
+            rec["errors"].append(
+                f"duration {meta['duration']:.2f}s != narration {expected:.2f}s (±{allowed:.2f}s)"
+            )
+    return rec
+
+
+def check_resolutions(records: list[dict], size) -> None:
+    """Flag files whose resolution differs from ``size`` (or the pack's most common one)."""
+    dims = [(r["width"], r["height"]) for r in records if r.get("width")]
+    if not dims:
+        return
+    want = size or Counter(dims).most_common(1)[0][0]
+    for r in records:
+        if r.get("width") and (r["width"], r["height"]) != want:
+            r["errors"].append(
+                f"resolution {r['width']}x{r['height']} != {want[0]}x{want[1]}"
+            )
+
+
+def find_videos(content_dir: Path, only) -> dict[str, list[Path]]:
+    packs = {}
+    for pack_dir in sorted(p for p in content_dir.iterdir() if p.is_dir()):
+        if only and pack_dir.name not in only:
+            continue
+        videos = [v for d in VIDEO_DIRS for v in sorted((pack_dir / d).glob("*.mp4"))]
+        if videos:
+            packs[pack_dir.name] = videos
+    return packs
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Verify rendered videos for all packs with parallel ffprobe."
+    )
+    ap.add_argument("--content-dir", default="content")
+    ap.add_argument("--only", nargs="*", help="Pack folder names to check")
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=min(16, (os.cpu_count() or 2) * 2),
+        help="Parallel ffprobe calls",
+    )
+    ap.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.02,
+        help="Allowed duration drift fraction (min 0.5 s)",
+    )
+    ap.add_argument(
+        "--size", help="Expected resolution WxH (default: most common in each pack)"
+    )
+    ap.add_argument(
+        "--check-silence",
+        action="store_true",
+        help="Also stream audio and fail silent tracks",
+    )
+    ap.add_argument(
+        "--out-dir", help="Report directory (default: logs/run_<RUN_ID>/verify_outputs)"
+    )
+    args = ap.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split("x")) if args.size else None
+    content_dir = Path(args.content_dir)
+    packs = find_videos(content_dir, set(args.only or []))
+    if not packs:
+        print(f"⚠️ No videos found under {content_dir}/*/{{{','.join(VIDEO_DIRS)}}}")
+        sys.exit(0)
+
+    jobs = [(pack, video) for pack, videos in packs.items() for video in videos]
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        results = pool.map(
+            lambda job: (
+                job[0],
+                check_video(
+                    content_dir / job[0], job[1], args.tolerance, args.check_silence
+                ),
+            ),
+            jobs,
+        )
+        by_pack: dict[str, list[dict]] = {}
+        for pack, rec in results:
+            by_pack.setdefault(pack, []).append(rec)
+
+    out_dir = Path(args.out_dir) if args.out_dir else run_log_dir() / "verify_outputs"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    failed = 0
+    for pack, records in by_pack.items():
+        check_resolutions(records, size)
+        bad = [r for r in records if r["errors"]]
+        failed += len(bad)
+        report = {
+            "pack": pack,
+            "videos": len(records),
+            "failed": len(bad),
+            "results": records,
+        }
+        (out_dir / f"{pack}.json").write_text(
+            json.dumps(report, indent=2), encoding="utf-8"
+        )
+        icon = "✅" if not bad else "❌"
+        print(f"{icon} {pack}: {len(records) - len(bad)}/{len(records)} OK")
+        for r in bad:
+            for err in r["errors"]:
+                print(f"   {r['file']}: {err}")
+
+    print(f"📝 Reports written to {out_dir}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
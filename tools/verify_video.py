@@ -1,27 +1,175 @@
-import sys
-from moviepy.video.io.VideoFileClip import VideoFileClip
 # filepath: tools/verify_video.py
+"""Check a rendered video: duration/resolution from ffprobe, audio streamed through ffmpeg.
+
+The audio is decoded to 16-bit mono PCM on a pipe and read in chunks, so
+memory stays flat on long videos; reading stops at the first non-silent chunk.
+A decode that fails before then raises RuntimeError rather than reading as silence.
+"""
+import argparse
+import json
+import math
+import operator
+import shutil
+import subprocess
 import sys
-from moviepy.editor import VideoFileClip
-d9aa1ed (Save local changes before pulling)
-
-def verify_video(path):
-    clip = VideoFileClip(path)
-    print(f"Duration: {clip.duration:.2f}s")
-    print(f"Resolution: {clip.size}")
-    if clip.audio is None:
+import tempfile
+from array import array
+
+SAMPLE_RATE = 22050
+CHUNK_SAMPLES = SAMPLE_RATE  # ~1 s of audio per read
+FULL_SCALE = 32768.0
+
+
+def require_tool(name: str) -> str:
+    exe = shutil.which(name)
+    if not exe:
+        raise RuntimeError(f"{name} not found. Install with: brew install ffmpeg")
+    return exe
+
+
+def probe(path) -> dict:
+    """Container/stream metadata from ffprobe; raises RuntimeError if unreadable."""
+    proc = subprocess.run(
+        [
+            require_tool("ffprobe"),
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration,format_name:stream=codec_type,codec_name,width,height,duration",
+            "-of",
+            "json",
+            str(path),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip() or f"ffprobe failed on {path}")
+    data = json.loads(proc.stdout or "{}")
+    streams = data.get("streams") or []
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    fmt = data.get("format") or {}
+    duration = fmt.get("duration") or (video or {}).get("duration")
+    return {
+        "format": fmt.get("format_name"),
+        "duration": float(duration) if duration not in (None, "N/A") else None,
+        "width": (video or {}).get("width"),
+        "height": (video or {}).get("height"),
+        "video_codec": (video or {}).get("codec_name"),
+        "audio_codec": (audio or {}).get("codec_name"),
+        "has_video": video is not None,
+        "has_audio": audio is not None,
+    }
+
+
+def audio_levels(path, min_peak: int = 1, full: bool = False) -> dict:
+    """Stream the audio track and return peak/RMS of what was read.
+
+    Stops at the first chunk whose peak reaches ``min_peak`` unless ``full``.
+    Raises RuntimeError if ffmpeg fails (corrupt stream, no audio track).
+    """
+    peak, sum_sq, n = 0, 0, 0
+    eof = False
+    # stderr to a file, not a pipe: an unread pipe could fill and stall ffmpeg
+    with tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(
+            [
+                require_tool("ffmpeg"),
+                "-v",
+                "error",
+                "-i",
+                str(path),
+                "-vn",
+                "-ac",
+                "1",
+                "-ar",
+                str(SAMPLE_RATE),
+                "-f",
+                "s16le",
+                "-",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=err,
+        )
+        try:
+            while True:
+                buf = proc.stdout.read(CHUNK_SAMPLES * 2)
+                if not buf:
+                    eof = True
+                    break
+                samples = array("h", buf[: len(buf) // 2 * 2])
+                if sys.byteorder == "big":
+                    samples.byteswap()
+                if samples:
+                    peak = max(peak, max(samples), -min(samples))
+                    sum_sq += sum(map(operator.mul, samples, samples))
+                    n += len(samples)
+                if peak >= min_peak and not full:
+                    break
+        finally:
+            proc.stdout.close()
+            if not eof:
+                proc.kill()  # stopped early on purpose
+            proc.wait()
+        if eof and proc.returncode != 0:
+            err.seek(0)
+            msg = err.read().decode("utf-8", "replace").strip()
+            raise RuntimeError(msg or f"ffmpeg exited {proc.returncode} on {path}")
+    rms = (sum_sq / n) ** 0.5 if n else 0.0
+    return {
+        "peak": peak,
+        "peak_dbfs": _dbfs(peak),
+        "rms_dbfs": _dbfs(rms),
+        "seconds_read": round(n / SAMPLE_RATE, 3),
+        "silent": peak < min_peak,
+    }
+
+
+def _dbfs(value: float):
+    if value <= 0:
+        return None
+    return round(20 * math.log10(value / FULL_SCALE), 2)
+
+
+def verify_video(path, min_peak: int = 1):
+    try:
+        meta = probe(path)
+    except RuntimeError as e:
+        print(f"Unreadable video: {e}")
+        return False
+    if meta["duration"] is not None:
+        print(f"Duration: {meta['duration']:.2f}s")
+    print(f"Resolution: {[meta['width'], meta['height']]}")
+    if not meta["has_audio"]:
         print("No audio track found!")
         return False
-    audio = clip.audio.to_soundarray(fps=22050)
-    if audio.max() == 0:
+    try:
+        levels = audio_levels(path, min_peak=min_peak)
+    except RuntimeError as e:
+        print(f"Audio could not be decoded: {e}")
+        return False
+    if levels["silent"]:
         print("Audio track is silent!")
         return False
-    print("Audio track present and non-silent.")
+    print(
+        f"Audio track present and non-silent (peak {levels['peak_dbfs']} dBFS "
+        f"within first {levels['seconds_read']}s)."
+    )
     return True
 
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python tools/verify_video.py <video_path>")
-        sys.exit(1)
-    video_path = sys.argv[1]
-    verify_video(video_path)
+    ap = argparse.ArgumentParser(
+        description="Verify a rendered video has a readable, non-silent audio track."
+    )
+    ap.add_argument("video_path", nargs="+")
+    ap.add_argument(
+        "--min-peak",
+        type=int,
+        default=1,
+        help="Smallest 16-bit sample peak that counts as sound",
+    )
+    args = ap.parse_args()
+    ok = all([verify_video(p, args.min_peak) for p in args.video_path])
+    sys.exit(0 if ok else 1)
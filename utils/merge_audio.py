@@ -1,14 +1,63 @@
+import json
+import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def merge_with_audio(video_path, audio_path="narration.mp3"):
+# Audio codecs that can go into an MP4 without re-encoding
+MP4_AUDIO_COPY = {"aac", "alac"}
+# Looked for next to a video (same stem) when no audio is given for it;
+# stream-copyable formats first
+AUDIO_EXTS = (".m4a", ".aac", ".mp3", ".wav")
+
+
+def audio_codec(path):
+    """Codec of the first audio stream (e.g. "aac", "mp3"), or None if unknown."""
+    ffprobe = shutil.which("ffprobe")
+    if not ffprobe:
+        return None
+    proc = subprocess.run(
+        [
+            ffprobe,
+            "-v",
+            "error",
+            "-select_streams",
+            "a:0",
+            "-show_entries",
+            "stream=codec_name",
+            "-of",
+            "json",
+            str(path),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        return None
+    streams = json.loads(proc.stdout or "{}").get("streams") or []
+    return streams[0].get("codec_name") if streams else None
+
+
+def audio_args(audio_path):
+    """ffmpeg audio codec args: stream copy when the codec allows, else AAC."""
+    if audio_codec(audio_path) in MP4_AUDIO_COPY:
+        return ["-c:a", "copy"]
+    return ["-c:a", "aac", "-b:a", "128k"]
+
+
+def merge_with_audio(video_path, audio_path="narration.mp3", output_path=None):
     """
     Merge an MP4 video with an audio track into a final MP4 with sound.
 
     - Handles spaces in filenames
     - Preserves video quality (no re-encode of video stream)
-    - Encodes audio to AAC for MP4 compatibility
+    - Copies AAC audio as-is; anything else is encoded to AAC for MP4 compatibility
     - Trims to the shortest stream to avoid trailing silence or black frames
+
+    Prefer assemble_videos.py --narration for new packs: it muxes the track
+    while concatenating, so the video is not read and rewritten twice.
+    run_pipeline.py passes it automatically when the pack has a
+    content/<pack>/narration.mp3 (or .m4a/.wav).
     """
     video_path = Path(video_path)
     audio_path = Path(audio_path)
@@ -18,17 +67,90 @@ def merge_with_audio(video_path, audio_path="narration.mp3"):
     if not audio_path.exists():
         raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
-    output_path = video_path.with_name(f"{video_path.stem}_with_audio.mp4")
+    output_path = Path(
+        output_path or video_path.with_name(f"{video_path.stem}_with_audio.mp4")
+    )
 
-    subprocess.run([
-        "ffmpeg", "-y",
-        "-i", str(video_path),
-        "-i", str(audio_path),
-        "-c:v", "copy",
-        "-c:a", "aac",
-        "-shortest",
-        str(output_path)
-    ], check=True)
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-v",
+            "error",
+            "-i",
+            str(video_path),
+            "-i",
+            str(audio_path),
+            "-map",
+            "0:v:0",
+            "-map",
+            "1:a:0",
+            "-c:v",
+            "copy",
+            *audio_args(audio_path),
+            "-shortest",
+            "-movflags",
+            "+faststart",
+            str(output_path),
+        ],
+        check=True,
+    )
 
     print(f"[OK] Created: {output_path}")
     return output_path
+
+
+def pair_inputs(items, audio=None, audio_dir=None):
+    """(video, audio) pairs for merge_many from CLI-style ``items``.
+
+    An item is ``video=audio``, or just a video. A bare video gets ``audio``
+    when that is given, else the file with its stem and an AUDIO_EXTS
+    suffix in ``audio_dir`` (default: the video's own folder). Raises
+    ValueError listing the videos no audio was found for.
+    """
+    pairs, unmatched = [], []
+    for item in items:
+        video, sep, track = str(item).partition("=")
+        if sep and not Path(item).exists():
+            pairs.append((Path(video), Path(track)))
+            continue
+        video = Path(item)
+        if audio is not None:
+            pairs.append((video, Path(audio)))
+            continue
+        folder = Path(audio_dir) if audio_dir is not None else video.parent
+        match = next(
+            (
+                folder / f"{video.stem}{ext}"
+                for ext in AUDIO_EXTS
+                if (folder / f"{video.stem}{ext}").is_file()
+            ),
+            None,
+        )
+        if match is None:
+            unmatched.append(str(video))
+        else:
+            pairs.append((video, match))
+    if unmatched:
+        raise ValueError(f"no audio found for: {', '.join(unmatched)}")
+    return pairs
+
+
+def merge_many(pairs, jobs=4):
+    """Merge (video, audio) pairs concurrently.
+
+    Returns [(video, output_or_None, error_or_None)] in input order.
+
+    Each merge is a stream copy (plus an AAC encode when needed), so the
+    work is I/O-bound and runs well in parallel.
+    """
+
+    def one(pair):
+        video, audio = pair
+        try:
+            return video, merge_with_audio(video, audio), None
+        except (OSError, subprocess.CalledProcessError) as e:
+            return video, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        return list(pool.map(one, pairs))
@@ -0,0 +1,223 @@
+"""Local stand-in for the Segmind workflow API, for testing segmind_client offline.
+
+    POST /workflows/<id>     -> {"poll_url": ..., "request_id": ..., "status": "QUEUED"}
+    GET  /requests/<id>      -> QUEUED/PROCESSING, then COMPLETED with outputs[video_out]
+    GET  /files/<id>.mp4     -> deterministic bytes; honours Range: bytes=N- and If-Range
+
+    python utils/segmind_mock_server.py --port 8765 --polls 3 --fail-every 4 --rate-limited 2
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RANGE_RE = re.compile(r"bytes=(\d+)-(\d*)$")
+
+
+def file_bytes(request_id: int, size: int) -> bytes:
+    seed = hashlib.sha256(str(request_id).encode()).digest()
+    return (seed * (size // len(seed) + 1))[:size]
+
+
+class MockState:
+    def __init__(
+        self,
+        polls=2,
+        size=256 * 1024,
+        fail_every=0,
+        failed_jobs=0,
+        api_key=None,
+        rate_limited=0,
+        retry_after=1,
+    ):
+        self.polls = polls  # polls before a run completes
+        self.size = size
+        self.fail_every = fail_every  # every Nth request gets a 503 (0 = never)
+        self.failed_jobs = failed_jobs  # every Nth job ends FAILED (0 = never)
+        self.api_key = api_key
+        self.rate_limited = rate_limited  # the first N requests get a 429
+        self.retry_after = retry_after  # seconds, sent with each 429
+        self.log = []  # (method, path, status) of each API request
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.requests = itertools.count(1)
+        self.jobs = {}
+        self.submitted = []
+
+
+def make_handler(state: MockState):
+    class Handler(BaseHTTPRequestHandler):
+        def _json(self, code, body, headers=()):
+            data = json.dumps(body).encode("utf-8")
+            with state.lock:
+                state.log.append((self.command, self.path, code))
+            self.send_response(code)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _gate(self) -> bool:
+            if state.api_key and self.headers.get("x-api-key") != state.api_key:
+                self._json(401, {"error": "invalid api key"})
+                return False
+            with state.lock:
+                n = next(state.requests)
+            if n <= state.rate_limited:
+                self._json(
+                    429,
+                    {"error": "rate limited"},
+                    [("Retry-After", str(state.retry_after))],
+                )
+                return False
+            if state.fail_every and n % state.fail_every == 0:
+                self._json(503, {"error": "try again"})
+                return False
+            return True
+
+        def _base(self):
+            return f"http://{self.headers.get('Host') or '%s:%d' % self.server.server_address}"
+
+        def do_POST(self):
+            if not self.path.startswith("/workflows/"):
+                return self._json(404, {"error": "not found"})
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not self._gate():
+                return
+            with state.lock:
+                rid = next(state.ids)
+                fail = bool(state.failed_jobs) and rid % state.failed_jobs == 0
+                state.jobs[rid] = {"polls": 0, "fail": fail}
+                state.submitted.append(body)
+            self._json(
+                200,
+                {
+                    "poll_url": f"{self._base()}/requests/{rid}",
+                    "request_id": rid,
+                    "status": "QUEUED",
+                },
+            )
+
+        def do_GET(self):
+            m = re.match(r"/requests/(\d+)$", self.path)
+            if m:
+                return self._poll(int(m.group(1)))
+            m = re.match(r"/files/(\d+)\.mp4$", self.path)
+            if m:
+                return self._file(int(m.group(1)))
+            self._json(404, {"error": "not found"})
+
+        def _poll(self, rid):
+            if not self._gate():
+                return
+            with state.lock:
+                job = state.jobs.get(rid)
+                if job is None:
+                    return self._json(404, {"error": "unknown request"})
+                job["polls"] += 1
+                n = job["polls"]
+            if n <= state.polls:
+                return self._json(200, {"status": "QUEUED" if n == 1 else "PROCESSING"})
+            if job["fail"]:
+                return self._json(200, {"status": "FAILED", "error": "mock failure"})
+            url = f"{self._base()}/files/{rid}.mp4"
+            self._json(
+                200,
+                {
+                    "status": "COMPLETED",
+                    "outputs": [{"keyname": "video_out", "value": {"data": url}}],
+                },
+            )
+
+        def _file(self, rid):
+            data = file_bytes(rid, state.size)
+            etag = f'"{hashlib.sha256(data).hexdigest()[:16]}"'
+            start, end = 0, len(data) - 1
+            m = RANGE_RE.match(self.headers.get("Range") or "")
+            if m and self.headers.get("If-Range") not in (None, etag):
+                m = None  # changed since the partial download: send it all
+            if m:
+                start = int(m.group(1))
+                end = min(int(m.group(2)), end) if m.group(2) else end
+                if start > end:
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{len(data)}")
+                    self.end_headers()
+                    return
+            self.send_response(206 if m else 200)
+            self.send_header("Content-Type", "video/mp4")
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", etag)
+            if m:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+            self.send_header("Content-Length", str(end - start + 1))
+            self.end_headers()
+            self.wfile.write(data[start : end + 1])
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start(port=0, host="127.0.0.1", **state_kwargs):
+    """Start in a background thread; returns (server, state). Stop with server.shutdown()."""
+    state = MockState(**state_kwargs)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Mock Segmind workflow API")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--polls", type=int, default=2, help="Polls before a run completes")
+    ap.add_argument(
+        "--size", type=int, default=256 * 1024, help="Bytes per generated video"
+    )
+    ap.add_argument("--fail-every", type=int, default=0, help="503 every Nth request")
+    ap.add_argument(
+        "--failed-jobs", type=int, default=0, help="Every Nth job ends FAILED"
+    )
+    ap.add_argument("--api-key", help="Require this x-api-key")
+    ap.add_argument(
+        "--rate-limited", type=int, default=0, help="429 the first N requests"
+    )
+    ap.add_argument(
+        "--retry-after", type=int, default=1, help="Retry-After (s) sent with a 429"
+    )
+    args = ap.parse_args()
+
+    server = ThreadingHTTPServer(
+        (args.host, args.port),
+        make_handler(
+            MockState(
+                args.polls,
+                args.size,
+                args.fail_every,
+                args.failed_jobs,
+                args.api_key,
+                args.rate_limited,
+                args.retry_after,
+            )
+        ),
+    )
+    print(
+        f"🧪 Mock Segmind listening on http://{args.host}:{args.port}/workflows/mock-v1"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ import subprocess
 from pathlib import Path
 from typing import Dict, List
 
+from instrument import run as traced_run
+
 MIN_LENGTH = 35
 PATCH_TEXT = " Discover why this pick stands out."
 
@@ -22,12 +24,14 @@ def tts_to_wav(
     aiff_path = wav_path.with_suffix(".aiff")
 
     try:
-        subprocess.run(["say", "-v", voice, text, "-o", str(aiff_path)], check=True)
+        traced_run(
+            ["say", "-v", voice, text, "-o", str(aiff_path)], name="tts.say", check=True
+        )
     except subprocess.CalledProcessError:
-        subprocess.run(["say", text, "-o", str(aiff_path)], check=True)
+        traced_run(["say", text, "-o", str(aiff_path)], name="tts.say", check=True)
 
     ffmpeg = ensure_ffmpeg()
-    subprocess.run(
+    traced_run(
         [
             ffmpeg,
             "-y",
@@ -39,6 +43,8 @@ def tts_to_wav(
             "1",
             str(wav_path),
         ],
+        name="ffmpeg.tts_convert",
+        attrs={"file": wav_path.name},
         check=True,
     )
 
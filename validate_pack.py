@@ -3,15 +3,7 @@ import argparse
 from pathlib import Path
 from typing import List, Tuple
 
-import yaml
-
-# Reuse narration validator from project root
-import validate_narration as narr
-
-
-def load_yaml(path: Path) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+from pack_config import PackConfigError, load_pack
 
 
 def check_images(pack_dir: Path, products: list) -> Tuple[int, List[str]]:
@@ -66,7 +58,12 @@ def validate_pack(
         print(f"❌ Missing input.yaml: {yml}")
         return 2
 
-    data = load_yaml(yml)
+    # Schema is checked here, once per input.yaml version; later steps just load
+    try:
+        data = load_pack(yml)
+    except PackConfigError as e:
+        print(f"❌ Invalid input.yaml: {e}")
+        return 2
     products = data.get("products") or []
     if not products:
         print("❌ No products found in input.yaml")
@@ -102,6 +99,9 @@ def validate_pack(
     # Narration
     print_section("Narration")
     narr_dir = pack_dir / "narration"
+    # Reuse narration validator from project root (imported here: it pulls in the tracer)
+    import validate_narration as narr
+
     narr_results = narr.validate_narration(str(narr_dir), patch=patch_narr)
     n_total = len(narr_results)
     n_fail = sum(1 for errs in narr_results.values() if errs)